@@ -0,0 +1,273 @@
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.decorators import sync_and_async_middleware
+
+
+# Defaults for settings.ADMISSION_CONTROL
+ADMISSION_DEFAULTS = {
+    "ENABLED": True,
+    # Requests admitted into the app at once, per worker process
+    "MAX_IN_FLIGHT": 48,
+    # Normal requests wait this long for a slot before a 503
+    "MAX_QUEUE_WAIT_MS": 3000,
+    # Low-priority requests are shed while the recent average latency of
+    # admitted requests is above this (or no slot is free)
+    "LATENCY_BUDGET_MS": 4000,
+    # Seconds a latency sample counts towards the average
+    "LATENCY_WINDOW": 10,
+    "RETRY_AFTER": 5,
+    # Never queued or shed (login, chat, item creation, these stats)
+    "PRIORITY_PATHS": [
+        r"^/employee/login/",
+        r"^/requests/chat/",
+        r"^/itemmaster/create/",
+        r"^/common/",
+    ],
+    # Shed first: list and export endpoints
+    "SHED_PATHS": [
+        r"/list/$",
+        r"^/api/reports/",
+        r"^/uploads/download-template/",
+        r"^/favorites/shared/$",
+    ],
+}
+
+PRIORITY, NORMAL, LOW = "priority", "normal", "low"
+
+
+def admission_settings():
+    return {**ADMISSION_DEFAULTS, **getattr(settings, "ADMISSION_CONTROL", {})}
+
+
+class _Waiter:
+    """A queued request: an asyncio future (async) or a threading event (sync)."""
+    __slots__ = ("future", "loop", "event", "admitted")
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.admitted = False
+
+    def wake(self):
+        self.admitted = True
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+        else:
+            self.event.set()
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(True)
+
+
+class AdmissionController:
+    """
+    Bounded concurrency for one worker. Priority requests always enter;
+    normal ones queue (FIFO) for a free slot up to MAX_QUEUE_WAIT_MS; low
+    ones enter only when a slot is free and latency is within budget.
+    """
+
+    def __init__(self, conf):
+        self.conf = conf
+        self.priority_paths = [re.compile(p) for p in conf["PRIORITY_PATHS"]]
+        self.shed_paths = [re.compile(p) for p in conf["SHED_PATHS"]]
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.peak_queue = 0
+        self.admitted = {PRIORITY: 0, NORMAL: 0, LOW: 0}
+        self.shed = {"low_priority": 0, "queue_timeout": 0}
+        self.queue_wait_total_ms = 0.0
+        self.queue_wait_count = 0
+        self.queue_wait_max_ms = 0.0
+        self.queued_total = 0
+        self._latency_ms = 0.0
+        self._latency_at = 0.0
+
+    def classify(self, path):
+        if any(p.search(path) for p in self.priority_paths):
+            return PRIORITY
+        if any(p.search(path) for p in self.shed_paths):
+            return LOW
+        return NORMAL
+
+    def recent_latency_ms(self):
+        if time.monotonic() - self._latency_at > self.conf["LATENCY_WINDOW"]:
+            return 0.0
+        return self._latency_ms
+
+    # ---------- slots ----------
+    def try_enter(self, priority):
+        """
+        Take a slot without waiting. Returns True (entered), False (low
+        priority, shed) or None (normal request that has to queue).
+        """
+        with self._lock:
+            free = self.in_flight < self.conf["MAX_IN_FLIGHT"]
+            if priority == PRIORITY or (free and not self._queue and (
+                priority == NORMAL or self.recent_latency_ms() <= self.conf["LATENCY_BUDGET_MS"]
+            )):
+                self._enter(priority)
+                return True
+            if priority == LOW:
+                self.shed["low_priority"] += 1
+                return False
+            return None
+
+    def _enter(self, priority):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.admitted[priority] += 1
+
+    def queue(self, waiter):
+        with self._lock:
+            if self.in_flight < self.conf["MAX_IN_FLIGHT"] and not self._queue:
+                self._enter(NORMAL)
+                waiter.admitted = True
+                return
+            self._queue.append(waiter)
+            self.queued_total += 1
+            self.peak_queue = max(self.peak_queue, len(self._queue))
+
+    def give_up(self, waiter):
+        """Called when a waiter timed out. Returns True if it was admitted meanwhile."""
+        with self._lock:
+            if waiter.admitted:
+                return True
+            self._queue.remove(waiter)
+            self.shed["queue_timeout"] += 1
+            return False
+
+    def waited(self, ms):
+        with self._lock:
+            self.queue_wait_total_ms += ms
+            self.queue_wait_count += 1
+            self.queue_wait_max_ms = max(self.queue_wait_max_ms, ms)
+
+    def leave(self, priority, started):
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            if priority != PRIORITY:
+                # Exponentially weighted, restarted after a quiet window
+                if time.monotonic() - self._latency_at > self.conf["LATENCY_WINDOW"]:
+                    self._latency_ms = elapsed_ms
+                else:
+                    self._latency_ms = 0.8 * self._latency_ms + 0.2 * elapsed_ms
+                self._latency_at = time.monotonic()
+
+            # Free the slot, then hand any free slots to the oldest waiters
+            # (priority requests may have pushed in_flight past the limit)
+            self.in_flight -= 1
+            while self._queue and self.in_flight < self.conf["MAX_IN_FLIGHT"]:
+                self._enter(NORMAL)
+                self._queue.popleft().wake()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._queue),
+                "peak_in_flight": self.peak_in_flight,
+                "peak_queue_depth": self.peak_queue,
+                "admitted": dict(self.admitted),
+                "shed": dict(self.shed),
+                "queued": self.queued_total,
+                "queue_wait_ms": {
+                    "mean": self.queue_wait_total_ms / self.queue_wait_count if self.queue_wait_count else 0.0,
+                    "max": self.queue_wait_max_ms,
+                },
+                "recent_latency_ms": self.recent_latency_ms(),
+                "limits": {
+                    "max_in_flight": self.conf["MAX_IN_FLIGHT"],
+                    "max_queue_wait_ms": self.conf["MAX_QUEUE_WAIT_MS"],
+                    "latency_budget_ms": self.conf["LATENCY_BUDGET_MS"],
+                },
+            }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """The worker's admission controller (one per process)."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(admission_settings())
+    return _controller
+
+
+def _service_unavailable(reason):
+    response = JsonResponse({"error": "Server busy, please retry shortly", "reason": reason}, status=503)
+    response["Retry-After"] = str(admission_settings()["RETRY_AFTER"])
+    return response
+
+
+# 🔹 Admission control middleware (works on sync and async stacks)
+@sync_and_async_middleware
+def admission_control_middleware(get_response):
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            controller = get_admission_controller()
+            if not controller.conf["ENABLED"]:
+                return await get_response(request)
+
+            started = time.monotonic()
+            priority = controller.classify(request.path)
+            entered = controller.try_enter(priority)
+            if entered is False:
+                return _service_unavailable("low_priority")
+            if entered is None:
+                waiter = _Waiter(asyncio.get_running_loop())
+                controller.queue(waiter)
+                if not waiter.admitted:
+                    try:
+                        await asyncio.wait_for(
+                            asyncio.shield(waiter.future), controller.conf["MAX_QUEUE_WAIT_MS"] / 1000
+                        )
+                    except asyncio.TimeoutError:
+                        if not controller.give_up(waiter):
+                            return _service_unavailable("queue_timeout")
+                    controller.waited((time.monotonic() - started) * 1000)
+            try:
+                return await get_response(request)
+            finally:
+                controller.leave(priority, started)
+
+        return middleware
+
+    def middleware(request):
+        controller = get_admission_controller()
+        if not controller.conf["ENABLED"]:
+            return get_response(request)
+
+        started = time.monotonic()
+        priority = controller.classify(request.path)
+        entered = controller.try_enter(priority)
+        if entered is False:
+            return _service_unavailable("low_priority")
+        if entered is None:
+            waiter = _Waiter()
+            controller.queue(waiter)
+            if not waiter.admitted:
+                if not waiter.event.wait(controller.conf["MAX_QUEUE_WAIT_MS"] / 1000):
+                    if not controller.give_up(waiter):
+                        return _service_unavailable("queue_timeout")
+                controller.waited((time.monotonic() - started) * 1000)
+        try:
+            return get_response(request)
+        finally:
+            controller.leave(priority, started)
+
+    return middleware
@@ -39,59 +39,94 @@
 #         return wrapper
 #     return decorator
 # middleware.py
+import asyncio
 import jwt
 from django.conf import settings
 from django.http import JsonResponse
 from functools import wraps
 
 
-# 🔹 Authentication Middleware
-def authenticate(view_func):
-    @wraps(view_func)
-    def wrapper(request, *args, **kwargs):
-        auth_header = request.META.get("HTTP_AUTHORIZATION")
+def _authenticate_request(request):
+    """Attach the JWT user dict to the request; returns an error response or None."""
+    auth_header = request.META.get("HTTP_AUTHORIZATION")
+
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return JsonResponse({"message": "Authorization denied"}, status=401)
+
+    try:
+        token = auth_header.split(" ")[1]
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+
+        # Attach user info to request
+        request.user = {
+            "user_id": payload.get("user_id"),
+            "emp_id": payload.get("emp_id"),
+            "email": payload.get("email"),
+            "role": payload.get("role"),
+        }
+        print("[OK] Authenticated user:", request.user)
+
+    except jwt.ExpiredSignatureError:
+        return JsonResponse({"message": "Token expired"}, status=401)
+    except jwt.InvalidTokenError:
+        return JsonResponse({"message": "Invalid token"}, status=401)
+
+    return None
+
+
+def _check_role(request, roles):
+    user = getattr(request, "user", None)
+
+    if not user:
+        return JsonResponse({"message": "User not authenticated"}, status=401)
 
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return JsonResponse({"message": "Authorization denied"}, status=401)
+    if roles and user.get("role") not in roles:
+        return JsonResponse({"message": "You're not authorized"}, status=403)
 
-        try:
-            token = auth_header.split(" ")[1]
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    return None
 
-            # Attach user info to request
-            request.user = {
-                "user_id": payload.get("user_id"),
-                "emp_id": payload.get("emp_id"),
-                "email": payload.get("email"),
-                "role": payload.get("role"),
-            }
-            print("[OK] Authenticated user:", request.user)
 
-        except jwt.ExpiredSignatureError:
-            return JsonResponse({"message": "Token expired"}, status=401)
-        except jwt.InvalidTokenError:
-            return JsonResponse({"message": "Invalid token"}, status=401)
+# 🔹 Authentication Middleware (works on sync and async views)
+def authenticate(view_func):
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            error = _authenticate_request(request)
+            if error is not None:
+                return error
+            return await view_func(request, *args, **kwargs)
+
+        return async_wrapper
 
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        error = _authenticate_request(request)
+        if error is not None:
+            return error
         return view_func(request, *args, **kwargs)
 
     return wrapper
 
 
-# 🔹 Role Restriction Middleware
+# 🔹 Role Restriction Middleware (works on sync and async views)
 def restrict(roles=[]):
     def decorator(view_func):
-        @wraps(view_func)
-        def wrapper(request, *args, **kwargs):
-            user = getattr(request, "user", None)
-
-            if not user:
-                return JsonResponse({"message": "User not authenticated"}, status=401)
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                error = _check_role(request, roles)
+                if error is not None:
+                    return error
+                return await view_func(request, *args, **kwargs)
 
-            if roles and user.get("role") not in roles:
-                return JsonResponse({"message": "You're not authorized"}, status=403)
+            return async_wrapper
 
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            error = _check_role(request, roles)
+            if error is not None:
+                return error
             return view_func(request, *args, **kwargs)
 
         return wrapper
     return decorator
-
@@ -0,0 +1,295 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+
+from .models import RateLimitBucket
+
+
+# Defaults for settings.RATE_LIMITS
+RATE_LIMIT_DEFAULTS = {
+    "ENABLED": True,
+    # "memory" (per process), "db" (shared by all workers) or a dotted class path
+    "STORE": "memory",
+    # Reverse proxies in front of the app that append to X-Forwarded-For.
+    # Anonymous callers are keyed on the address the outermost of them saw;
+    # 0 uses REMOTE_ADDR (no proxy, or one that doesn't forward)
+    "TRUSTED_PROXY_HOPS": 1,
+    # Token bucket per user and class: RATE tokens/second refill, BURST capacity
+    "CLASSES": {
+        "search": {"RATE": 2.0, "BURST": 30},
+        "upload": {"RATE": 0.05, "BURST": 5},
+        "write": {"RATE": 1.0, "BURST": 30},
+    },
+}
+
+
+def rate_limit_settings():
+    conf = {**RATE_LIMIT_DEFAULTS, **getattr(settings, "RATE_LIMITS", {})}
+    conf["CLASSES"] = {**RATE_LIMIT_DEFAULTS["CLASSES"], **conf["CLASSES"]}
+    return conf
+
+
+# ============================================================
+# ✅ Bucket stores
+# ============================================================
+def refill(tokens, updated, now, rate, burst):
+    return min(float(burst), tokens + max(0.0, now - updated) * rate)
+
+
+def retry_after(tokens, rate):
+    """Whole seconds until the bucket holds one token again."""
+    return max(1, math.ceil((1.0 - tokens) / rate)) if rate > 0 else 3600
+
+
+class MemoryBucketStore:
+    """
+    Buckets in this process only (one worker, or limits per worker). Buckets
+    that refilled are dropped every SWEEP_INTERVAL seconds (a full bucket is
+    the same as none), and the least recently used go past MAX_BUCKETS.
+    """
+    name = "memory"
+    local = True
+
+    MAX_BUCKETS = 10000
+    SWEEP_INTERVAL = 60
+
+    def __init__(self):
+        self._buckets = OrderedDict()  # (scope, identity) -> [tokens, updated, rejected, rate, burst]
+        self._lock = threading.Lock()
+        self._swept_at = time.monotonic()
+        self._evicted_rejected = 0
+
+    def take(self, scope, identity, rate, burst):
+        """Take one token. Returns (allowed, retry_after_seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            key = (scope, identity)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if now - self._swept_at >= self.SWEEP_INTERVAL:
+                    self._sweep(now)
+                while len(self._buckets) >= self.MAX_BUCKETS:
+                    self._evict(next(iter(self._buckets)))
+                bucket = self._buckets[key] = [float(burst), now, 0, rate, burst]
+            else:
+                self._buckets.move_to_end(key)
+            bucket[0] = refill(bucket[0], bucket[1], now, rate, burst)
+            bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return True, 0
+            bucket[2] += 1
+            return False, retry_after(bucket[0], rate)
+
+    def _sweep(self, now):
+        self._swept_at = now
+        full = [
+            key for key, (tokens, updated, _, rate, burst) in self._buckets.items()
+            if refill(tokens, updated, now, rate, burst) >= burst
+        ]
+        for key in full:
+            self._evict(key)
+
+    def _evict(self, key):
+        # Rejections of dropped buckets still count towards the total
+        self._evicted_rejected += self._buckets.pop(key)[2]
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def rejections(self):
+        with self._lock:
+            return [
+                {"scope": scope, "identity": identity, "rejected": bucket[2]}
+                for (scope, identity), bucket in self._buckets.items() if bucket[2]
+            ]
+
+    def total_rejected(self):
+        with self._lock:
+            return self._evicted_rejected + sum(bucket[2] for bucket in self._buckets.values())
+
+
+class DatabaseBucketStore:
+    """
+    Buckets in the RateLimitBucket table, shared by every worker. Each
+    worker deletes the buckets that refilled every SWEEP_INTERVAL seconds,
+    except those that rejected requests (their counts are the stats).
+    """
+    name = "db"
+    local = False
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(self):
+        self._swept_at = time.monotonic()
+        self._sweep_lock = threading.Lock()
+
+    def take(self, scope, identity, rate, burst):
+        if time.monotonic() - self._swept_at >= self.SWEEP_INTERVAL:
+            self._sweep()
+        now = time.time()
+        with transaction.atomic():
+            bucket = RateLimitBucket.objects.select_for_update().filter(scope=scope, identity=identity).first()
+            if bucket is None:
+                try:
+                    with transaction.atomic():
+                        RateLimitBucket.objects.create(
+                            scope=scope, identity=identity, tokens=float(burst) - 1.0, updated=now
+                        )
+                    return True, 0
+                except IntegrityError:  # created by a concurrent request
+                    bucket = RateLimitBucket.objects.select_for_update().get(scope=scope, identity=identity)
+
+            bucket.tokens = refill(bucket.tokens, bucket.updated, now, rate, burst)
+            bucket.updated = now
+            allowed = bucket.tokens >= 1.0
+            if allowed:
+                bucket.tokens -= 1.0
+            else:
+                bucket.rejected += 1
+            bucket.save(update_fields=["tokens", "updated", "rejected"])
+        return (True, 0) if allowed else (False, retry_after(bucket.tokens, rate))
+
+    def _sweep(self):
+        if not self._sweep_lock.acquire(blocking=False):
+            return  # another thread is sweeping
+        try:
+            self._swept_at = time.monotonic()
+            now = time.time()
+            for scope, limit in rate_limit_settings()["CLASSES"].items():
+                if limit["RATE"] <= 0:
+                    continue
+                # Full once tokens + (now - updated) * RATE reaches BURST
+                RateLimitBucket.objects.filter(
+                    scope=scope, rejected=0,
+                    updated__lte=now - (float(limit["BURST"]) - F("tokens")) / limit["RATE"],
+                ).delete()
+        finally:
+            self._sweep_lock.release()
+
+    def rejections(self):
+        return list(
+            RateLimitBucket.objects.filter(rejected__gt=0)
+            .order_by("-rejected")
+            .values("scope", "identity", "rejected")
+        )
+
+    def total_rejected(self):
+        return RateLimitBucket.objects.aggregate(total=Sum("rejected"))["total"] or 0
+
+
+STORES = {
+    "memory": "Common.RateLimit.MemoryBucketStore",
+    "db": "Common.RateLimit.DatabaseBucketStore",
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    """The configured bucket store (one instance per process)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = rate_limit_settings()["STORE"]
+                _store = import_string(STORES.get(path, path))()
+    return _store
+
+
+# ============================================================
+# ✅ Who is calling
+# ============================================================
+def request_identity(request):
+    """
+    "emp:<emp_id>" from a valid JWT, else "ip:<client address>". Doesn't
+    reject bad tokens; @authenticate does that where a login is required.
+    The material_api search views are public, so there most callers are
+    keyed by address.
+    """
+    auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+    if auth_header.startswith("Bearer "):
+        try:
+            payload = jwt.decode(auth_header.split(" ")[1], settings.SECRET_KEY, algorithms=["HS256"])
+            if payload.get("emp_id") is not None:
+                return f"emp:{payload['emp_id']}"
+        except jwt.InvalidTokenError:
+            pass
+
+    # Clients can send any X-Forwarded-For; only the entries appended by our
+    # own proxies are trusted, and the outermost one recorded the client
+    hops = rate_limit_settings()["TRUSTED_PROXY_HOPS"]
+    forwarded = [a.strip() for a in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if a.strip()]
+    if hops and len(forwarded) >= hops:
+        address = forwarded[-hops]
+    else:
+        address = request.META.get("REMOTE_ADDR", "")
+    return f"ip:{address}"
+
+
+def _too_many_requests(scope, wait):
+    response = JsonResponse(
+        {"error": f"Too many {scope} requests, retry in {wait} seconds", "retry_after": wait},
+        status=429,
+    )
+    response["Retry-After"] = str(wait)
+    return response
+
+
+def _limit_for(scope):
+    conf = rate_limit_settings()
+    if not conf["ENABLED"]:
+        return None
+    return conf["CLASSES"].get(scope)
+
+
+# 🔹 Rate limit decorator (works on sync and async views)
+def rate_limit(scope):
+    """
+    Token-bucket limit per caller for an endpoint class ("search", "upload",
+    "write"; see settings.RATE_LIMITS). Over-limit requests get 429 with
+    Retry-After.
+    """
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                limit = _limit_for(scope)
+                if limit is not None:
+                    store = get_bucket_store()
+                    bucket = (scope, request_identity(request), limit["RATE"], limit["BURST"])
+                    if store.local:
+                        allowed, wait = store.take(*bucket)
+                    else:
+                        allowed, wait = await sync_to_async(store.take)(*bucket)
+                    if not allowed:
+                        return _too_many_requests(scope, wait)
+                return await view_func(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            limit = _limit_for(scope)
+            if limit is not None:
+                allowed, wait = get_bucket_store().take(
+                    scope, request_identity(request), limit["RATE"], limit["BURST"]
+                )
+                if not allowed:
+                    return _too_many_requests(scope, wait)
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+    return decorator
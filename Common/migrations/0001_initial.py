@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-19 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=20)),
+                ('identity', models.CharField(max_length=100)),
+                ('tokens', models.FloatField()),
+                ('updated', models.FloatField()),
+                ('rejected', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='ratelimitbucket',
+            constraint=models.UniqueConstraint(fields=('scope', 'identity'), name='ratelimitbucket_scope_identity'),
+        ),
+    ]
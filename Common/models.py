@@ -1,3 +1,21 @@
 from django.db import models
 
 # Create your models here.
+
+
+class RateLimitBucket(models.Model):
+    """Token bucket of one caller for one endpoint class (Common.RateLimit, "db" store)."""
+    scope = models.CharField(max_length=20)
+    identity = models.CharField(max_length=100)
+    tokens = models.FloatField()
+    # Unix time of the last refill
+    updated = models.FloatField()
+    rejected = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "identity"], name="ratelimitbucket_scope_identity"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.identity}: {self.tokens:.1f}"
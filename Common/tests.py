@@ -1,3 +1,179 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .Admission import ADMISSION_DEFAULTS, AdmissionController, LOW, NORMAL, PRIORITY, _Waiter
+from .models import RateLimitBucket
+from .RateLimit import DatabaseBucketStore, MemoryBucketStore, request_identity
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# ============================================================
+# ✅ Rate limiting: token buckets
+# ============================================================
+class MemoryBucketStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("Common.RateLimit.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = MemoryBucketStore()
+
+    def test_burst_then_reject_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.store.take("search", "ip:a", 1.0, 3), (True, 0))
+        allowed, wait = self.store.take("search", "ip:a", 1.0, 3)
+        self.assertFalse(allowed)
+        self.assertGreaterEqual(wait, 1)
+        self.assertEqual(self.store.total_rejected(), 1)
+        # Other callers and other scopes have their own buckets
+        self.assertTrue(self.store.take("search", "ip:b", 1.0, 3)[0])
+        self.assertTrue(self.store.take("write", "ip:a", 1.0, 3)[0])
+
+    def test_refill_over_time(self):
+        for _ in range(2):
+            self.store.take("search", "ip:a", 2.0, 2)
+        self.assertFalse(self.store.take("search", "ip:a", 2.0, 2)[0])
+        self.clock.now += 0.5
+        self.assertTrue(self.store.take("search", "ip:a", 2.0, 2)[0])
+        self.assertFalse(self.store.take("search", "ip:a", 2.0, 2)[0])
+
+    def test_sweep_drops_refilled_buckets(self):
+        self.store.take("search", "ip:idle", 1.0, 2)
+        for _ in range(3):
+            self.store.take("search", "ip:busy", 0.001, 2)
+        self.clock.now += MemoryBucketStore.SWEEP_INTERVAL
+        self.store.take("search", "ip:new", 1.0, 2)
+
+        identities = {identity for _, identity in self.store._buckets}
+        self.assertEqual(identities, {"ip:busy", "ip:new"})
+        self.assertEqual(self.store.total_rejected(), 1)
+
+    def test_evicts_least_recently_used_past_max_buckets(self):
+        with mock.patch.object(MemoryBucketStore, "MAX_BUCKETS", 3):
+            for n in range(5):
+                self.store.take("search", f"ip:{n}", 1.0, 2)
+            self.store.take("search", "ip:2", 1.0, 2)
+            self.store.take("search", "ip:5", 1.0, 2)
+
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual([identity for _, identity in self.store._buckets], ["ip:4", "ip:2", "ip:5"])
+
+
+@override_settings(RATE_LIMITS={"CLASSES": {
+    "search": {"RATE": 1.0, "BURST": 2},
+    "upload": {"RATE": 0.001, "BURST": 2},
+}})
+class DatabaseBucketStoreTests(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        for name in ("monotonic", "time"):
+            patcher = mock.patch(f"Common.RateLimit.time.{name}", self.clock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.store = DatabaseBucketStore()
+
+    def test_sweep_drops_refilled_buckets(self):
+        self.store.take("search", "ip:idle", 1.0, 2)
+        for _ in range(3):
+            self.store.take("search", "ip:limited", 1.0, 2)
+        self.store.take("upload", "ip:slow", 0.001, 2)
+        self.clock.now += DatabaseBucketStore.SWEEP_INTERVAL
+        self.store.take("search", "ip:new", 1.0, 2)
+
+        identities = set(RateLimitBucket.objects.values_list("identity", flat=True))
+        # Refilled buckets go unless they rejected requests; ip:slow isn't full yet
+        self.assertEqual(identities, {"ip:limited", "ip:slow", "ip:new"})
+        self.assertEqual(self.store.total_rejected(), 1)
+
+
+class RequestIdentityTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def identity(self, forwarded=None, remote="10.0.0.9"):
+        extra = {"REMOTE_ADDR": remote}
+        if forwarded is not None:
+            extra["HTTP_X_FORWARDED_FOR"] = forwarded
+        return request_identity(self.factory.get("/", **extra))
+
+    def test_uses_address_appended_by_proxy(self):
+        self.assertEqual(self.identity("203.0.113.7"), "ip:203.0.113.7")
+        # A client can't pick its own bucket by sending X-Forwarded-For
+        self.assertEqual(self.identity("1.2.3.4, 203.0.113.7"), "ip:203.0.113.7")
+        self.assertEqual(self.identity("5.6.7.8, 203.0.113.7"), "ip:203.0.113.7")
+
+    def test_without_forwarded_header(self):
+        self.assertEqual(self.identity(), "ip:10.0.0.9")
+
+    @override_settings(RATE_LIMITS={"TRUSTED_PROXY_HOPS": 0})
+    def test_no_trusted_proxy_uses_remote_addr(self):
+        self.assertEqual(self.identity("1.2.3.4"), "ip:10.0.0.9")
+
+    @override_settings(RATE_LIMITS={"TRUSTED_PROXY_HOPS": 2})
+    def test_two_proxies(self):
+        self.assertEqual(self.identity("1.2.3.4, 203.0.113.7, 10.0.0.2"), "ip:203.0.113.7")
+
+
+# ============================================================
+# ✅ Admission control
+# ============================================================
+class AdmissionControllerTests(SimpleTestCase):
+    def setUp(self):
+        self.controller = AdmissionController({**ADMISSION_DEFAULTS, "MAX_IN_FLIGHT": 2})
+
+    def queued(self):
+        waiter = _Waiter()
+        self.controller.queue(waiter)
+        return waiter
+
+    def test_classify(self):
+        self.assertEqual(self.controller.classify("/employee/login/"), PRIORITY)
+        self.assertEqual(self.controller.classify("/itemmaster/list/"), LOW)
+        self.assertEqual(self.controller.classify("/itemmaster/search/"), NORMAL)
+
+    def test_normal_requests_queue_when_full(self):
+        self.assertTrue(self.controller.try_enter(NORMAL))
+        self.assertTrue(self.controller.try_enter(NORMAL))
+        self.assertIsNone(self.controller.try_enter(NORMAL))
+        self.assertFalse(self.controller.try_enter(LOW))
+        waiter = self.queued()
+        self.assertFalse(waiter.admitted)
+
+        self.controller.leave(NORMAL, 0)
+        self.assertTrue(waiter.admitted and waiter.event.is_set())
+        self.assertEqual(self.controller.in_flight, 2)
+
+    def test_priority_overflow_is_not_handed_on(self):
+        self.controller.try_enter(NORMAL)
+        self.controller.try_enter(NORMAL)
+        self.assertTrue(self.controller.try_enter(PRIORITY))
+        self.assertEqual(self.controller.in_flight, 3)
+        first, second = self.queued(), self.queued()
+
+        # Still at the limit after one leaves: nobody is woken
+        self.controller.leave(PRIORITY, 0)
+        self.assertEqual(self.controller.in_flight, 2)
+        self.assertFalse(first.admitted)
+
+        self.controller.leave(NORMAL, 0)
+        self.assertTrue(first.admitted)
+        self.assertFalse(second.admitted)
+        self.assertEqual(self.controller.in_flight, 2)
+        self.assertEqual(self.controller.peak_in_flight, 3)
+
+    def test_give_up_leaves_queue(self):
+        self.controller.try_enter(NORMAL)
+        self.controller.try_enter(NORMAL)
+        waiter = self.queued()
+        self.assertFalse(self.controller.give_up(waiter))
+        self.controller.leave(NORMAL, 0)
+        self.assertEqual(self.controller.in_flight, 1)
+        self.assertEqual(self.controller.stats()["shed"]["queue_timeout"], 1)
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("rate-limits/", views.rate_limit_stats, name="rate_limit_stats"),
+    path("admission/", views.admission_stats, name="admission_stats"),
+]
@@ -1,3 +1,37 @@
-from django.shortcuts import render
+from django.http import JsonResponse
 
-# Create your views here.
+from .Admission import get_admission_controller
+from .Middleware import authenticate, restrict
+from .RateLimit import get_bucket_store, rate_limit_settings
+
+
+# ============================================================
+# ✅ Rate limit rejections (per user and endpoint class)
+# ============================================================
+@authenticate
+@restrict(roles=["Admin", "SuperAdmin"])
+def rate_limit_stats(request):
+    if request.method != "GET":
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+
+    store = get_bucket_store()
+    conf = rate_limit_settings()
+    return JsonResponse({
+        "enabled": conf["ENABLED"],
+        "store": store.name,
+        "classes": conf["CLASSES"],
+        "total_rejected": store.total_rejected(),
+        "rejections": store.rejections(),
+    }, status=200)
+
+
+# ============================================================
+# ✅ Admission control (this worker's queue depth and shed counts)
+# ============================================================
+@authenticate
+@restrict(roles=["Admin", "SuperAdmin"])
+def admission_stats(request):
+    if request.method != "GET":
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+
+    return JsonResponse(get_admission_controller().stats(), status=200)
@@ -25,3 +25,8 @@ application = ProtocolTypeRouter({
         ])
     ),
 })
+
+# Build the in-memory autocomplete / search indexes in the background and
+# start the popularity refresher (the same for WSGI and ASGI workers)
+from material_api.startup import start_background_tasks  # noqa: E402
+start_background_tasks()
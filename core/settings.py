@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'Users',
     'EmailDomain',
     'Company',
@@ -79,6 +80,10 @@ CHANNEL_LAYERS = {
 MIDDLEWARE = [
     # 🔹 MUST be first (before CommonMiddleware)
     "corsheaders.middleware.CorsMiddleware",
+    # Sheds list/export requests with a 503 when the worker is saturated
+    "Common.Admission.admission_control_middleware",
+    # Reads the catalog version (cached search results are keyed by it) once per request
+    "material_api.result_cache.catalog_version_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -91,6 +96,8 @@ MIDDLEWARE = [
 
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+# Lets the frontend read the search fallback flag (material_api)
+CORS_EXPOSE_HEADERS = ["X-Search-Degraded"]
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -191,3 +198,121 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Attribute schema cache (matg_attributes.schema)
+# Seconds a compiled per-MatGroup schema is reused before re-reading it.
+# Writes invalidate it immediately in the worker that made them.
+ATTRIBUTE_SCHEMA_CACHE_TTL = 300
+
+# Seconds attribute facet counts (material_api.facets) stay cached.
+# They are keyed by the catalog version, so committed catalog writes from
+# any worker retire them at once.
+FACET_CACHE_TIMEOUT = 600
+
+# Item search ranking (material_api.ranking). Any key left out uses its
+# default from material_api.ranking.SEARCH_DEFAULTS.
+# BACKEND: "postgres" (tsvector + pg_trgm) or "memory" (in-process BM25 +
+# trigram index). Both need PostgreSQL: migrations create trigram/GIN
+# indexes and attribute filters use JSONB containment.
+MATERIAL_SEARCH = {
+    "BACKEND": "postgres",
+    "TEXT_RANK_WEIGHT": 1.0,
+    "TRIGRAM_WEIGHT": 0.5,
+    "MIN_SCORE": 0.0,
+    "TRIGRAM_SIMILARITY_THRESHOLD": 0.3,
+    "DEFAULT_LIMIT": 50,
+    "MAX_LIMIT": 500,
+    "MAX_GROUP_RESULTS": 100,
+    "STATEMENT_TIMEOUT_MS": 2000,
+    "FALLBACK_TIMEOUT_MS": 1000,
+}
+
+# In-process LRU for material_api search/drill-down responses
+# (material_api.result_cache). Catalog writes invalidate it immediately via
+# a version counter kept in the Django cache.
+SEARCH_RESULT_CACHE = {
+    "MAX_ENTRIES": 1024,
+    "TTL": 300,
+    # Seconds identical concurrent requests wait for the one being computed
+    "COALESCE_TIMEOUT": 10,
+}
+
+# Search query log (material_api.query_log): every search_groups /
+# items_by_group(_and_type) search is queued in memory and written to
+# SearchQueryLog in batches by a background thread. Report:
+# /api/reports/search-queries/ or `manage.py search_query_report`.
+SEARCH_QUERY_LOG = {
+    "ENABLED": True,
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 5,
+    "MAX_QUEUE": 20000,
+    "RETENTION_DAYS": 90,
+}
+
+# Per-worker admission control (Common.Admission): at most MAX_IN_FLIGHT
+# requests run at once; others wait up to MAX_QUEUE_WAIT_MS, except list and
+# export endpoints, which get an immediate 503 while the worker is full or
+# slower than LATENCY_BUDGET_MS. Login, chat and item creation always enter.
+ADMISSION_CONTROL = {
+    "ENABLED": True,
+    "MAX_IN_FLIGHT": 48,
+    "MAX_QUEUE_WAIT_MS": 3000,
+    "LATENCY_BUDGET_MS": 4000,
+}
+
+# Per-user token buckets (Common.RateLimit) for the search, upload and write
+# endpoint classes: RATE tokens/second, up to BURST. STORE "memory" limits
+# per worker process; "db" shares the buckets between workers. Anonymous
+# callers are keyed by the address the platform proxy (TRUSTED_PROXY_HOPS
+# proxies in front) appended to X-Forwarded-For.
+RATE_LIMITS = {
+    "ENABLED": True,
+    "STORE": "memory",
+    "TRUSTED_PROXY_HOPS": 1,
+    "CLASSES": {
+        "search": {"RATE": 2.0, "BURST": 30},
+        "upload": {"RATE": 0.05, "BURST": 5},
+        "write": {"RATE": 1.0, "BURST": 30},
+    },
+}
+
+# Typeahead index (material_api.autocomplete). Built at server startup,
+# updated by signals, and rebuilt in the background every REBUILD_INTERVAL
+# seconds to pick up writes made by other workers.
+AUTOCOMPLETE = {
+    "DEFAULT_LIMIT": 10,
+    "MAX_LIMIT": 50,
+    "SCAN_LIMIT": 5000,
+    "MAX_WORDS": 6,
+    "REBUILD_INTERVAL": 900,
+    "MERGE_THRESHOLD": 1000,
+}
+
+# Stored popularity scores (material_api.popularity): favorites, shares and
+# requests per item / MatGroup, used by search and autocomplete to order
+# otherwise equal matches. Refreshed by every worker every REFRESH_INTERVAL
+# seconds (one at a time); 0 leaves it to `manage.py refresh_popularity`.
+POPULARITY = {
+    "REFRESH_INTERVAL": 3600,
+}
+
+# MatGroup renames (material_api.item_names) rewrite mgrp_long_name/long_name
+# of the group's items with one UPDATE; groups with more than
+# BACKGROUND_THRESHOLD items are updated by a background thread after the
+# save commits. `manage.py backfill_long_names` fills missing names.
+ITEM_NAMES = {
+    "BACKGROUND_THRESHOLD": 5000,
+}
+
+# Similar-items search (material_api.similarity): per-MatGroup TF-IDF matrices
+# of character n-grams, built on first use and updated by signals.
+# create_itemmaster warns about items at or above PRECHECK_THRESHOLD.
+SIMILAR_ITEMS = {
+    "NGRAM_SIZES": (2, 3),
+    "DEFAULT_K": 10,
+    "MAX_K": 50,
+    "MIN_SCORE": 0.3,
+    "PRECHECK_THRESHOLD": 0.85,
+    "REBUILD_INTERVAL": 900,
+}
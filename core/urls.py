@@ -41,4 +41,5 @@ urlpatterns = [
     path("api/", include("material_api.urls")),
     path('uploads/', include('uploads.urls')),
     path('favorites/', include('favorites.urls')),
+    path('common/', include('Common.urls')),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Build the in-memory autocomplete / search indexes in the background and
+# start the popularity refresher (the same for WSGI and ASGI workers)
+from material_api.startup import start_background_tasks  # noqa: E402
+start_background_tasks()
@@ -0,0 +1,42 @@
+from django.http import JsonResponse
+
+from Employee.models import Employee
+from Common.Middleware import authenticate
+from .views import _favorites_queryset, _favorite_row
+
+
+# ============================================================
+# ✅ LIST Favorites (async, same response as views.list_favorites)
+# ============================================================
+@authenticate
+# @restrict(roles=["Admin", "SuperAdmin", "Employee", "MDGT"])
+async def list_favorites(request):
+    if request.method != "GET":
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+
+    try:
+        # Get employee
+        user = getattr(request, 'user', None)
+        if not user or not isinstance(user, dict):
+            return JsonResponse({"error": "User not authenticated"}, status=401)
+
+        emp_id = user.get("emp_id")
+        if not emp_id:
+            return JsonResponse({"error": "Employee ID not found"}, status=400)
+
+        employee = await Employee.objects.filter(emp_id=emp_id).afirst()
+        if not employee:
+            return JsonResponse({"error": "Employee not found"}, status=400)
+
+        # Get only item favorites
+        response_data = [
+            _favorite_row(favorite)
+            async for favorite in _favorites_queryset(employee)
+            if favorite.item
+        ]
+
+        return JsonResponse(response_data, safe=False, status=200)
+
+    except Exception as e:
+        print("ERROR:", e)
+        return JsonResponse({"error": str(e)}, status=500)
@@ -0,0 +1,76 @@
+import contextlib
+import io
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from Employee.models import Employee
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from MaterialType.models import MaterialType
+from . import async_views, views
+from .models import Favorite
+
+
+class SyncAsyncURLConf:
+    urlpatterns = [
+        path("sync/list/", views.list_favorites),
+        path("async/list/", async_views.list_favorites),
+    ]
+
+
+def bearer(emp_id):
+    token = jwt.encode(
+        {"emp_id": emp_id, "role": "Employee", "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+        settings.SECRET_KEY, algorithm="HS256",
+    )
+    return f"Bearer {token}"
+
+
+# ============================================================
+# ✅ Async list_favorites answers like the sync view
+# ============================================================
+@override_settings(ROOT_URLCONF=SyncAsyncURLConf)
+class AsyncListFavoritesTests(TestCase):
+    def setUp(self):
+        self.employee = Employee.objects.create(emp_name="Test Favorites", email="favorites@example.test")
+        self.empty = Employee.objects.create(emp_name="Test Empty", email="empty@example.test")
+        group = MatGroup.objects.create(mgrp_code="TSTVALVE", mgrp_shortname="Valve", mgrp_longname="Valves")
+        other_group = MatGroup.objects.create(mgrp_code="TSTPIPE", mgrp_shortname="Pipe")
+        mat_type = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+        for name, group_, is_deleted in [
+            ("Gate valve", group, False),
+            ("Elbow", other_group, False),
+            ("Removed", group, True),
+        ]:
+            item = ItemMaster.objects.create(mgrp_code=group_, mat_type_code=mat_type, short_name=name)
+            Favorite.objects.create(employee=self.employee, item=item, is_deleted=is_deleted)
+
+    def assertSameResponse(self, authorization=None, method="get"):
+        headers = {"Authorization": authorization} if authorization else {}
+
+        @async_to_sync
+        async def request():
+            return await getattr(self.async_client, method)("/async/list/", headers=headers)
+
+        # The authenticate decorator prints every user it lets through
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync = getattr(self.client, method)("/sync/list/", headers=headers)
+            response = request()
+        self.assertEqual((response.status_code, response.json()), (sync.status_code, sync.json()))
+        return response.json()
+
+    def test_list_favorites(self):
+        rows = self.assertSameResponse(bearer(self.employee.emp_id))
+        self.assertEqual([row["item_desc"] for row in rows], ["Elbow", "Gate valve"])
+        self.assertEqual(self.assertSameResponse(bearer(self.empty.emp_id)), [])
+
+    def test_errors(self):
+        self.assertSameResponse()
+        self.assertSameResponse(bearer(0))
+        self.assertSameResponse(bearer(None))
+        self.assertSameResponse(bearer(self.employee.emp_id), method="post")
@@ -1,12 +1,12 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path("add/", views.add_favorite, name="add_favorite"),
     path("remove/<int:favorite_id>/",
          views.remove_favorite, name="remove_favorite"),
     path("remove/", views.remove_favorite, name="remove_favorite_by_code"),
-    path("list/", views.list_favorites, name="list_favorites"),
+    path("list/", async_views.list_favorites, name="list_favorites"),
     path("share/", views.share_material, name="share_material"),
     path("shared/", views.list_shared_materials, name="list_shared_materials"),
 ]
@@ -8,6 +8,7 @@ from Employee.models import Employee
 from matgroups.models import MatGroup
 from itemmaster.models import ItemMaster
 from Common.Middleware import authenticate
+from Common.RateLimit import rate_limit
 
 
 # Helper function
@@ -20,6 +21,7 @@ def get_employee_name(emp):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "Employee", "MDGT"])
 def add_favorite(request):
     if request.method != "POST":
@@ -119,6 +121,7 @@ def add_favorite(request):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "Employee", "MDGT"])
 def remove_favorite(request, favorite_id=None):
     if request.method != "DELETE" and request.method != "POST":
@@ -194,6 +197,30 @@ def remove_favorite(request, favorite_id=None):
 # ============================================================
 # ✅ LIST Favorites (items only)
 # ============================================================
+def _favorites_queryset(employee):
+    return Favorite.objects.filter(
+        employee=employee,
+        is_deleted=False
+    ).select_related("item", "item__mgrp_code", "item__mat_type_code")
+
+
+def _favorite_row(favorite):
+    return {
+        "id": favorite.id,
+        "local_item_id": favorite.item.local_item_id,
+        "sap_item_id": favorite.item.sap_item_id,
+        "item_desc": favorite.item.short_name,
+        "item_long_name": favorite.item.long_name,
+        "mgrp_code": favorite.item.mgrp_code.mgrp_code if favorite.item.mgrp_code else None,
+        "mgrp_shortname": favorite.item.mgrp_code.mgrp_shortname if favorite.item.mgrp_code else None,
+        "mgrp_longname": favorite.item.mgrp_code.mgrp_longname if favorite.item.mgrp_code else None,
+        "mat_type_code": favorite.item.mat_type_code.mat_type_code if favorite.item.mat_type_code else None,
+        "mat_type_desc": favorite.item.mat_type_code.mat_type_desc if favorite.item.mat_type_code else None,
+        "created": favorite.created.strftime("%Y-%m-%d %H:%M:%S"),
+        "updated": favorite.updated.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
 @authenticate
 # @restrict(roles=["Admin", "SuperAdmin", "Employee", "MDGT"])
 def list_favorites(request):
@@ -215,28 +242,11 @@ def list_favorites(request):
             return JsonResponse({"error": "Employee not found"}, status=400)
 
         # Get only item favorites
-        favorites = Favorite.objects.filter(
-            employee=employee,
-            is_deleted=False
-        ).select_related("item", "item__mgrp_code", "item__mat_type_code")
-
-        response_data = []
-        for favorite in favorites:
-            if favorite.item:
-                response_data.append({
-                    "id": favorite.id,
-                    "local_item_id": favorite.item.local_item_id,
-                    "sap_item_id": favorite.item.sap_item_id,
-                    "item_desc": favorite.item.short_name,
-                    "item_long_name": favorite.item.long_name,
-                    "mgrp_code": favorite.item.mgrp_code.mgrp_code if favorite.item.mgrp_code else None,
-                    "mgrp_shortname": favorite.item.mgrp_code.mgrp_shortname if favorite.item.mgrp_code else None,
-                    "mgrp_longname": favorite.item.mgrp_code.mgrp_longname if favorite.item.mgrp_code else None,
-                    "mat_type_code": favorite.item.mat_type_code.mat_type_code if favorite.item.mat_type_code else None,
-                    "mat_type_desc": favorite.item.mat_type_code.mat_type_desc if favorite.item.mat_type_code else None,
-                    "created": favorite.created.strftime("%Y-%m-%d %H:%M:%S"),
-                    "updated": favorite.updated.strftime("%Y-%m-%d %H:%M:%S")
-                })
+        response_data = [
+            _favorite_row(favorite)
+            for favorite in _favorites_queryset(employee)
+            if favorite.item
+        ]
 
         return JsonResponse(response_data, safe=False, status=200)
 
@@ -250,6 +260,7 @@ def list_favorites(request):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 def share_material(request):
     if request.method != "POST":
         return JsonResponse({"error": "Invalid request method"}, status=405)
@@ -0,0 +1,94 @@
+from django.db import transaction
+
+from matg_attributes.schema import get_attribute_schema
+from .models import ItemAttributeNumber
+from .units import in_unit, parse_numeric_value, to_canonical
+
+
+# ============================================================
+# ✅ Numeric attribute side table (ItemAttributeNumber)
+# ============================================================
+def numeric_attributes_for_group(mgrp_code):
+    """
+    Return {attribute_name: default_uom} for the numeric attributes of a
+    MatGroup. The default UOM is the first one listed on the attribute.
+    """
+    return get_attribute_schema(mgrp_code).numeric_attributes()
+
+
+def build_attribute_numbers(item, numeric_attrs):
+    """Build (unsaved) ItemAttributeNumber rows for one item."""
+    rows = []
+    attributes = item.attributes if isinstance(item.attributes, dict) else {}
+
+    for name, raw in attributes.items():
+        if name not in numeric_attrs:
+            continue
+
+        default_uom = numeric_attrs[name]
+        parsed = parse_numeric_value(raw, default_uom=default_uom)
+        if parsed is None:
+            continue
+
+        number, raw_uom = parsed
+        value, uom = to_canonical(number, raw_uom)
+        # Attributes without a UOM compare bounds with whatever was stored
+        default_value = in_unit(value, uom, default_uom) if default_uom else value
+        raw_value = raw.get("value") if isinstance(raw, dict) else raw
+        rows.append(ItemAttributeNumber(
+            item_id=item.pk,
+            attribute_name=name,
+            value=value,
+            uom=uom,
+            default_value=default_value,
+            raw_value=str(raw_value)[:100],
+            raw_uom=(raw_uom or "")[:50],
+        ))
+    return rows
+
+
+def sync_item_attribute_numbers(item, numeric_attrs=None):
+    """Replace the numeric side-table rows of a single item."""
+    if numeric_attrs is None:
+        numeric_attrs = numeric_attributes_for_group(item.mgrp_code_id)
+
+    rows = build_attribute_numbers(item, numeric_attrs)
+    with transaction.atomic():
+        ItemAttributeNumber.objects.filter(item_id=item.pk).delete()
+        if rows:
+            ItemAttributeNumber.objects.bulk_create(rows)
+    return len(rows)
+
+
+def rebuild_attribute_numbers(items, batch_size=1000):
+    """
+    Rebuild the side table for an ItemMaster queryset, e.g. after bulk
+    uploads or after an attribute's validation/UOM changed.
+    """
+    numeric_by_group = {}
+    total = 0
+    batch = []
+    item_ids = []
+
+    def flush():
+        with transaction.atomic():
+            ItemAttributeNumber.objects.filter(item_id__in=item_ids).delete()
+            ItemAttributeNumber.objects.bulk_create(batch)
+        batch.clear()
+        item_ids.clear()
+
+    for item in items.only("local_item_id", "mgrp_code", "attributes").iterator(chunk_size=batch_size):
+        if item.mgrp_code_id not in numeric_by_group:
+            numeric_by_group[item.mgrp_code_id] = numeric_attributes_for_group(item.mgrp_code_id)
+
+        rows = build_attribute_numbers(item, numeric_by_group[item.mgrp_code_id])
+        item_ids.append(item.pk)
+        batch.extend(rows)
+        total += len(rows)
+
+        if len(item_ids) >= batch_size:
+            flush()
+
+    if item_ids:
+        flush()
+    return total
@@ -0,0 +1,141 @@
+import math
+
+from django.db.models import Q
+
+from .models import ItemAttributeNumber
+from .units import to_canonical
+
+
+# Query params of the form ?attr.Material=SS316&attr.Rating=150%23
+ATTRIBUTE_PARAM_PREFIX = "attr."
+
+# Range params: ?attr.Size__min=20&attr.Size__max=30&attr.Size__uom=mm
+RANGE_SUFFIXES = ("__min", "__max", "__uom")
+
+
+# ============================================================
+# ✅ Parse attribute filters from query params
+# ============================================================
+def parse_attribute_filters(params):
+    """
+    Collect ``attr.<name>=<value>`` query params into {name: [values]}.
+    Repeating a param (attr.Material=SS304&attr.Material=SS316) means "any of".
+    """
+    filters = {}
+    for key in params.keys():
+        if not key.startswith(ATTRIBUTE_PARAM_PREFIX):
+            continue
+
+        name = key[len(ATTRIBUTE_PARAM_PREFIX):].strip()
+        if not name or name.endswith(RANGE_SUFFIXES):
+            continue
+
+        values = [v.strip() for v in params.getlist(key) if v and v.strip()]
+        if values:
+            filters[name] = values
+    return filters
+
+
+# ============================================================
+# ✅ Translate attribute filters into JSONB containment
+# ============================================================
+def attribute_filter_q(filters):
+    """
+    Build a Q object matching every attribute in ``filters``.
+
+    Attributes are stored either as {"Name": "value"} or as
+    {"Name": {"value": "value", "uom": "mm"}} (upload phase 2), so each value
+    is matched against both shapes. Both are ``attributes @> ...`` lookups
+    and are served by the GIN index on ItemMaster.attributes.
+    """
+    q = Q()
+    for name, values in filters.items():
+        any_value = Q()
+        for value in values:
+            any_value |= Q(attributes__contains={name: value})
+            any_value |= Q(attributes__contains={name: {"value": value}})
+        q &= any_value
+    return q
+
+
+# ============================================================
+# ✅ Numeric range filters (served by ItemAttributeNumber)
+# ============================================================
+def parse_range_filters(params):
+    """
+    Collect ``attr.<name>__min`` / ``__max`` / ``__uom`` params into
+    {name: {"min": float|None, "max": float|None, "uom": str}}.
+    Raises ValueError for bounds that are not finite numbers.
+    """
+    ranges = {}
+    for key in params.keys():
+        if not key.startswith(ATTRIBUTE_PARAM_PREFIX):
+            continue
+
+        name = key[len(ATTRIBUTE_PARAM_PREFIX):].strip()
+        for suffix in RANGE_SUFFIXES:
+            if not name.endswith(suffix):
+                continue
+
+            attr_name = name[:-len(suffix)].strip()
+            raw = (params.get(key) or "").strip()
+            if not attr_name or not raw:
+                break
+
+            bounds = ranges.setdefault(attr_name, {"min": None, "max": None, "uom": ""})
+            if suffix == "__uom":
+                bounds["uom"] = raw
+            else:
+                try:
+                    bound = float(raw)
+                except ValueError:
+                    bound = math.nan
+                if not math.isfinite(bound):
+                    raise ValueError(f"'{key}' must be a number")
+                bounds[suffix[2:]] = bound
+            break
+
+    return {name: b for name, b in ranges.items() if b["min"] is not None or b["max"] is not None}
+
+
+def attribute_range_q(ranges):
+    """
+    Build a Q object for numeric ranges. Bounds are converted to the
+    canonical unit so "20..30 mm" also matches values stored as "2.5 cm".
+    Bounds without ``__uom`` are in the attribute's default UOM, which can
+    differ between groups ("Size" in mm for one, in inches for another), so
+    they are matched against ``default_value``. Builds no queries itself.
+    """
+    q = Q()
+    for name, bounds in ranges.items():
+        numbers = ItemAttributeNumber.objects.filter(attribute_name=name)
+        uom = bounds["uom"]
+        field = "value" if uom else "default_value"
+
+        canonical_uom = None
+        if bounds["min"] is not None:
+            value, canonical_uom = to_canonical(bounds["min"], uom)
+            numbers = numbers.filter(**{f"{field}__gte": value})
+        if bounds["max"] is not None:
+            value, canonical_uom = to_canonical(bounds["max"], uom)
+            numbers = numbers.filter(**{f"{field}__lte": value})
+        if uom:
+            numbers = numbers.filter(uom=canonical_uom)
+
+        q &= Q(local_item_id__in=numbers.values("item_id"))
+    return q
+
+
+def apply_attribute_filters(queryset, params):
+    """
+    Narrow an ItemMaster queryset by any ``attr.<name>`` value params and
+    ``attr.<name>__min`` / ``__max`` range params present.
+    """
+    filters = parse_attribute_filters(params)
+    if filters:
+        queryset = queryset.filter(attribute_filter_q(filters))
+
+    ranges = parse_range_filters(params)
+    if ranges:
+        queryset = queryset.filter(attribute_range_q(ranges))
+    return queryset
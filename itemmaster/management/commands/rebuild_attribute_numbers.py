@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from itemmaster.models import ItemMaster
+from itemmaster.attribute_index import rebuild_attribute_numbers
+
+
+class Command(BaseCommand):
+    help = "Rebuild the numeric attribute side table (ItemAttributeNumber) used by range filters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mgrp-code", help="Only rebuild items of this MatGroup")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        items = ItemMaster.objects.all()
+        if options["mgrp_code"]:
+            items = items.filter(mgrp_code=options["mgrp_code"])
+
+        total = rebuild_attribute_numbers(items, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} numeric attribute value(s)"))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 04:10
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0010_alter_itemmaster_sap_item_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itemmaster',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['attributes'], name='itemmaster_attributes_gin'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-19 04:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0011_itemmaster_attributes_gin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemAttributeNumber',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('attribute_name', models.CharField(max_length=150)),
+                ('value', models.FloatField()),
+                ('uom', models.CharField(blank=True, default='', max_length=20)),
+                ('raw_value', models.CharField(blank=True, default='', max_length=100)),
+                ('raw_uom', models.CharField(blank=True, default='', max_length=50)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='numeric_attributes', to='itemmaster.itemmaster')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='itemattributenumber',
+            index=models.Index(fields=['attribute_name', 'uom', 'value'], name='itemattrnum_name_uom_value'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='itemattributenumber',
+            unique_together={('item', 'attribute_name')},
+        ),
+    ]
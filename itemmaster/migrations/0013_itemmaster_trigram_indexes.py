@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-19 04:20
+
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0012_itemattributenumber'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='itemmaster',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['short_name'], name='itemmaster_short_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='itemmaster',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='itemmaster_search_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0013_itemmaster_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemmaster',
+            name='popularity',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
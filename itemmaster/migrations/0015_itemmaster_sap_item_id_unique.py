@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 05:03
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+def check_duplicate_sap_ids(apps, schema_editor):
+    ItemMaster = apps.get_model("itemmaster", "ItemMaster")
+    duplicates = (
+        ItemMaster.objects.filter(is_deleted=False, sap_item_id__isnull=False)
+        .values("sap_item_id").annotate(n=models.Count("pk")).filter(n__gt=1)
+    )
+    count = duplicates.count()
+    if count:
+        raise RuntimeError(
+            f"{count} SAP id(s) are used by more than one non-deleted item. "
+            "List them with `manage.py sap_id_conflicts`, fix or delete the "
+            "extra items, then run this migration again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0014_itemmaster_popularity'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_sap_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='itemmaster',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.comparison.Cast('sap_item_id', output_field=models.TextField()), name='text_pattern_ops'), condition=models.Q(('is_deleted', False)), name='itemmaster_sap_item_id_prefix'),
+        ),
+        migrations.AddConstraint(
+            model_name='itemmaster',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False), ('sap_item_id__isnull', False)), fields=('sap_item_id',), name='itemmaster_sap_item_id_unique'),
+        ),
+    ]
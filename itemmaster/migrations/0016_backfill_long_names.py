@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import F, Q
+
+from itemmaster.names import fill_missing_long_names
+
+
+def backfill_long_names(apps, schema_editor):
+    # list_itemmasters returns the stored long_name, so rows saved without
+    # one get it here (one UPDATE per group)
+    ItemMaster = apps.get_model("itemmaster", "ItemMaster")
+    MatGroup = apps.get_model("matgroups", "MatGroup")
+    missing = Q(long_name__isnull=True) | Q(long_name="")
+    groups = MatGroup.objects.filter(
+        mgrp_code__in=ItemMaster.objects.filter(missing).values("mgrp_code")
+    ).values_list("mgrp_code", "mgrp_longname")
+    for mgrp_code, mgrp_longname in groups:
+        fill_missing_long_names(mgrp_code, mgrp_longname, model=ItemMaster)
+
+    # Items without a group: long_name is just the short_name
+    (
+        ItemMaster.objects.filter(missing, mgrp_code__isnull=True)
+        .exclude(Q(short_name__isnull=True) | Q(short_name=""))
+        .update(long_name=F("short_name"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0015_itemmaster_sap_item_id_unique'),
+        ('matgroups', '0013_matgroup_popularity'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_long_names, migrations.RunPython.noop),
+    ]
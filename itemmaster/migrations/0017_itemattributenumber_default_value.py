@@ -0,0 +1,180 @@
+import math
+import re
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+# Frozen copy of itemmaster.units / attribute_index.build_attribute_numbers
+# as of this migration, so later changes to them don't change what it does
+UNIT_CONVERSIONS = {
+    "mm": ("mm", 1.0), "cm": ("mm", 10.0), "m": ("mm", 1000.0), "km": ("mm", 1000000.0),
+    "in": ("mm", 25.4), "inch": ("mm", 25.4), "inches": ("mm", 25.4), '"': ("mm", 25.4),
+    "ft": ("mm", 304.8), "feet": ("mm", 304.8),
+    "mg": ("kg", 0.000001), "g": ("kg", 0.001), "gm": ("kg", 0.001), "kg": ("kg", 1.0),
+    "t": ("kg", 1000.0), "ton": ("kg", 1000.0), "lb": ("kg", 0.45359237), "lbs": ("kg", 0.45359237),
+    "ml": ("l", 0.001), "l": ("l", 1.0), "ltr": ("l", 1.0), "litre": ("l", 1.0), "liter": ("l", 1.0),
+    "m3": ("l", 1000.0),
+    "bar": ("bar", 1.0), "mbar": ("bar", 0.001), "kpa": ("bar", 0.01), "mpa": ("bar", 10.0),
+    "psi": ("bar", 0.0689475729), "kg/cm2": ("bar", 0.980665),
+    "v": ("v", 1.0), "kv": ("v", 1000.0), "a": ("a", 1.0), "w": ("w", 1.0), "kw": ("w", 1000.0),
+    "sqmm": ("sqmm", 1.0), "mm2": ("sqmm", 1.0),
+}
+CASE_SENSITIVE_UNITS = {
+    "mV": ("v", 0.001), "MV": ("v", 1000000.0),
+    "mA": ("a", 0.001), "MA": ("a", 1000000.0),
+    "mW": ("w", 0.001), "MW": ("w", 1000000.0),
+}
+AMBIGUOUS_UNITS = {u.lower() for u in CASE_SENSITIVE_UNITS}
+NUMERIC_VALIDATIONS = {"numeric", "decimal", "integer", "wholenumber"}
+NUMBER_RE = re.compile(
+    r"^\s*(?P<number>[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:\s*/\s*\d+)?)\s*(?P<uom>.*?)\s*$"
+)
+
+
+def split_uoms(uom):
+    if not uom:
+        return []
+    if isinstance(uom, list):
+        return [str(u).strip() for u in uom if str(u).strip()]
+    return [u.strip() for u in str(uom).split(",") if u.strip()]
+
+
+def is_numeric_attribute(validation, uom):
+    if validation and validation.lower().strip() in NUMERIC_VALIDATIONS:
+        return True
+    return bool(split_uoms(uom))
+
+
+def to_float(number):
+    if "/" in number:
+        numerator, denominator = [n.strip() for n in number.split("/", 1)]
+        value = float(numerator) / float(denominator)
+    else:
+        value = float(number)
+    if not math.isfinite(value):
+        raise ValueError(f"{number!r} is not a finite number")
+    return value
+
+
+def to_canonical(number, uom):
+    uom = (uom or "").strip()
+    if not uom:
+        return number, ""
+    if uom in CASE_SENSITIVE_UNITS:
+        canonical, factor = CASE_SENSITIVE_UNITS[uom]
+        return number * factor, canonical
+    key = uom.lower()
+    if key in AMBIGUOUS_UNITS:
+        return number, uom
+    canonical, factor = UNIT_CONVERSIONS.get(key, (key, 1.0))
+    return number * factor, canonical
+
+
+def in_unit(value, canonical_uom, uom):
+    factor, target = to_canonical(1.0, uom)
+    if target != canonical_uom:
+        return None
+    return value / factor
+
+
+def parse_numeric_value(value, default_uom=None):
+    uom = None
+    if isinstance(value, dict):
+        uom = value.get("uom")
+        value = value.get("value")
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            return None
+        return float(value), (uom or default_uom or "")
+    match = NUMBER_RE.match(str(value))
+    if not match:
+        return None
+    try:
+        number = to_float(match.group("number"))
+    except (ValueError, ZeroDivisionError):
+        return None
+    return number, (uom or match.group("uom") or default_uom or "")
+
+
+def build_attribute_numbers(item, numeric_attrs, model):
+    rows = []
+    attributes = item.attributes if isinstance(item.attributes, dict) else {}
+    for name, raw in attributes.items():
+        if name not in numeric_attrs:
+            continue
+        default_uom = numeric_attrs[name]
+        parsed = parse_numeric_value(raw, default_uom=default_uom)
+        if parsed is None:
+            continue
+        number, raw_uom = parsed
+        value, uom = to_canonical(number, raw_uom)
+        default_value = in_unit(value, uom, default_uom) if default_uom else value
+        raw_value = raw.get("value") if isinstance(raw, dict) else raw
+        rows.append(model(
+            item_id=item.pk,
+            attribute_name=name,
+            value=value,
+            uom=uom,
+            default_value=default_value,
+            raw_value=str(raw_value)[:100],
+            raw_uom=(raw_uom or "")[:50],
+        ))
+    return rows
+
+
+def backfill_attribute_numbers(apps, schema_editor):
+    # Range filters only see items that have ItemAttributeNumber rows (items
+    # saved before 0012 have none), and existing rows need default_value
+    ItemMaster = apps.get_model("itemmaster", "ItemMaster")
+    ItemAttributeNumber = apps.get_model("itemmaster", "ItemAttributeNumber")
+    MatgAttributeItem = apps.get_model("matg_attributes", "MatgAttributeItem")
+
+    # {mgrp_code: {attribute_name: default_uom}}, as AttributeSchema.numeric_attributes()
+    numeric_by_group = {}
+    definitions = MatgAttributeItem.objects.filter(is_deleted=False).values_list(
+        "mgrp_code_id", "attribute_name", "uom", "validation"
+    )
+    for mgrp_code, name, uom, validation in definitions:
+        if is_numeric_attribute(validation, uom):
+            uoms = split_uoms(uom)
+            numeric_by_group.setdefault(mgrp_code, {})[name] = uoms[0] if uoms else ""
+
+    ItemAttributeNumber.objects.all().delete()
+    items = (
+        ItemMaster.objects.filter(mgrp_code__in=list(numeric_by_group))
+        .only("local_item_id", "mgrp_code", "attributes")
+    )
+    batch = []
+    for item in items.iterator(chunk_size=BATCH_SIZE):
+        batch.extend(build_attribute_numbers(item, numeric_by_group[item.mgrp_code_id], model=ItemAttributeNumber))
+        if len(batch) >= BATCH_SIZE:
+            ItemAttributeNumber.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ItemAttributeNumber.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0016_backfill_long_names'),
+        ('matg_attributes', '0006_matgattributeusage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemattributenumber',
+            name='default_value',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='itemattributenumber',
+            index=models.Index(fields=['attribute_name', 'default_value'], name='itemattrnum_name_default'),
+        ),
+        migrations.RunPython(backfill_attribute_numbers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-19 05:51
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0017_itemattributenumber_default_value'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='itemmaster',
+            name='itemmaster_sap_item_id_prefix',
+        ),
+        migrations.AddIndex(
+            model_name='itemmaster',
+            index=models.Index(django.db.models.functions.comparison.Collate(django.db.models.functions.comparison.Cast('sap_item_id', output_field=models.TextField()), 'C'), condition=models.Q(('is_deleted', False)), name='itemmaster_sap_item_id_prefix'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-19 05:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0018_sap_item_id_prefix_collate_c'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itemmaster',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('short_name', 'search_text', config='english'), name='itemmaster_search_vector_gin'),
+        ),
+    ]
@@ -40,6 +40,10 @@
 #     def __str__(self):
 #         return f"{self.local_item_id} - {self.item_desc}"
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Cast, Collate
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.utils import timezone
 from Employee.models import Employee
 
@@ -89,6 +93,10 @@ class ItemMaster(models.Model):
     # -----------------------------
     is_final = models.BooleanField(default=False)
 
+    # Favorites + shares + requests referencing the item, refreshed
+    # periodically by material_api.popularity (search tiebreaker)
+    popularity = models.IntegerField(default=0, db_index=True)
+
     created = models.DateTimeField(auto_now_add=True)
     createdby = models.ForeignKey(
         Employee,
@@ -113,3 +121,72 @@ class ItemMaster(models.Model):
     class Meta:
         verbose_name = "Item Master"
         verbose_name_plural = "Item Masters"
+        indexes = [
+            # Serves attribute filters (attributes @> ...) and has_key checks
+            GinIndex(fields=["attributes"], name="itemmaster_attributes_gin"),
+            # Trigram candidate prefilter for the hybrid item search (short_name % query)
+            GinIndex(fields=["short_name"], name="itemmaster_short_name_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["search_text"], name="itemmaster_search_text_trgm", opclasses=["gin_trgm_ops"]),
+            # Full-text candidates for the same search (words split across both fields)
+            GinIndex(
+                SearchVector("short_name", "search_text", config="english"),
+                name="itemmaster_search_vector_gin",
+            ),
+            # SAP id prefix search (sap_item_id::text LIKE '123%' ORDER BY it). The C
+            # collation serves both the prefix range and the ordering
+            models.Index(
+                Collate(Cast("sap_item_id", output_field=models.TextField()), "C"),
+                condition=Q(is_deleted=False),
+                name="itemmaster_sap_item_id_prefix",
+            ),
+        ]
+        constraints = [
+            # One live item per SAP id; also the index for sap_item_id lookups
+            models.UniqueConstraint(
+                fields=["sap_item_id"],
+                condition=Q(is_deleted=False, sap_item_id__isnull=False),
+                name="itemmaster_sap_item_id_unique",
+            ),
+        ]
+
+
+class ItemAttributeNumber(models.Model):
+    """
+    Typed copy of the numeric values in ItemMaster.attributes, converted to a
+    canonical unit at write time so range filters run as index range scans.
+    """
+    id = models.AutoField(primary_key=True)
+    item = models.ForeignKey(
+        ItemMaster,
+        on_delete=models.CASCADE,
+        related_name="numeric_attributes"
+    )
+    attribute_name = models.CharField(max_length=150)
+
+    # Canonical value + unit (e.g. 25.0 "mm" for "2.5 cm")
+    value = models.FloatField()
+    uom = models.CharField(max_length=20, blank=True, default="")
+
+    # Value in the attribute's default UOM (null when it doesn't convert),
+    # for range bounds given without __uom
+    default_value = models.FloatField(null=True, blank=True)
+
+    # Value as entered, for reference
+    raw_value = models.CharField(max_length=100, blank=True, default="")
+    raw_uom = models.CharField(max_length=50, blank=True, default="")
+
+    def __str__(self):
+        return f"{self.item_id} - {self.attribute_name}: {self.value} {self.uom}"
+
+    class Meta:
+        unique_together = ("item", "attribute_name")
+        indexes = [
+            models.Index(
+                fields=["attribute_name", "uom", "value"],
+                name="itemattrnum_name_uom_value"
+            ),
+            models.Index(
+                fields=["attribute_name", "default_value"],
+                name="itemattrnum_name_default"
+            ),
+        ]
@@ -0,0 +1,86 @@
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.db.models.functions import Concat, Left, NullIf
+from django.db.models.lookups import IsNull
+
+from .models import ItemMaster
+
+
+# ItemMaster.long_name is a varchar(250); code + group name + short_name can exceed it
+LONG_NAME_MAX_LENGTH = ItemMaster._meta.get_field("long_name").max_length
+
+
+# ============================================================
+# ✅ Denormalized names (mgrp_long_name / long_name)
+# ============================================================
+def format_long_name(mgrp_code, mgrp_long_name, short_name):
+    """Format long_name as 'mgrp_code, mgrp_long_name, short_name'"""
+    parts = []
+    if mgrp_code:
+        parts.append(str(mgrp_code))
+    if mgrp_long_name:
+        parts.append(str(mgrp_long_name))
+    if short_name:
+        parts.append(str(short_name))
+    return ", ".join(parts)[:LONG_NAME_MAX_LENGTH]
+
+
+def _name_part(value):
+    """', <value>' or '' when empty; ``value`` is a string or an expression."""
+    if value is None or isinstance(value, str):
+        return Value(f", {value}" if value else "")
+    value = NullIf(value, Value(""))
+    return Case(
+        When(IsNull(value, True), then=Value("")),
+        default=Concat(Value(", "), value, output_field=CharField()),
+        output_field=CharField(),
+    )
+
+
+def long_name_expression(mgrp_code, mgrp_long_name):
+    """
+    SQL expression giving format_long_name(mgrp_code, mgrp_long_name,
+    short_name) for each row of one group, so UPDATEs can set it in bulk.
+    ``mgrp_long_name`` is a string or an expression (e.g. F("mgrp_long_name")).
+    """
+    return Left(
+        Concat(
+            Value(str(mgrp_code)), _name_part(mgrp_long_name), _name_part(F("short_name")),
+            output_field=CharField(),
+        ),
+        LONG_NAME_MAX_LENGTH,
+    )
+
+
+def sync_group_item_names(mgrp_code, mgrp_long_name, previous=None):
+    """
+    Set mgrp_long_name to the group's ``mgrp_long_name`` on all its items,
+    and rewrite long_name where it is still the generated one (built from
+    ``previous`` or from the item's stored mgrp_long_name); long_names
+    entered by hand are kept. One UPDATE; returns the number of items changed.
+    """
+    generated = Q(long_name=long_name_expression(mgrp_code, F("mgrp_long_name")))
+    if previous is not None:
+        generated |= Q(long_name=long_name_expression(mgrp_code, previous))
+    long_name = long_name_expression(mgrp_code, mgrp_long_name)
+    return (
+        ItemMaster.objects.filter(mgrp_code=mgrp_code)
+        .filter(generated | ~Q(mgrp_long_name=mgrp_long_name))
+        .exclude(Q(mgrp_long_name=mgrp_long_name) & Q(long_name=long_name))
+        .update(
+            mgrp_long_name=mgrp_long_name,
+            long_name=Case(When(generated, then=long_name), default=F("long_name")),
+        )
+    )
+
+
+def fill_missing_long_names(mgrp_code, mgrp_long_name, model=ItemMaster):
+    """
+    Set long_name on the group's items that have none (syncing their
+    mgrp_long_name too), in one UPDATE. Returns the number of items changed.
+    ``model`` lets data migrations pass their historical ItemMaster.
+    """
+    return (
+        model.objects.filter(mgrp_code=mgrp_code)
+        .filter(Q(long_name__isnull=True) | Q(long_name=""))
+        .update(mgrp_long_name=mgrp_long_name, long_name=long_name_expression(mgrp_code, mgrp_long_name))
+    )
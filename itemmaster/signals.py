@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+
+from matg_attributes.models import MatgAttributeItem
+from .models import ItemMaster
+from .attribute_index import sync_item_attribute_numbers, rebuild_attribute_numbers
+
+
+# Fields whose previous values post_save receivers need to see
+TRACKED_FIELDS = ("mgrp_code", "mat_type_code", "attributes", "is_deleted", "is_final")
+
+# MatgAttributeItem fields that decide which values ItemAttributeNumber holds
+NUMERIC_ATTRIBUTE_FIELDS = ("attribute_name", "uom", "validation", "is_deleted")
+
+
+# ============================================================
+# ✅ Keep derived attribute data in step with ItemMaster writes
+# ============================================================
+@receiver(pre_save, sender=ItemMaster)
+def itemmaster_pre_save(sender, instance, raw=False, **kwargs):
+    # Snapshot the stored row so post_save receivers can tell what changed
+    # (e.g. the group an item moved out of). None for new items.
+    instance._previous_state = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_state = (
+        ItemMaster.objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=ItemMaster)
+def itemmaster_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # The rows depend only on the attributes and the group's schema
+    previous = getattr(instance, "_previous_state", None)
+    if (
+        previous is not None
+        and previous["attributes"] == instance.attributes
+        and previous["mgrp_code"] == instance.mgrp_code_id
+    ):
+        return
+    sync_item_attribute_numbers(instance)
+
+
+@receiver(pre_save, sender=MatgAttributeItem)
+def matgattribute_pre_save(sender, instance, raw=False, **kwargs):
+    instance._previous_numeric = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_numeric = (
+        MatgAttributeItem.objects.filter(pk=instance.pk).values(*NUMERIC_ATTRIBUTE_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=MatgAttributeItem)
+def matgattribute_saved(sender, instance, raw=False, **kwargs):
+    # A changed validation/UOM can turn an attribute numeric (or not), so
+    # re-index the group's items that carry it. Other edits (possible
+    # values, print priority) leave the side table alone.
+    if raw:
+        return
+    # matg_attributes.signals drops the cached schema (before this rebuild runs)
+    previous = getattr(instance, "_previous_numeric", None)
+    current = {field: getattr(instance, field) for field in NUMERIC_ATTRIBUTE_FIELDS}
+    if previous == current:
+        return
+    names = {instance.attribute_name}
+    if previous:
+        names.add(previous["attribute_name"])
+
+    mgrp_code = instance.mgrp_code_id
+    transaction.on_commit(lambda: rebuild_attribute_numbers(
+        ItemMaster.objects.filter(mgrp_code=mgrp_code, attributes__has_any_keys=sorted(names))
+    ))
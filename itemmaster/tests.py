@@ -1,3 +1,262 @@
-from django.test import TestCase
+from django.db import connection, IntegrityError, transaction
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from matg_attributes.models import MatgAttributeItem
+from matg_attributes.schema import invalidate_attribute_schema
+from matgroups.models import MatGroup
+from MaterialType.models import MaterialType
+from .filters import apply_attribute_filters, parse_attribute_filters, parse_range_filters
+from .models import ItemAttributeNumber, ItemMaster
+from .names import format_long_name, LONG_NAME_MAX_LENGTH
+from .units import parse_numeric_value, to_canonical
+
+
+# ============================================================
+# ✅ MatGroup renames → item names
+# ============================================================
+class GroupRenameTests(TestCase):
+    def setUp(self):
+        self.group = MatGroup.objects.create(mgrp_code="TSTVALVE", mgrp_shortname="Valve", mgrp_longname="Gate Valves")
+        self.mat_type = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+
+    def item(self, short_name, long_name=None, **fields):
+        if long_name is None:
+            long_name = format_long_name(self.group.mgrp_code, self.group.mgrp_longname, short_name)
+        return ItemMaster.objects.create(
+            mgrp_code=self.group, mat_type_code=self.mat_type, short_name=short_name,
+            long_name=long_name, mgrp_long_name=self.group.mgrp_longname, **fields
+        )
+
+    def rename(self, longname):
+        self.group.mgrp_longname = longname
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.save()
+
+    def test_rename_rewrites_generated_names_in_one_update(self):
+        first = self.item("SS316, 25 mm")
+        blank = self.item("", long_name="TSTVALVE, Gate Valves")
+        with CaptureQueriesContext(connection) as ctx:
+            self.rename("Gate Valves Forged")
+
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "itemmaster_itemmaster"')]
+        self.assertEqual(len(updates), 1)
+        first.refresh_from_db()
+        blank.refresh_from_db()
+        self.assertEqual(first.mgrp_long_name, "Gate Valves Forged")
+        self.assertEqual(first.long_name, "TSTVALVE, Gate Valves Forged, SS316, 25 mm")
+        self.assertEqual(blank.long_name, "TSTVALVE, Gate Valves Forged")
+
+    def test_rename_keeps_hand_entered_long_name(self):
+        custom = self.item("SS316, 25 mm", long_name="Gate valve, SS316 body, 25 mm bore")
+        self.rename("Gate Valves Forged")
+
+        custom.refresh_from_db()
+        self.assertEqual(custom.mgrp_long_name, "Gate Valves Forged")
+        self.assertEqual(custom.long_name, "Gate valve, SS316 body, 25 mm bore")
+
+    def test_rename_caps_long_name_length(self):
+        item = self.item("x" * 100)
+        self.rename("y" * 150)
+
+        item.refresh_from_db()
+        self.assertEqual(len(item.long_name), LONG_NAME_MAX_LENGTH)
+        self.assertEqual(item.long_name, format_long_name("TSTVALVE", "y" * 150, "x" * 100))
+
+    def test_other_edits_leave_items_alone(self):
+        item = self.item("SS316, 25 mm")
+        self.group.notes = "changed"
+        with CaptureQueriesContext(connection) as ctx:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.group.save()
+
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "itemmaster_itemmaster"')])
+        item.refresh_from_db()
+        self.assertEqual(item.long_name, "TSTVALVE, Gate Valves, SS316, 25 mm")
+
+
+# ============================================================
+# ✅ Unique SAP ids
+# ============================================================
+class SapItemIdUniqueTests(TestCase):
+    def setUp(self):
+        self.group = MatGroup.objects.create(mgrp_code="TSTVALVE", mgrp_shortname="Valve", mgrp_longname="Valves")
+        self.mat_type = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+
+    def item(self, sap_item_id, **fields):
+        return ItemMaster.objects.create(
+            mgrp_code=self.group, mat_type_code=self.mat_type, short_name="Valve", sap_item_id=sap_item_id, **fields
+        )
+
+    def test_live_duplicate_rejected(self):
+        self.item(4000123)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.item(4000123)
+
+    def test_deleted_items_and_missing_ids_do_not_conflict(self):
+        self.item(4000123, is_deleted=True)
+        self.item(4000123)
+        self.item(None)
+        self.item(None)
+        self.assertEqual(ItemMaster.objects.filter(sap_item_id=4000123).count(), 2)
+
+
+# ============================================================
+# ✅ Unit of Measure normalization
+# ============================================================
+class UnitConversionTests(SimpleTestCase):
+    def test_known_units(self):
+        self.assertEqual(to_canonical(2.5, "cm"), (25.0, "mm"))
+        self.assertEqual(to_canonical(2.0, " KG "), (2.0, "kg"))
+        self.assertEqual(to_canonical(1.0, "in"), (25.4, "mm"))
+        self.assertEqual(to_canonical(3.0, "furlong"), (3.0, "furlong"))
+        self.assertEqual(to_canonical(3.0, ""), (3.0, ""))
+
+    def test_milli_and_mega_are_case_sensitive(self):
+        self.assertEqual(to_canonical(5.0, "mA"), (0.005, "a"))
+        self.assertEqual(to_canonical(5.0, "MA"), (5000000.0, "a"))
+        self.assertEqual(to_canonical(2.0, "mW"), (0.002, "w"))
+        self.assertEqual(to_canonical(2.0, "MW"), (2000000.0, "w"))
+        # Can't tell which one "mw" meant; it only compares with itself
+        self.assertEqual(to_canonical(2.0, "mw"), (2.0, "mw"))
+
+    def test_parse_numeric_value(self):
+        self.assertEqual(parse_numeric_value("25mm"), (25.0, "mm"))
+        self.assertEqual(parse_numeric_value("1/2 in"), (0.5, "in"))
+        self.assertEqual(parse_numeric_value({"value": "2.5", "uom": "cm"}), (2.5, "cm"))
+        self.assertEqual(parse_numeric_value("40", default_uom="mm"), (40.0, "mm"))
+        self.assertIsNone(parse_numeric_value("SS316"))
+        self.assertIsNone(parse_numeric_value("1/0"))
+        self.assertIsNone(parse_numeric_value(float("inf")))
+        self.assertIsNone(parse_numeric_value("9" * 400))
+
+    def test_range_bounds_must_be_finite(self):
+        ranges = parse_range_filters(QueryDict("attr.Size__min=20&attr.Size__max=30&attr.Size__uom=mm"))
+        self.assertEqual(ranges, {"Size": {"min": 20.0, "max": 30.0, "uom": "mm"}})
+        for bad in ("abc", "nan", "inf", "-Infinity"):
+            with self.assertRaises(ValueError):
+                parse_range_filters(QueryDict(f"attr.Size__min={bad}"))
+
+
+# ============================================================
+# ✅ Attribute value filters
+# ============================================================
+class ParseAttributeFiltersTests(SimpleTestCase):
+    def test_collects_values_per_attribute(self):
+        params = QueryDict("attr.Material=SS304&attr.Material=SS316&attr.Rating=150%23&mgrp_code=X")
+        self.assertEqual(parse_attribute_filters(params), {"Material": ["SS304", "SS316"], "Rating": ["150#"]})
+
+    def test_skips_blank_and_range_params(self):
+        params = QueryDict("attr.Material=+&attr.=x&attr.Size__min=20&attr.Size__uom=mm&attr.End=+BW+")
+        self.assertEqual(parse_attribute_filters(params), {"End": ["BW"]})
+
+
+class AttributeValueFilterTests(TestCase):
+    def setUp(self):
+        mat_type = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+        self.group = MatGroup.objects.create(mgrp_code="TSTVALVE", mgrp_shortname="Valve", mgrp_longname="Valves")
+
+        def item(attributes):
+            return ItemMaster.objects.create(
+                mgrp_code=self.group, mat_type_code=mat_type, short_name="Valve", attributes=attributes
+            ).pk
+
+        self.ss316 = item({"Material": "SS316", "Rating": "150#"})
+        self.ss304 = item({"Material": {"value": "SS304", "uom": ""}, "Rating": "300#"})
+        self.brass = item({"Material": "Brass"})
+
+    def matching(self, query):
+        items = ItemMaster.objects.filter(mgrp_code=self.group)
+        return set(apply_attribute_filters(items, QueryDict(query)).values_list("local_item_id", flat=True))
+
+    def test_matches_both_storage_shapes(self):
+        self.assertEqual(self.matching("attr.Material=SS316"), {self.ss316})
+        self.assertEqual(self.matching("attr.Material=SS304"), {self.ss304})
+
+    def test_repeated_values_are_any_of(self):
+        self.assertEqual(self.matching("attr.Material=SS316&attr.Material=SS304"), {self.ss316, self.ss304})
+
+    def test_attributes_combine(self):
+        self.assertEqual(self.matching("attr.Material=SS316&attr.Rating=150%23"), {self.ss316})
+        self.assertEqual(self.matching("attr.Material=SS316&attr.Rating=300%23"), set())
+        self.assertEqual(self.matching("attr.Rating=300%23"), {self.ss304})
+
+    def test_no_filters(self):
+        self.assertEqual(self.matching(""), {self.ss316, self.ss304, self.brass})
+        self.assertEqual(self.matching("attr.Material=Bronze"), set())
+
+
+# ============================================================
+# ✅ Numeric range filters
+# ============================================================
+class AttributeRangeFilterTests(TestCase):
+    def setUp(self):
+        # Schemas are dropped on commit: run those callbacks, and forget
+        # what this (rolled back) test cached
+        self.addCleanup(invalidate_attribute_schema)
+        self.mat_type = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.metric = self.group("TSTPIPEM", "mm, cm")
+            self.imperial = self.group("TSTPIPEI", "in")
+        self.m25 = self.item(self.metric, "25")        # 25 mm
+        self.m40 = self.item(self.metric, "4 cm")      # 40 mm
+        self.i1 = self.item(self.imperial, "1")        # 25.4 mm
+        self.i2 = self.item(self.imperial, "2")        # 50.8 mm
+
+    def group(self, code, uom):
+        group = MatGroup.objects.create(mgrp_code=code, mgrp_shortname="Pipe", mgrp_longname="Pipes")
+        MatgAttributeItem.objects.create(mgrp_code=group, attribute_name="Size", uom=uom, validation="numeric")
+        return group
+
+    def item(self, group, size):
+        return ItemMaster.objects.create(
+            mgrp_code=group, mat_type_code=self.mat_type, short_name=f"Pipe {size}", attributes={"Size": size}
+        )
+
+    def matching(self, query):
+        items = ItemMaster.objects.filter(mgrp_code__in=[self.metric, self.imperial])
+        return set(apply_attribute_filters(items, QueryDict(query)).values_list("local_item_id", flat=True))
+
+    def test_values_stored_in_canonical_unit(self):
+        self.assertEqual(ItemAttributeNumber.objects.get(item=self.m40).value, 40.0)
+        self.assertAlmostEqual(ItemAttributeNumber.objects.get(item=self.i2).value, 50.8)
+
+    def test_bounds_with_uom(self):
+        self.assertEqual(self.matching("attr.Size__min=2&attr.Size__max=3&attr.Size__uom=cm"),
+                         {self.m25.pk, self.i1.pk})
+        self.assertEqual(self.matching("attr.Size__min=1.5&attr.Size__uom=in"), {self.m40.pk, self.i2.pk})
+
+    def test_bounds_without_uom_use_each_groups_default(self):
+        # 20..30 is mm for TSTPIPEM and inches for TSTPIPEI
+        self.assertEqual(self.matching("attr.Size__min=20&attr.Size__max=30"), {self.m25.pk})
+        self.assertEqual(self.matching("attr.Size__min=1.5&attr.Size__max=2"), {self.i2.pk})
+
+    def test_uom_change_reindexes_items(self):
+        definition = MatgAttributeItem.objects.get(mgrp_code=self.imperial, attribute_name="Size")
+        definition.uom = "cm"
+        with self.captureOnCommitCallbacks(execute=True):
+            definition.save()
+        self.assertEqual(ItemAttributeNumber.objects.get(item=self.i2).value, 20.0)
+
+    def test_other_attribute_edits_skip_reindex(self):
+        definition = MatgAttributeItem.objects.get(mgrp_code=self.imperial, attribute_name="Size")
+        definition.print_priority = 3
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                definition.save()
+        self.assertFalse([q for q in queries if "itemattributenumber" in q["sql"]])
+
+    def test_item_saves_reindex_only_when_attributes_or_group_change(self):
+        self.i2.short_name = "Pipe 2 inch"
+        with CaptureQueriesContext(connection) as queries:
+            self.i2.save()
+        self.assertFalse([q for q in queries if "itemattributenumber" in q["sql"]])
+
+        self.i2.attributes = {"Size": "3"}
+        self.i2.save()
+        self.assertAlmostEqual(ItemAttributeNumber.objects.get(item=self.i2).value, 76.2)
+
+        self.i2.mgrp_code = self.metric  # "3" is now 3 mm
+        self.i2.save()
+        self.assertEqual(ItemAttributeNumber.objects.get(item=self.i2).value, 3.0)
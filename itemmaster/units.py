@@ -0,0 +1,158 @@
+import math
+import re
+
+
+# ============================================================
+# ✅ Unit of Measure normalization
+# ============================================================
+# Every known unit maps to (canonical unit, factor to canonical). Keys are
+# lowercase and matched case-insensitively, except CASE_SENSITIVE_UNITS.
+# Units that are not listed are kept as-is with a factor of 1, so values
+# in the same unknown unit can still be compared with each other.
+UNIT_CONVERSIONS = {
+    # Length -> mm
+    "mm": ("mm", 1.0),
+    "cm": ("mm", 10.0),
+    "m": ("mm", 1000.0),
+    "km": ("mm", 1000000.0),
+    "in": ("mm", 25.4),
+    "inch": ("mm", 25.4),
+    "inches": ("mm", 25.4),
+    '"': ("mm", 25.4),
+    "ft": ("mm", 304.8),
+    "feet": ("mm", 304.8),
+    # Mass -> kg
+    "mg": ("kg", 0.000001),
+    "g": ("kg", 0.001),
+    "gm": ("kg", 0.001),
+    "kg": ("kg", 1.0),
+    "t": ("kg", 1000.0),
+    "ton": ("kg", 1000.0),
+    "lb": ("kg", 0.45359237),
+    "lbs": ("kg", 0.45359237),
+    # Volume -> l
+    "ml": ("l", 0.001),
+    "l": ("l", 1.0),
+    "ltr": ("l", 1.0),
+    "litre": ("l", 1.0),
+    "liter": ("l", 1.0),
+    "m3": ("l", 1000.0),
+    # Pressure -> bar
+    "bar": ("bar", 1.0),
+    "mbar": ("bar", 0.001),
+    "kpa": ("bar", 0.01),
+    "mpa": ("bar", 10.0),
+    "psi": ("bar", 0.0689475729),
+    "kg/cm2": ("bar", 0.980665),
+    # Electrical
+    "v": ("v", 1.0),
+    "kv": ("v", 1000.0),
+    "a": ("a", 1.0),
+    "w": ("w", 1.0),
+    "kw": ("w", 1000.0),
+    "sqmm": ("sqmm", 1.0),
+    "mm2": ("sqmm", 1.0),
+}
+
+# Units where case tells milli from mega; matched on the exact spelling only
+CASE_SENSITIVE_UNITS = {
+    "mV": ("v", 0.001),
+    "MV": ("v", 1000000.0),
+    "mA": ("a", 0.001),
+    "MA": ("a", 1000000.0),
+    "mW": ("w", 0.001),
+    "MW": ("w", 1000000.0),
+}
+_AMBIGUOUS_UNITS = {u.lower() for u in CASE_SENSITIVE_UNITS}
+
+# Validation types (MatgAttributeItem.validation) that mark an attribute numeric
+NUMERIC_VALIDATIONS = {"numeric", "decimal", "integer", "wholenumber"}
+
+_NUMBER_RE = re.compile(
+    r"^\s*(?P<number>[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:\s*/\s*\d+)?)\s*(?P<uom>.*?)\s*$"
+)
+
+
+def split_uoms(uom):
+    """Split a comma-separated UOM definition ("mm, cm, in") into a list."""
+    if not uom:
+        return []
+    if isinstance(uom, list):
+        return [str(u).strip() for u in uom if str(u).strip()]
+    return [u.strip() for u in str(uom).split(",") if u.strip()]
+
+
+def is_numeric_attribute(validation, uom):
+    """An attribute is numeric if it has a numeric validation or a UOM."""
+    if validation and validation.lower().strip() in NUMERIC_VALIDATIONS:
+        return True
+    return bool(split_uoms(uom))
+
+
+def _to_float(number):
+    if "/" in number:
+        numerator, denominator = [n.strip() for n in number.split("/", 1)]
+        value = float(numerator) / float(denominator)
+    else:
+        value = float(number)
+    if not math.isfinite(value):
+        raise ValueError(f"{number!r} is not a finite number")
+    return value
+
+
+def to_canonical(number, uom):
+    """Convert ``number`` in ``uom`` to (value, canonical_uom)."""
+    uom = (uom or "").strip()
+    if not uom:
+        return number, ""
+    if uom in CASE_SENSITIVE_UNITS:
+        canonical, factor = CASE_SENSITIVE_UNITS[uom]
+        return number * factor, canonical
+    key = uom.lower()
+    if key in _AMBIGUOUS_UNITS:
+        # "mw", "Ma"...: can't tell milli from mega, keep the spelling as-is
+        return number, uom
+    canonical, factor = UNIT_CONVERSIONS.get(key, (key, 1.0))
+    return number * factor, canonical
+
+
+def in_unit(value, canonical_uom, uom):
+    """``value`` (in ``canonical_uom``) expressed in ``uom``, or None if they don't convert."""
+    factor, target = to_canonical(1.0, uom)
+    if target != canonical_uom:
+        return None
+    return value / factor
+
+
+def parse_numeric_value(value, default_uom=None):
+    """
+    Parse a stored attribute value into (number, uom).
+
+    Accepts "25", "25 mm", "25mm", "1/2 in" and {"value": "2.5", "uom": "cm"}.
+    Falls back to ``default_uom`` when the value carries no unit.
+    Returns None for non-numeric values.
+    """
+    uom = None
+    if isinstance(value, dict):
+        uom = value.get("uom")
+        value = value.get("value")
+
+    if value is None or isinstance(value, bool):
+        return None
+
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            return None
+        return float(value), (uom or default_uom or "")
+
+    match = _NUMBER_RE.match(str(value))
+    if not match:
+        return None
+
+    try:
+        number = _to_float(match.group("number"))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+    suffix = match.group("uom")
+    return number, (uom or suffix or default_uom or "")
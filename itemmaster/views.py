@@ -4,11 +4,15 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 
 from .models import ItemMaster
+from .filters import apply_attribute_filters
+from .names import format_long_name
 from Employee.models import Employee
 from MaterialType.models import MaterialType
 from matgroups.models import MatGroup
-from matg_attributes.models import MatgAttributeItem  # NEW model
+from matg_attributes.schema import get_attribute_schema
+from material_api.similarity import find_similar_items, similarity_settings
 from Common.Middleware import authenticate, restrict
+from Common.RateLimit import rate_limit
 
 
 # Helper function
@@ -23,17 +27,6 @@ def format_attributes_for_short_name(attributes):
     pairs = [str(v) for k, v in attributes.items() if v]  # Only values, no keys
     return ", ".join(pairs)
 
-# Helper function to format long_name with mgrp_code, mgrp_long_name, short_name
-def format_long_name(mgrp_code, mgrp_long_name, short_name):
-    """Format long_name as 'mgrp_code, mgrp_long_name, short_name'"""
-    parts = []
-    if mgrp_code:
-        parts.append(str(mgrp_code))
-    if mgrp_long_name:
-        parts.append(str(mgrp_long_name))
-    if short_name:
-        parts.append(str(short_name))
-    return ", ".join(parts)
 
 
 # ============================================================
@@ -41,6 +34,7 @@ def format_long_name(mgrp_code, mgrp_long_name, short_name):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "MDGT"])
 def create_itemmaster(request):
     if request.method != "POST":
@@ -81,51 +75,24 @@ def create_itemmaster(request):
         if not mat_group:
             return JsonResponse({"error": f"MatGroup {mgrp_code} not found"}, status=400)
 
+        # SAP ids are unique among non-deleted items
+        if sap_item_id is not None and ItemMaster.objects.filter(sap_item_id=sap_item_id, is_deleted=False).exists():
+            return JsonResponse({"error": f"sap_item_id {sap_item_id} is already assigned to another item"}, status=400)
+
         # ===============================================================
-        # ✅ Fetch allowed attributes from new MatgAttributeItem model
+        # ✅ Allowed attributes from the cached MatGroup attribute schema
         # ===============================================================
-        attr_items = MatgAttributeItem.objects.filter(
-            mgrp_code=mat_group,
-            is_deleted=False
-        )
-
-        allowed_attrs = {
-            item.attribute_name: {
-                "values": item.possible_values,
-                "uom": item.uom,
-            }
-            for item in attr_items
-        }
+        schema = get_attribute_schema(mat_group)
         # ===============================================================
 
         # Validate user-selected attributes
-        invalid_fields = []
-
-        for key, value in selected_attributes.items():
-            if key not in allowed_attrs:
-                invalid_fields.append(f"'{key}' is not defined for MatGroup {mgrp_code}")
-            else:
-                # Extract base value (remove UOM if present)
-                base_value = value
-                attr_uom = allowed_attrs[key].get("uom", "")
-                if attr_uom and isinstance(value, str):
-                    # Check if value ends with UOM (handle both single and multiple UOMs)
-                    uom_list = []
-                    if isinstance(attr_uom, list):
-                        uom_list = attr_uom
-                    elif isinstance(attr_uom, str):
-                        # Handle comma-separated UOMs
-                        uom_list = [u.strip() for u in attr_uom.split(",")] if "," in attr_uom else [attr_uom]
-
-                    for u in uom_list:
-                        if value.endswith(f" {u}"):
-                            base_value = value.replace(f" {u}", "")
-                            break
-                
-                # Allow custom values (values not in possible_values) - user requirement
-                # Only validate that the attribute name exists, not the value
-                # Custom values are allowed for flexibility
-                pass  # No validation needed for custom values
+        # Custom values (not in possible_values) are allowed - user requirement,
+        # so only the attribute name is validated.
+        invalid_fields = [
+            f"'{key}' is not defined for MatGroup {mgrp_code}"
+            for key in selected_attributes
+            if key not in schema
+        ]
 
         if invalid_fields:
             return JsonResponse({
@@ -140,24 +107,7 @@ def create_itemmaster(request):
         force_create = data.get("force_create", False)
         if not force_create and selected_attributes and any(selected_attributes.values()):
             # Normalize attributes for comparison (remove UOMs, trim values)
-            normalized_new_attrs = {}
-            for key, value in selected_attributes.items():
-                if value:
-                    # Remove UOM if present
-                    normalized_value = str(value).strip()
-                    # Check if value ends with UOM
-                    chk_uom = allowed_attrs.get(key, {}).get("uom", "")
-                    if chk_uom:
-                        uom_list = []
-                        if isinstance(chk_uom, list):
-                            uom_list = chk_uom
-                        elif isinstance(chk_uom, str):
-                            uom_list = [u.strip() for u in chk_uom.split(",")] if "," in chk_uom else [chk_uom]
-                        for u in uom_list:
-                            if normalized_value.endswith(f" {u}"):
-                                normalized_value = normalized_value.replace(f" {u}", "").strip()
-                                break
-                    normalized_new_attrs[key] = normalized_value
+            normalized_new_attrs = schema.normalized(selected_attributes)
 
             # Find existing materials with same mgrp_code and matching attributes
             existing_items = ItemMaster.objects.filter(
@@ -168,31 +118,12 @@ def create_itemmaster(request):
             duplicate_items = []
             for existing_item in existing_items:
                 if existing_item.attributes:
-                    # Normalize existing attributes
-                    normalized_existing_attrs = {}
-                    for key, value in existing_item.attributes.items():
-                        if value:
-                            normalized_value = str(value).strip()
-                            # Remove UOM if present
-                            chk_uom2 = allowed_attrs.get(key, {}).get("uom", "")
-                            if chk_uom2:
-                                uom_list = []
-                                if isinstance(chk_uom2, list):
-                                    uom_list = chk_uom2
-                                elif isinstance(chk_uom2, str):
-                                    uom_list = [u.strip() for u in chk_uom2.split(",")] if "," in chk_uom2 else [chk_uom2]
-                                for u in uom_list:
-                                    if normalized_value.endswith(f" {u}"):
-                                        normalized_value = normalized_value.replace(f" {u}", "").strip()
-                                        break
-                            normalized_existing_attrs[key] = normalized_value
-                    
                     # Compare normalized attributes
-                    if normalized_new_attrs == normalized_existing_attrs:
+                    if normalized_new_attrs == schema.normalized(existing_item.attributes):
                         duplicate_items.append({
                             "local_item_id": existing_item.local_item_id,
                             "sap_item_id": existing_item.sap_item_id,
-                            "mgrp_code": existing_item.mgrp_code.mgrp_code,
+                            "mgrp_code": existing_item.mgrp_code_id,
                             "short_name": existing_item.short_name,
                             "attributes": existing_item.attributes
                         })
@@ -224,6 +155,24 @@ def create_itemmaster(request):
             formatted_short_name
         )
 
+        # ===============================================================
+        # ✅ Near-duplicate pre-check (typos, reordered attribute values)
+        # ===============================================================
+        # Advisory only: the item is still created, the matches are returned with it
+        similar_items = []
+        threshold = similarity_settings()["PRECHECK_THRESHOLD"]
+        if not force_create and threshold is not None:
+            try:
+                similar_items = find_similar_items(
+                    mat_group.mgrp_code,
+                    short_name=formatted_short_name,
+                    long_name=formatted_long_name,
+                    attributes=selected_attributes,
+                    min_score=threshold,
+                )
+            except Exception as e:
+                print("Similar item pre-check failed:", e)
+
         # Create ItemMaster
         item = ItemMaster.objects.create(
             sap_item_id=sap_item_id,
@@ -259,6 +208,12 @@ def create_itemmaster(request):
             "createdby": get_employee_name(item.createdby),
             "updatedby": get_employee_name(item.updatedby)
         }
+        if similar_items:
+            response_data["warning"] = "Similar material found in material group"
+            response_data["similar_items"] = similar_items
+            response_data["message"] = (
+                f"Created; {len(similar_items)} existing material(s) in material group {mgrp_code} look similar"
+            )
 
         return JsonResponse(response_data, status=201)
 
@@ -279,22 +234,33 @@ def list_itemmasters(request):
     if request.method != "GET":
         return JsonResponse({"error": "Invalid request method"}, status=405)
 
-    items = ItemMaster.objects.filter(is_deleted=False)
+    items = ItemMaster.objects.filter(is_deleted=False).select_related("createdby", "updatedby")
+
+    # Optional filters: ?mgrp_code=...&mat_type_code=...&attr.<name>=<value>
+    # and numeric ranges ?attr.<name>__min=...&attr.<name>__max=...&attr.<name>__uom=...
+    mgrp_code = request.GET.get("mgrp_code")
+    if mgrp_code:
+        items = items.filter(mgrp_code=mgrp_code)
+    mat_type_code = request.GET.get("mat_type_code")
+    if mat_type_code:
+        items = items.filter(mat_type_code=mat_type_code)
+    try:
+        items = apply_attribute_filters(items, request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
     response_data = []
 
+    # long_name is stored on every item (set on create/upload, kept in step
+    # with MatGroup renames, backfilled by migration 0016), so it's read as is
     for item in items:
-        # Compute long_name on-the-fly if not stored
-        long_name = item.long_name or format_long_name(
-            item.mgrp_code.mgrp_code if item.mgrp_code else None,
-            item.mgrp_long_name,
-            item.short_name
-        )
+        long_name = item.long_name
         response_data.append({
             "local_item_id": item.local_item_id,
             "sap_item_id": item.sap_item_id,
             "sap_name": item.sap_name,
-            "mat_type_code": item.mat_type_code.mat_type_code,
-            "mgrp_code": item.mgrp_code.mgrp_code,
+            "mat_type_code": item.mat_type_code_id,
+            "mgrp_code": item.mgrp_code_id,
             "mgrp_long_name": item.mgrp_long_name,
             "item_desc": item.short_name,
             "short_name": item.short_name,
@@ -319,6 +285,7 @@ def list_itemmasters(request):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 def update_itemmaster(request, local_item_id):
     if request.method != "PUT":
         return JsonResponse({"error": "Invalid request method"}, status=405)
@@ -352,21 +319,13 @@ def update_itemmaster(request, local_item_id):
         if "attributes" in data:
             selected_attributes = data["attributes"]
 
-            attr_items = MatgAttributeItem.objects.filter(
-                mgrp_code=item.mgrp_code,
-                is_deleted=False
-            )
-
-            allowed_attrs = {
-                a.attribute_name: {"values": a.possible_values, "uom": a.uom}
-                for a in attr_items
-            }
-
-            invalid_fields = []
+            schema = get_attribute_schema(item.mgrp_code_id)
 
-            for key, value in selected_attributes.items():
-                if key not in allowed_attrs:
-                    invalid_fields.append(f"{key} not defined")
+            invalid_fields = [
+                f"{key} not defined"
+                for key in selected_attributes
+                if key not in schema
+            ]
 
             if invalid_fields:
                 return JsonResponse({
@@ -421,6 +380,10 @@ def update_itemmaster(request, local_item_id):
         # =========================================================
 
         item.sap_item_id = data.get("sap_item_id", item.sap_item_id)
+        if item.sap_item_id not in (None, "") and ItemMaster.objects.filter(
+            sap_item_id=item.sap_item_id, is_deleted=False
+        ).exclude(pk=item.pk).exists():
+            return JsonResponse({"error": f"sap_item_id {item.sap_item_id} is already assigned to another item"}, status=400)
         item.sap_name = data.get("sap_name", item.sap_name)
 
         if "attributes" not in data and ("item_desc" in data or "short_name" in data):
@@ -478,6 +441,7 @@ def update_itemmaster(request, local_item_id):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "MDGT"])
 def delete_itemmaster(request, local_item_id):
     if request.method != "DELETE":
@@ -0,0 +1,168 @@
+from django.http import JsonResponse
+
+from Common.RateLimit import rate_limit
+
+from .result_cache import async_cached_result, json_body
+from .query_log import log_search, group_search_params, item_search_params
+from .search_backends import get_search_backend
+from .serializers import ItemMasterSerializer
+from .snapshot import aget_catalog_snapshot, aitem_records
+from .views import (
+    search_groups_params, group_hits_payload, flag_degraded,
+    super_groups_payload, groups_by_super_payload, materials_payload,
+    has_attribute_filters, filtered_items_by_type, snapshot_items_by_type, items_by_type_payload,
+    matgroup_code_payload, sap_ids_payload,
+    group_items_search, unranked_page,
+)
+
+
+# ==============================================================
+# Async versions of the material_api search / drill-down views.
+#
+# Under daphne these run on the event loop instead of a sync_to_async
+# thread. Snapshot, in-memory index and cache hits need no thread at all;
+# database reads use Django's async ORM. Responses match the sync views
+# in material_api.views (same *_payload builders).
+# ==============================================================
+def _json(data, code=200):
+    response = JsonResponse(data, status=code, safe=False)
+    if isinstance(data, list):
+        response.result_count = len(data)  # for the query log, which never parses the body
+    return response
+
+
+def _method_not_allowed(request, allowed):
+    """Same 405 body as DRF's @api_view."""
+    if request.method not in allowed:
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    return None
+
+
+# ==============================================================
+# 🔹 1. Free Text Search
+# ==============================================================
+@rate_limit("search")
+@log_search("search_groups", group_search_params)
+@async_cached_result
+async def search_groups(request):
+    error = _method_not_allowed(request, ("POST",))
+    if error:
+        return error
+
+    data = json_body(request)
+    if not isinstance(data, dict):
+        return _json({"error": "Field 'query' is required"}, 400)
+
+    query, search_type = search_groups_params(data)
+    if not query:
+        return _json({"error": "Field 'query' is required"}, 400)
+
+    hits = await get_search_backend().asearch_groups(query, search_type)
+    return flag_degraded(_json(group_hits_payload(hits)), hits)
+
+
+# The JSON body is the API here, not a form post (as with DRF's @api_view)
+search_groups.csrf_exempt = True
+
+
+# ==============================================================
+# 🔹 2. Drill-Down Search APIs (catalog snapshot)
+# ==============================================================
+@async_cached_result
+async def super_material_groups(request):
+    error = _method_not_allowed(request, ("GET",))
+    if error:
+        return error
+    return _json(*super_groups_payload(await aget_catalog_snapshot()))
+
+
+@async_cached_result
+async def material_groups_by_super(request, super_code):
+    error = _method_not_allowed(request, ("GET",))
+    if error:
+        return error
+    return _json(*groups_by_super_payload(
+        await aget_catalog_snapshot(), super_code, request.GET.get("search_type", None)
+    ))
+
+
+@async_cached_result
+async def materials_by_matgroup(request, mgrp_code):
+    error = _method_not_allowed(request, ("GET",))
+    if error:
+        return error
+    return _json(*materials_payload(await aget_catalog_snapshot(), mgrp_code))
+
+
+@async_cached_result
+async def items_by_material_type(request, mat_type_code):
+    error = _method_not_allowed(request, ("GET",))
+    if error:
+        return error
+
+    mgrp_code = request.GET.get("mgrp_code", None)
+    if has_attribute_filters(request.GET):
+        try:
+            items = filtered_items_by_type(request.GET, mat_type_code, mgrp_code)
+        except ValueError as e:
+            return _json({"error": str(e)}, 400)
+        items = await aitem_records(items)
+    else:
+        items = snapshot_items_by_type(await aget_catalog_snapshot(), mat_type_code, mgrp_code)
+
+    return _json(items_by_type_payload(items, mat_type_code))
+
+
+@async_cached_result
+async def search_by_matgroup_code(request, mgrp_code):
+    error = _method_not_allowed(request, ("GET",))
+    if error:
+        return error
+    return _json(*matgroup_code_payload(await aget_catalog_snapshot(), mgrp_code))
+
+
+@async_cached_result
+async def sap_ids_by_matgroup(request, group_code):
+    error = _method_not_allowed(request, ("GET",))
+    if error:
+        return error
+    return _json(*sap_ids_payload(await aget_catalog_snapshot(), group_code))
+
+
+# ==============================================================
+# 🔹 4./5. Items by Group (+ Material Type)
+# ==============================================================
+@rate_limit("search")
+@log_search("items_by_group", item_search_params)
+@async_cached_result
+async def items_by_group(request, group_code):
+    error = _method_not_allowed(request, ("GET",))
+    if error:
+        return error
+    return await _ranked_items(request, group_code)
+
+
+@rate_limit("search")
+@log_search("items_by_group_and_type", item_search_params)
+@async_cached_result
+async def items_by_group_and_type(request, group_code, mat_type_code):
+    error = _method_not_allowed(request, ("GET",))
+    if error:
+        return error
+    return await _ranked_items(request, group_code, mat_type_code)
+
+
+async def _ranked_items(request, group_code, mat_type_code=None):
+    try:
+        search = group_items_search(request.GET, group_code, mat_type_code)
+    except ValueError as e:
+        return _json({"error": str(e)}, 400)
+
+    if not search["query"]:
+        page = [item async for item in unranked_page(search["items"], search["limit"], search["offset"])]
+    else:
+        page = await get_search_backend().arank_items(
+            search["items"], search["query"], search["vector_fields"], search["trigram_fields"],
+            search["limit"], search["offset"], scope=search["scope"],
+        )
+    return flag_degraded(_json(ItemMasterSerializer(page, many=True).data), page)
@@ -0,0 +1,365 @@
+import bisect
+import heapq
+import threading
+import time
+
+from django.conf import settings
+
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+
+
+# Defaults for settings.AUTOCOMPLETE
+AUTOCOMPLETE_DEFAULTS = {
+    "DEFAULT_LIMIT": 10,
+    "MAX_LIMIT": 50,
+    # Prefixes matching more index entries than this ("v", "va") are answered
+    # from a ranked list kept per prefix instead of scanning their entries
+    "SCAN_LIMIT": 5000,
+    # Words of a name that can start a match ("valve" finds "Gate Valve")
+    "MAX_WORDS": 6,
+    # Seconds before a worker rebuilds in the background, to pick up writes
+    # made by other workers (signals only update the local index)
+    "REBUILD_INTERVAL": 900,
+    # Keys (plus replaced suggestions) buffered from writes before they are
+    # merged into the main arrays in one pass
+    "MERGE_THRESHOLD": 1000,
+}
+
+
+def autocomplete_settings():
+    return {**AUTOCOMPLETE_DEFAULTS, **getattr(settings, "AUTOCOMPLETE", {})}
+
+
+# ============================================================
+# ✅ Suggestion records
+# ============================================================
+class Suggestion:
+    __slots__ = ("kind", "ident", "label", "mgrp_code", "sap_item_id", "popularity", "keys")
+
+    def __init__(self, kind, ident, label, mgrp_code, sap_item_id=None, popularity=0):
+        self.kind = kind
+        self.ident = ident
+        self.label = label or ""
+        self.mgrp_code = mgrp_code
+        self.sap_item_id = sap_item_id
+        self.popularity = popularity
+        self.keys = ()
+
+    def with_popularity(self, popularity):
+        suggestion = Suggestion(self.kind, self.ident, self.label, self.mgrp_code, self.sap_item_id, popularity)
+        suggestion.keys = self.keys
+        return suggestion
+
+    def as_dict(self):
+        data = {"type": self.kind, "label": self.label, "mgrp_code": self.mgrp_code, "score": self.popularity}
+        if self.kind == "item":
+            data["local_item_id"] = self.ident
+            data["sap_item_id"] = self.sap_item_id
+        return data
+
+
+def _normalize(text):
+    return " ".join(str(text).lower().split())
+
+
+def _name_keys(text, max_words):
+    """The name itself plus every suffix starting at one of its first words."""
+    text = _normalize(text)
+    if not text:
+        return []
+    keys = [text]
+    start = 0
+    for _ in range(max_words - 1):
+        start = text.find(" ", start) + 1
+        if not start:
+            break
+        keys.append(text[start:])
+    return keys
+
+
+def group_suggestion(group):
+    suggestion = Suggestion("group", group.mgrp_code, group.mgrp_shortname or group.mgrp_code,
+                            group.mgrp_code, popularity=group.popularity)
+    words = autocomplete_settings()["MAX_WORDS"]
+    keys = {_normalize(group.mgrp_code)}
+    for name in (group.mgrp_shortname, group.mgrp_longname):
+        if name:
+            keys.update(_name_keys(name, words))
+    suggestion.keys = tuple(keys)
+    return suggestion
+
+
+def item_suggestion(item):
+    suggestion = Suggestion("item", item.local_item_id, item.short_name, item.mgrp_code_id,
+                            sap_item_id=item.sap_item_id, popularity=item.popularity)
+    keys = set(_name_keys(item.short_name, autocomplete_settings()["MAX_WORDS"]))
+    if item.sap_item_id is not None:
+        keys.add(str(item.sap_item_id))
+    suggestion.keys = tuple(keys)
+    return suggestion
+
+
+# ============================================================
+# ✅ Sorted-array prefix index
+# ============================================================
+class PrefixIndex:
+    """
+    Parallel sorted arrays of keys and the Suggestion each key belongs to.
+    A lookup is two bisects (first key >= prefix, first key past it) and a
+    slice, so its cost does not grow with Python-level scanning. Prefixes
+    whose slice is longer than ``scan_limit`` keep their best ``top_size``
+    suggestions in a ranked list (``tops``), so short prefixes still return
+    the most popular matches of the whole index.
+
+    Writes don't touch the main arrays: new suggestions go to a small sorted
+    delta, replaced or removed ones to a ``dead`` set that lookups filter
+    out. Once the delta and dead set hold ``merge_threshold`` entries they
+    are merged into the main arrays (and the ranked lists recomputed) in one
+    pass; ranked lists hold ``merge_threshold`` more than the largest lookup
+    so dead entries can't empty them. Each state is swapped in as one tuple,
+    so readers never take a lock.
+    """
+
+    def __init__(self, suggestions=(), merge_threshold=1000, scan_limit=5000, max_limit=50):
+        self.records = {}
+        pairs = []
+        for suggestion in suggestions:
+            self.records[(suggestion.kind, suggestion.ident)] = suggestion
+            pairs.extend((key, suggestion) for key in suggestion.keys)
+        pairs.sort(key=lambda pair: pair[0])
+        self.merge_threshold = merge_threshold
+        self.scan_limit = scan_limit
+        self.top_size = max_limit + merge_threshold
+        keys, refs = [key for key, _ in pairs], [sug for _, sug in pairs]
+        # Live suggestions of the main arrays, best first (fills the ranked lists)
+        self._ranked = sorted(self.records.values(), key=_rank)
+        # (keys, refs, ranked lists, delta keys, delta refs, dead suggestions)
+        self._state = (keys, refs, self._tops(keys, refs), [], [], frozenset())
+        self.built_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        keys, _, _, delta_keys, _, _ = self._state
+        return len(keys) + len(delta_keys)
+
+    def upsert(self, suggestion):
+        with self._lock:
+            keys, refs, tops, delta_keys, delta_refs, dead = self._state
+            dead = self._retire(dead, (suggestion.kind, suggestion.ident))
+            delta_keys, delta_refs = list(delta_keys), list(delta_refs)
+            for key in suggestion.keys:
+                pos = bisect.bisect_right(delta_keys, key)
+                delta_keys.insert(pos, key)
+                delta_refs.insert(pos, suggestion)
+            self.records[(suggestion.kind, suggestion.ident)] = suggestion
+            self._swap(keys, refs, tops, delta_keys, delta_refs, dead)
+
+    def remove(self, kind, ident):
+        with self._lock:
+            keys, refs, tops, delta_keys, delta_refs, dead = self._state
+            self._swap(keys, refs, tops, delta_keys, delta_refs, self._retire(dead, (kind, ident)))
+
+    def _retire(self, dead, ref):
+        suggestion = self.records.pop(ref, None)
+        return dead | {suggestion} if suggestion is not None else dead
+
+    def _swap(self, keys, refs, tops, delta_keys, delta_refs, dead):
+        if len(delta_keys) + len(dead) >= self.merge_threshold:
+            pairs = heapq.merge(
+                ((key, ref) for key, ref in zip(keys, refs) if ref not in dead),
+                ((key, ref) for key, ref in zip(delta_keys, delta_refs) if ref not in dead),
+                key=lambda pair: pair[0],
+            )
+            keys, refs = [], []
+            for key, ref in pairs:
+                keys.append(key)
+                refs.append(ref)
+            self._ranked = [sug for sug in self._ranked if sug not in dead]
+            self._ranked.extend(sorted(set(delta_refs) - dead, key=_rank))
+            self._ranked.sort(key=_rank)
+            tops = self._tops(keys, refs)
+            delta_keys, delta_refs, dead = [], [], frozenset()
+        self._state = (keys, refs, tops, delta_keys, delta_refs, dead)
+
+    def _tops(self, keys, refs):
+        """{prefix: best suggestions} for every prefix matching more than scan_limit keys."""
+        # Find those prefixes with bisects over the sorted keys, one level at a time
+        tops = {}
+        ranges = [("", 0, len(keys))]
+        while ranges:
+            prefix, lo, hi = ranges.pop()
+            pos = lo
+            while pos < hi:
+                if len(keys[pos]) == len(prefix):
+                    pos += 1
+                    continue
+                sub = keys[pos][:len(prefix) + 1]
+                end = bisect.bisect_left(keys, sub + "\uffff", pos, hi)
+                if end - pos > self.scan_limit:
+                    tops[sub] = []
+                    ranges.append((sub, pos, end))
+                pos = end
+        if not tops:
+            return tops
+
+        # Then fill them walking the suggestions best first, until all are full
+        depth = max(map(len, tops))
+        unfilled = len(tops)
+        for suggestion in self._ranked:
+            for key in suggestion.keys:
+                for length in range(1, min(depth, len(key)) + 1):
+                    top = tops.get(key[:length])
+                    if top is None:
+                        break
+                    if len(top) < self.top_size and (not top or top[-1] is not suggestion):
+                        top.append(suggestion)
+                        if len(top) == self.top_size:
+                            unfilled -= 1
+            if not unfilled:
+                break
+        return tops
+
+    def lookup(self, prefix, limit):
+        """Top ``limit`` suggestions whose keys start with ``prefix``, most popular first."""
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+
+        keys, refs, tops, delta_keys, delta_refs, dead = self._state
+        if prefix in tops:
+            found = set(tops[prefix])
+        else:
+            found = _prefix_slice(keys, refs, prefix)
+        if delta_keys:
+            found |= _prefix_slice(delta_keys, delta_refs, prefix)
+        return heapq.nsmallest(limit, found - dead, key=_rank)
+
+
+def _prefix_slice(keys, refs, prefix):
+    lo = bisect.bisect_left(keys, prefix)
+    hi = bisect.bisect_left(keys, prefix + "\uffff", lo)
+    return set(refs[lo:hi])
+
+
+def _rank(suggestion):
+    return (-suggestion.popularity, len(suggestion.label), suggestion.label)
+
+
+# ============================================================
+# ✅ Process-wide index (built at startup, updated by signals)
+# ============================================================
+_index = None
+_build_lock = threading.Lock()
+_initial_lock = threading.Lock()
+_building = False
+_pending = set()  # (kind, ident) changed while a build was running
+
+
+def build_index():
+    """Read groups + final items and their stored popularity into a new PrefixIndex."""
+    suggestions = [
+        group_suggestion(group)
+        for group in MatGroup.objects.filter(is_deleted=False).only(
+            "mgrp_code", "mgrp_shortname", "mgrp_longname", "popularity"
+        )
+    ]
+    items = ItemMaster.objects.filter(is_deleted=False, is_final=True).only(
+        "local_item_id", "short_name", "sap_item_id", "mgrp_code", "popularity"
+    )
+    for item in items.iterator(chunk_size=2000):
+        suggestions.append(item_suggestion(item))
+    conf = autocomplete_settings()
+    return PrefixIndex(
+        suggestions, merge_threshold=conf["MERGE_THRESHOLD"], scan_limit=conf["SCAN_LIMIT"],
+        max_limit=conf["MAX_LIMIT"],
+    )
+
+
+def rebuild_autocomplete_index():
+    """Build a fresh index and swap it in, then replay changes made meanwhile."""
+    global _index, _building
+    with _build_lock:
+        _building = True
+        _pending.clear()
+        try:
+            index = build_index()
+        finally:
+            _building = False
+        _index = index
+        changed = list(_pending)
+        _pending.clear()
+    for kind, ident in changed:
+        refresh_suggestion(kind, ident)
+    return index
+
+
+def warm_autocomplete_index():
+    """Build the index in a background thread (called at server startup)."""
+    def _run():
+        try:
+            rebuild_autocomplete_index()
+        except Exception as e:
+            print("Autocomplete index build failed:", e)
+    threading.Thread(target=_run, name="autocomplete-index", daemon=True).start()
+
+
+def get_autocomplete_index():
+    index = _index
+    if index is None:
+        with _initial_lock:
+            # First request(s) before the startup build finished: build once
+            return _index or rebuild_autocomplete_index()
+    if time.monotonic() - index.built_at > autocomplete_settings()["REBUILD_INTERVAL"] and not _building:
+        index.built_at = time.monotonic()  # only one refresh per interval
+        warm_autocomplete_index()
+    return index
+
+
+def refresh_suggestion(kind, ident):
+    """Re-read one group/item after a write and update the live index."""
+    if _building:
+        _pending.add((kind, ident))
+    index = _index
+    if index is None:
+        return
+
+    if kind == "group":
+        group = MatGroup.objects.filter(mgrp_code=ident, is_deleted=False).first()
+        if group is None:
+            index.remove(kind, ident)
+        else:
+            index.upsert(group_suggestion(group))
+    else:
+        item = ItemMaster.objects.filter(local_item_id=ident, is_deleted=False, is_final=True).first()
+        if item is None:
+            index.remove(kind, ident)
+        else:
+            index.upsert(item_suggestion(item))
+
+
+def update_popularity(item_scores, group_scores):
+    """
+    Apply refreshed popularity scores ({pk: score}, missing = 0) to the live
+    index; they are written with bulk_update, which sends no signals. More
+    changes than one delta merge holds rebuild the index instead.
+    """
+    index = _index
+    if index is None:
+        return
+    scores = {"item": item_scores, "group": group_scores}
+    changed = [
+        suggestion for (kind, ident), suggestion in list(index.records.items())
+        if suggestion.popularity != scores[kind].get(ident, 0)
+    ]
+    if len(changed) > index.merge_threshold:
+        warm_autocomplete_index()
+        return
+    for suggestion in changed:
+        index.upsert(suggestion.with_popularity(scores[suggestion.kind].get(suggestion.ident, 0)))
+
+
+def autocomplete(prefix, limit=None):
+    conf = autocomplete_settings()
+    limit = min(limit or conf["DEFAULT_LIMIT"], conf["MAX_LIMIT"])
+    return [s.as_dict() for s in get_autocomplete_index().lookup(prefix, limit)]
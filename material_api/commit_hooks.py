@@ -0,0 +1,29 @@
+from django.db import connection, transaction
+
+
+# ============================================================
+# ✅ One on_commit callback per transaction
+# ============================================================
+def on_commit_batch(name, update, flush):
+    """
+    Run ``flush(batch)`` once after the surrounding transaction commits
+    (immediately in autocommit), however many writes in it call this.
+    ``update(batch)`` adds the current write to the transaction's batch (a
+    dict). A batch whose transaction or savepoint was rolled back is dropped
+    together with its callback, so only work from later writes is flushed.
+    """
+    attr = f"_on_commit_batch_{name}"
+    scheduled = getattr(connection, attr, None)
+    if scheduled is not None and any(func is scheduled[0] for _, func, _ in connection.run_on_commit):
+        update(scheduled[1])
+        return
+
+    batch = {}
+
+    def _flush():
+        setattr(connection, attr, None)
+        flush(batch)
+
+    setattr(connection, attr, (_flush, batch))
+    update(batch)
+    transaction.on_commit(_flush)
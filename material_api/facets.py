@@ -0,0 +1,89 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from itemmaster.models import ItemMaster
+from itemmaster.filters import apply_attribute_filters
+from matg_attributes.schema import get_attribute_schema
+from .result_cache import catalog_version
+
+
+# ============================================================
+# ✅ Attribute facet counts per MatGroup
+# ============================================================
+FACETS_SQL = """
+    SELECT kv.key, facet_value, COUNT(*)
+    FROM ({items_sql}) AS i
+    CROSS JOIN LATERAL jsonb_each(
+        CASE WHEN jsonb_typeof(i.attributes) = 'object' THEN i.attributes ELSE '{{}}'::jsonb END
+    ) AS kv
+    CROSS JOIN LATERAL (
+        SELECT CASE
+            WHEN jsonb_typeof(kv.value) = 'object' THEN kv.value ->> 'value'
+            ELSE kv.value #>> '{{}}'
+        END AS facet_value
+    ) AS v
+    WHERE facet_value IS NOT NULL AND facet_value <> ''
+    GROUP BY kv.key, facet_value
+"""
+
+
+def _filters_digest(params):
+    relevant = sorted(
+        (key, sorted(params.getlist(key)))
+        for key in params.keys()
+        if key.startswith("attr.") or key == "mat_type_code"
+    )
+    return hashlib.sha1(json.dumps(relevant).encode("utf-8")).hexdigest()
+
+
+def compute_group_facets(mgrp_code, params):
+    """
+    Count attribute values of the final, non-deleted items of a group,
+    narrowed by any active attr.* filters, in a single SQL aggregation.
+    """
+    items = ItemMaster.objects.filter(mgrp_code=mgrp_code, is_deleted=False, is_final=True)
+    if params.get("mat_type_code"):
+        items = items.filter(mat_type_code=params.get("mat_type_code"))
+    items = apply_attribute_filters(items, params)
+
+    items_sql, items_params = items.values("attributes").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(FACETS_SQL.format(items_sql=items_sql), items_params)
+        rows = cursor.fetchall()
+
+    counts = {}
+    for name, value, count in rows:
+        counts.setdefault(name, []).append({"value": value, "count": count})
+
+    # Attributes in print-priority order, then any undefined leftovers
+    schema = get_attribute_schema(mgrp_code)
+    ordered = [d.name for d in schema if d.name in counts]
+    ordered += sorted(name for name in counts if name not in schema)
+
+    return [
+        {
+            "attribute": name,
+            "values": sorted(counts[name], key=lambda v: (-v["count"], v["value"])),
+        }
+        for name in ordered
+    ]
+
+
+def get_group_facets(mgrp_code, params):
+    """
+    Cached wrapper around compute_group_facets. Keyed by the catalog version
+    (the CatalogVersion row, bumped after every catalog write commits), so
+    writes from any worker or command retire the cached counts.
+    """
+    key = "material_api:facets:{}:{}:{}".format(
+        mgrp_code, catalog_version(), _filters_digest(params)
+    )
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_group_facets(mgrp_code, params)
+        cache.set(key, facets, getattr(settings, "FACET_CACHE_TIMEOUT", 600))
+    return facets
@@ -0,0 +1,158 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from supergroups.models import SuperGroup
+from .models import GroupTypeItemCount, SuperGroupItemCount
+
+
+# ============================================================
+# ✅ Drill-down item counts per (mgrp_code, mat_type_code) / sgrp_code
+# ============================================================
+def _count_key(state):
+    """(mgrp_code, mat_type_code) an item state is counted under, or None."""
+    if not state or state.get("is_deleted") or not state.get("is_final"):
+        return None
+    if not state.get("mgrp_code") or not state.get("mat_type_code"):
+        return None
+    return state["mgrp_code"], state["mat_type_code"]
+
+
+def _bump(model, lookup, delta):
+    updated = model.objects.filter(**lookup).update(item_count=F("item_count") + delta)
+    if updated or delta < 0:
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(item_count=delta, **lookup)
+    except IntegrityError:
+        # Created concurrently - fall back to the increment
+        model.objects.filter(**lookup).update(item_count=F("item_count") + delta)
+
+
+def _bump_super_group(mgrp_code, delta):
+    sgrp_code = (
+        MatGroup.objects.filter(mgrp_code=mgrp_code, is_deleted=False)
+        .values_list("sgrp_code_id", flat=True)
+        .first()
+    )
+    if sgrp_code:
+        _bump(SuperGroupItemCount, {"sgrp_code_id": sgrp_code}, delta)
+
+
+def apply_item_change(previous, current):
+    """
+    Adjust the counts for one item going from ``previous`` to ``current``.
+    Each state is a dict with mgrp_code, mat_type_code, is_final and
+    is_deleted (or None).
+    """
+    before = _count_key(previous)
+    after = _count_key(current)
+    if before == after:
+        return
+    if after:
+        _bump(GroupTypeItemCount, {"mgrp_code_id": after[0], "mat_type_code_id": after[1]}, 1)
+    if before:
+        _bump(GroupTypeItemCount, {"mgrp_code_id": before[0], "mat_type_code_id": before[1]}, -1)
+
+    # The SuperGroup total only moves when the item changes group (or stops counting)
+    before_group = before[0] if before else None
+    after_group = after[0] if after else None
+    if before_group != after_group:
+        if after_group:
+            _bump_super_group(after_group, 1)
+        if before_group:
+            _bump_super_group(before_group, -1)
+
+
+def item_counts(mgrp_codes=None):
+    """
+    ({mgrp_code: {mat_type_code: count}}, {sgrp_code: count}) of the
+    non-zero counts, for the given groups (all if None).
+    """
+    rows = GroupTypeItemCount.objects.filter(item_count__gt=0)
+    if mgrp_codes is not None:
+        rows = rows.filter(mgrp_code__in=list(mgrp_codes))
+    by_group = {}
+    for mgrp_code, mat_type_code, count in rows.values_list("mgrp_code_id", "mat_type_code_id", "item_count"):
+        by_group.setdefault(mgrp_code, {})[mat_type_code] = count
+
+    by_super = dict(
+        SuperGroupItemCount.objects.filter(item_count__gt=0).values_list("sgrp_code_id", "item_count")
+    )
+    return by_group, by_super
+
+
+# ============================================================
+# ✅ Recount (reconcile with ItemMaster)
+# ============================================================
+def refresh_super_group_counts():
+    """
+    Re-derive every SuperGroup total from the group counts (after a group
+    moved or was deleted). Returns the number of totals that changed.
+    """
+    with transaction.atomic():
+        totals = dict(
+            GroupTypeItemCount.objects
+            .filter(mgrp_code__is_deleted=False, mgrp_code__sgrp_code__isnull=False)
+            .values_list("mgrp_code__sgrp_code")
+            .annotate(n=Sum("item_count"))
+            .order_by()
+        )
+        return _store_counts(
+            SuperGroupItemCount,
+            SuperGroupItemCount.objects.select_for_update(),
+            lambda row: row.sgrp_code_id,
+            {code: totals.get(code, 0) for code in SuperGroup.objects.values_list("sgrp_code", flat=True)},
+            lambda code, count: SuperGroupItemCount(sgrp_code_id=code, item_count=count),
+        )
+
+
+def _store_counts(model, existing, key_of, actual, new_row):
+    """Rewrite stored counts that differ from ``actual`` and add missing ones."""
+    stored = {key_of(row): row for row in existing}
+    fixed = 0
+    for key, row in stored.items():
+        count = actual.get(key, 0)
+        if row.item_count != count:
+            row.item_count = count
+            row.save(update_fields=["item_count", "updated"])
+            fixed += 1
+
+    missing = [new_row(key, count) for key, count in actual.items() if count and key not in stored]
+    model.objects.bulk_create(missing)
+    return fixed + len(missing)
+
+
+def reconcile_item_counts(mgrp_codes=None):
+    """
+    Recount final, non-deleted items of the given groups (all if None) from
+    ItemMaster and rewrite the counts, then the SuperGroup totals.
+    Returns the number of counts that were wrong.
+    """
+    items = ItemMaster.objects.filter(
+        is_deleted=False, is_final=True, mgrp_code__isnull=False, mat_type_code__isnull=False
+    )
+    existing = GroupTypeItemCount.objects.select_for_update()
+    if mgrp_codes is not None:
+        mgrp_codes = [code for code in mgrp_codes if code]
+        items = items.filter(mgrp_code__in=mgrp_codes)
+        existing = existing.filter(mgrp_code__in=mgrp_codes)
+
+    with transaction.atomic():
+        actual = {
+            (mgrp_code, mat_type_code): count
+            for mgrp_code, mat_type_code, count in
+            items.values_list("mgrp_code", "mat_type_code").annotate(n=Count("pk")).order_by()
+        }
+        fixed = _store_counts(
+            GroupTypeItemCount,
+            existing,
+            lambda row: (row.mgrp_code_id, row.mat_type_code_id),
+            actual,
+            lambda key, count: GroupTypeItemCount(mgrp_code_id=key[0], mat_type_code_id=key[1], item_count=count),
+        )
+        fixed += refresh_super_group_counts()
+    return fixed
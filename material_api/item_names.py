@@ -0,0 +1,123 @@
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from itemmaster.models import ItemMaster
+from itemmaster.names import sync_group_item_names, fill_missing_long_names
+from matgroups.models import MatGroup
+from .result_cache import bump_catalog_version
+from .snapshot import patch_snapshot_items
+from .search_backends import get_search_backend
+from .search_documents import refresh_search_documents
+from .similarity import group_changed as similarity_group_changed
+
+
+# Defaults for settings.ITEM_NAMES
+ITEM_NAME_DEFAULTS = {
+    # Groups with more items than this are renamed by a background thread
+    # once the MatGroup save commits; smaller ones before the response
+    "BACKGROUND_THRESHOLD": 5000,
+}
+
+
+def item_name_settings():
+    return {**ITEM_NAME_DEFAULTS, **getattr(settings, "ITEM_NAMES", {})}
+
+
+# ============================================================
+# ✅ MatGroup renames → item mgrp_long_name / long_name
+# ============================================================
+def _items_renamed(mgrp_codes):
+    """Refresh what's derived from item names; bulk UPDATEs send no signals."""
+    mgrp_codes = sorted(mgrp_codes)
+    if connection.vendor == "postgresql":
+        refresh_search_documents(mgrp_codes)
+    patch_snapshot_items(mgrp_codes, bump_catalog_version())
+    backend = get_search_backend()
+    for mgrp_code in mgrp_codes:
+        backend.group_items_changed(mgrp_code)
+        similarity_group_changed(mgrp_code)
+
+
+def propagate_group_name(mgrp_code, previous=None):
+    """
+    Copy the group's current mgrp_longname onto its items (one UPDATE);
+    ``previous`` is the name it had before the rename. Returns the number
+    of items changed.
+    """
+    group = MatGroup.objects.filter(mgrp_code=mgrp_code).values("mgrp_longname").first()
+    if group is None:
+        return 0
+    changed = sync_group_item_names(mgrp_code, group["mgrp_longname"], previous)
+    if changed:
+        _items_renamed([mgrp_code])
+    return changed
+
+
+def _propagate_in_background(mgrp_code, previous):
+    try:
+        propagate_group_name(mgrp_code, previous)
+    except Exception as e:
+        print(f"Item name update for MatGroup {mgrp_code} failed:", e)
+    finally:
+        connection.close()
+
+
+def schedule_group_name_propagation(mgrp_code, previous):
+    """
+    Propagate a rename after the surrounding transaction commits. Large
+    groups are handed to a background thread so the request isn't held up.
+    """
+    def _run():
+        item_count = ItemMaster.objects.filter(mgrp_code=mgrp_code).count()
+        if item_count > item_name_settings()["BACKGROUND_THRESHOLD"]:
+            threading.Thread(
+                target=_propagate_in_background, args=(mgrp_code, previous),
+                name=f"item-names-{mgrp_code}", daemon=True
+            ).start()
+        else:
+            propagate_group_name(mgrp_code, previous)
+    transaction.on_commit(_run)
+
+
+# ============================================================
+# ✅ Backfill (items stored without a long_name)
+# ============================================================
+MISSING_LONG_NAME = Q(long_name__isnull=True) | Q(long_name="")
+
+
+def backfill_long_names(mgrp_codes=None, resync=False):
+    """
+    Fill missing long_names, one UPDATE per group (for the given groups, all
+    if None). ``resync`` also brings mgrp_long_name and generated long_names
+    that don't match the group's current name up to date (long_names entered
+    by hand are kept). Returns items changed.
+    """
+    groups = MatGroup.objects.all()
+    if mgrp_codes is not None:
+        groups = groups.filter(mgrp_code__in=list(mgrp_codes))
+    if not resync:
+        groups = groups.filter(mgrp_code__in=ItemMaster.objects.filter(MISSING_LONG_NAME).values("mgrp_code"))
+
+    changed = 0
+    renamed = set()
+    update = sync_group_item_names if resync else fill_missing_long_names
+    for mgrp_code, mgrp_longname in groups.values_list("mgrp_code", "mgrp_longname").order_by("mgrp_code"):
+        count = update(mgrp_code, mgrp_longname)
+        if count:
+            changed += count
+            renamed.add(mgrp_code)
+
+    # Items without a group: long_name is just the short_name
+    if mgrp_codes is None:
+        changed += (
+            ItemMaster.objects.filter(MISSING_LONG_NAME, mgrp_code__isnull=True)
+            .exclude(Q(short_name__isnull=True) | Q(short_name=""))
+            .update(long_name=F("short_name"))
+        )
+
+    if renamed:
+        _items_renamed(renamed)
+    return changed
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from material_api.item_names import backfill_long_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill ItemMaster.long_name where it is missing, one UPDATE per MatGroup. "
+        "With --resync, also rewrite names left stale by earlier MatGroup renames."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mgrp-code", action="append", help="Only backfill this MatGroup (repeatable)")
+        parser.add_argument(
+            "--resync", action="store_true",
+            help="Also update mgrp_long_name and generated long_names that don't match the group"
+        )
+
+    def handle(self, *args, **options):
+        changed = backfill_long_names(options["mgrp_code"], resync=options["resync"])
+        self.stdout.write(self.style.SUCCESS(f"Backfilled item names ({changed} item(s) updated)"))
@@ -0,0 +1,278 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from MaterialType.models import MaterialType
+from material_api import search_backends, views
+from material_api.item_counts import reconcile_item_counts
+from material_api.ranking import search_settings
+from material_api.result_cache import result_cache
+from material_api.search_documents import refresh_search_documents
+
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "gu", "sha", "tro", "len", "dor", "fin"]
+
+
+class Rollback(Exception):
+    """Raised to undo the synthetic catalog after the run."""
+
+
+def _word(rng, used):
+    while True:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in used:
+            used.add(word)
+            return word
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog, replay a fixed query set through search_groups, "
+        "items_by_group and items_by_group_and_type, and report latency, query "
+        "counts and recall@k / MRR as JSON. The catalog is rolled back unless --keep."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--groups", type=int, default=50)
+        parser.add_argument("--items-per-group", type=int, default=40)
+        parser.add_argument("--mat-types", type=int, default=3)
+        parser.add_argument("--materials", type=int, default=8, help="Size of the Material attribute vocabulary")
+        parser.add_argument("--sizes", type=int, default=10, help="Size of the Size attribute vocabulary")
+        parser.add_argument("--queries", type=int, default=30, help="Queries per endpoint")
+        parser.add_argument("--repeat", type=int, default=3, help="Times each query is replayed")
+        parser.add_argument("--k", type=int, default=10, help="Cut-off for recall@k")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--backend", help="Override MATERIAL_SEARCH['BACKEND'] for the run")
+        parser.add_argument("--use-result-cache", action="store_true",
+                            help="Keep the response cache on (default: cleared before each request)")
+        parser.add_argument("--keep", action="store_true", help="Keep the synthetic catalog")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        conf = dict(search_settings())
+        if options["backend"]:
+            conf["BACKEND"] = options["backend"]
+
+        report = None
+        # Benchmark queries stay out of the search query log, and all come
+        # from one caller, so rate limits and admission control are off
+        with override_settings(
+            MATERIAL_SEARCH=conf, SEARCH_QUERY_LOG={"ENABLED": False},
+            RATE_LIMITS={"ENABLED": False}, ADMISSION_CONTROL={"ENABLED": False},
+        ):
+            search_backends._backend = None
+            try:
+                with transaction.atomic():
+                    catalog = self.seed(options)
+                    self.prepare(catalog, options)
+                    report = self.run(catalog, options)
+                    report["backend"] = search_backends.get_search_backend().name
+                    if not options["keep"]:
+                        raise Rollback()
+            except Rollback:
+                pass
+            finally:
+                search_backends._backend = None
+                result_cache.clear()
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    # ============================================================
+    # ✅ Synthetic catalog
+    # ============================================================
+    def seed(self, options):
+        rng = random.Random(options["seed"])
+        used = set()
+        prefix = f"BENCH{options['seed']}"
+
+        materials = [f"{_word(rng, used)}{rng.randint(100, 999)}" for _ in range(options["materials"])]
+        sizes = sorted(rng.sample(range(5, 500), options["sizes"]))
+
+        # mat_type_code is 4 characters at most
+        mat_types = []
+        for n in range(min(options["mat_types"], 100)):
+            mat_type, _ = MaterialType.objects.get_or_create(
+                mat_type_code=f"ZB{n:02d}", defaults={"mat_type_desc": "Benchmark type"}
+            )
+            mat_types.append(mat_type)
+
+        groups, items = [], []
+        for g in range(options["groups"]):
+            theme = _word(rng, used)
+            extra = [_word(rng, used) for _ in range(3)]
+            group = MatGroup.objects.create(
+                mgrp_code=f"{prefix}G{g}",
+                mgrp_shortname=f"{theme} {extra[0]}",
+                mgrp_longname=f"{theme} {extra[0]} {extra[1]}",
+                notes=f"{theme} {extra[2]}",
+            )
+            groups.append({"group": group, "theme": theme, "extra": extra})
+            for _ in range(options["items_per_group"]):
+                material = rng.choice(materials)
+                size = rng.choice(sizes)
+                items.append(ItemMaster(
+                    mgrp_code=group,
+                    mat_type_code=rng.choice(mat_types),
+                    short_name=f"{theme} {material}, {size} mm",
+                    search_text=f"{extra[1]} {material}",
+                    attributes={"Material": material, "Size": f"{size} mm"},
+                    is_final=True,
+                ))
+        ItemMaster.objects.bulk_create(items, batch_size=1000)
+
+        return {
+            "rng": rng,
+            "groups": groups,
+            "materials": materials,
+            "items": list(ItemMaster.objects.filter(mgrp_code__in=[g["group"] for g in groups])),
+        }
+
+    def prepare(self, catalog, options):
+        """Bring derived search data up to date (bulk_create skips signals)."""
+        codes = [g["group"].mgrp_code for g in catalog["groups"]]
+        if connection.vendor == "postgresql":
+            refresh_search_documents(codes)
+        reconcile_item_counts(codes)
+        backend = search_backends.get_search_backend()
+        if hasattr(backend, "rebuild"):
+            backend.rebuild()
+
+    # ============================================================
+    # ✅ Fixed, labeled query set
+    # ============================================================
+    def build_queries(self, catalog, options):
+        rng = catalog["rng"]
+        by_group = {}
+        for item in catalog["items"]:
+            by_group.setdefault(item.mgrp_code_id, []).append(item)
+
+        queries = {"search_groups": [], "items_by_group": [], "items_by_group_and_type": []}
+        for _ in range(options["queries"]):
+            entry = rng.choice(catalog["groups"])
+            group = entry["group"]
+
+            # Group search: the group's theme word, sometimes with a typo
+            text = entry["theme"]
+            if rng.random() < 0.3 and len(text) > 4:
+                cut = rng.randrange(1, len(text) - 1)
+                text = text[:cut] + text[cut + 1:]
+            queries["search_groups"].append({
+                "body": {"query": text},
+                "relevant": {group.mgrp_code},
+            })
+
+            # Item search inside the group: one of its materials
+            sample = rng.choice(by_group[group.mgrp_code])
+            material = sample.attributes["Material"]
+            queries["items_by_group"].append({
+                "kwargs": {"group_code": group.mgrp_code},
+                "params": {"q": material},
+                "relevant": {
+                    i.local_item_id for i in by_group[group.mgrp_code]
+                    if i.attributes["Material"] == material
+                },
+            })
+            queries["items_by_group_and_type"].append({
+                "kwargs": {"group_code": group.mgrp_code, "mat_type_code": sample.mat_type_code_id},
+                "params": {"q": material},
+                "relevant": {
+                    i.local_item_id for i in by_group[group.mgrp_code]
+                    if i.attributes["Material"] == material and i.mat_type_code_id == sample.mat_type_code_id
+                },
+            })
+        return queries
+
+    # ============================================================
+    # ✅ Replay + metrics
+    # ============================================================
+    def run(self, catalog, options):
+        # django.test's factory: rest_framework.test can't be imported here
+        # because the local "requests" app shadows the requests package
+        factory = RequestFactory()
+        k = options["k"]
+        queries = self.build_queries(catalog, options)
+
+        endpoints = {
+            "search_groups": (views.search_groups, "mgrp_code"),
+            "items_by_group": (views.items_by_group, "local_item_id"),
+            "items_by_group_and_type": (views.items_by_group_and_type, "local_item_id"),
+        }
+
+        results = {}
+        for name, (view, id_field) in endpoints.items():
+            latencies, query_counts, recalls, reciprocal_ranks = [], [], [], []
+            for spec in queries[name]:
+                for _ in range(options["repeat"]):
+                    if not options["use_result_cache"]:
+                        result_cache.clear()
+                    if "body" in spec:
+                        request = factory.post("/", json.dumps(spec["body"]), content_type="application/json")
+                    else:
+                        request = factory.get("/", {**spec["params"], "limit": k})
+
+                    with CaptureQueriesContext(connection) as ctx:
+                        start = time.perf_counter()
+                        response = view(request, **spec.get("kwargs", {}))
+                        if response.status_code != 200:
+                            raise CommandError(
+                                f"{name} returned {response.status_code}: {response.content[:200]!r}"
+                            )
+                        response.render()
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    query_counts.append(len(ctx))
+
+                ranked = [row[id_field] for row in response.data][:k]
+                relevant = spec["relevant"]
+                if relevant:
+                    recalls.append(len(relevant & set(ranked)) / len(relevant))
+                reciprocal_ranks.append(next(
+                    (1.0 / (pos + 1) for pos, ident in enumerate(ranked) if ident in relevant), 0.0
+                ))
+
+            results[name] = {
+                "requests": len(latencies),
+                "latency_ms": {
+                    "p50": _percentile(latencies, 50),
+                    "p95": _percentile(latencies, 95),
+                    "p99": _percentile(latencies, 99),
+                    "mean": sum(latencies) / len(latencies) if latencies else None,
+                },
+                "db_queries": {
+                    "mean": sum(query_counts) / len(query_counts) if query_counts else None,
+                    "max": max(query_counts) if query_counts else None,
+                },
+                f"recall_at_{k}": sum(recalls) / len(recalls) if recalls else None,
+                "mrr": sum(reciprocal_ranks) / len(reciprocal_ranks) if reciprocal_ranks else None,
+            }
+
+        return {
+            "config": {
+                key: options[key] for key in (
+                    "groups", "items_per_group", "mat_types", "materials", "sizes",
+                    "queries", "repeat", "k", "seed", "use_result_cache",
+                )
+            },
+            "search_settings": {key: value for key, value in search_settings().items()},
+            "endpoints": results,
+        }
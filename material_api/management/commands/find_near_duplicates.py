@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from material_api.near_duplicates import NEAR_DUPLICATE_DEFAULTS, find_near_duplicates, write_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Find near-duplicate ItemMaster rows across the catalog with MinHash/LSH, "
+        "verify them with exact Jaccard similarity and store the clusters as a "
+        "NearDuplicateRun (downloadable from /api/reports/near-duplicates/)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mgrp-code", action="append", help="Only scan this MatGroup (repeatable)")
+        parser.add_argument("--final-only", action="store_true", help="Skip items that are not final")
+        parser.add_argument("--threshold", type=float,
+                            help=f"Jaccard similarity to report (default {NEAR_DUPLICATE_DEFAULTS['THRESHOLD']})")
+        parser.add_argument("--num-perm", type=int,
+                            help=f"MinHash permutations (default {NEAR_DUPLICATE_DEFAULTS['NUM_PERM']})")
+        parser.add_argument("--bands", type=int,
+                            help=f"LSH bands (default {NEAR_DUPLICATE_DEFAULTS['BANDS']})")
+        parser.add_argument("--shingle-size", type=int,
+                            help=f"Character n-gram size (default {NEAR_DUPLICATE_DEFAULTS['SHINGLE_SIZE']})")
+        parser.add_argument("--chunk-size", type=int,
+                            help=f"Rows read per database round trip (default {NEAR_DUPLICATE_DEFAULTS['CHUNK_SIZE']})")
+        parser.add_argument("--max-candidates", type=int,
+                            help=f"Candidate pairs to verify at most (default {NEAR_DUPLICATE_DEFAULTS['MAX_CANDIDATES']})")
+        parser.add_argument("--output", help="Also write the .xlsx report to this file")
+
+    def handle(self, *args, **options):
+        try:
+            run = find_near_duplicates(
+                mgrp_codes=options["mgrp_code"],
+                include_unfinal=not options["final_only"],
+                log=self.stdout.write,
+                threshold=options["threshold"],
+                num_perm=options["num_perm"],
+                bands=options["bands"],
+                shingle_size=options["shingle_size"],
+                chunk_size=options["chunk_size"],
+                max_candidates=options["max_candidates"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Run {run.pk}: {run.items_scanned} items, {run.candidate_pairs} candidate pairs, "
+            f"{run.verified_pairs} verified, {run.cluster_count} clusters"
+        ))
+        if options["output"]:
+            with open(options["output"], "wb") as f:
+                write_report(run, f)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
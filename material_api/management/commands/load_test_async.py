@@ -0,0 +1,247 @@
+import asyncio
+import contextlib
+import io
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.urls import path
+
+from Common import Admission
+from Employee.models import Employee
+from itemmaster.models import ItemMaster
+from favorites import views as favorites_views, async_views as favorites_async_views
+from material_api import views, async_views
+from material_api.result_cache import result_cache
+from requests import views as requests_views, async_views as requests_async_views
+
+from .benchmark_search import _percentile
+
+
+# name -> (route, sync view, async view, method, needs auth)
+ENDPOINTS = {
+    "search_groups": ("matgroups/search/", views.search_groups, async_views.search_groups, "POST", False),
+    "super_material_groups": ("matgroups/super-groups/", views.super_material_groups,
+                              async_views.super_material_groups, "GET", False),
+    "materials_by_matgroup": ("matgroups/<str:mgrp_code>/materials/", views.materials_by_matgroup,
+                              async_views.materials_by_matgroup, "GET", False),
+    "items_by_group": ("matgroups/<str:group_code>/items/", views.items_by_group,
+                       async_views.items_by_group, "GET", False),
+    "list_requests": ("requests/list/", requests_views.list_requests,
+                      requests_async_views.list_requests, "GET", True),
+    "get_unread_count": ("requests/unread-count/", requests_views.get_unread_count,
+                         requests_async_views.get_unread_count, "GET", True),
+    "list_favorites": ("favorites/list/", favorites_views.list_favorites,
+                       favorites_async_views.list_favorites, "GET", True),
+}
+
+
+class LoadTestURLConf:
+    """/sync/<route> and /async/<route> for every endpoint."""
+    urlpatterns = [
+        path(f"{mode}/{route}", view, name=f"{mode}_{name}")
+        for name, (route, sync_view, async_view, _, _) in ENDPOINTS.items()
+        for mode, view in (("sync", sync_view), ("async", async_view))
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the ASGI application in-process with concurrent requests and compare "
+        "throughput and latency of the sync and async versions of the hot read "
+        "endpoints. Read-only: runs against the current catalog and requests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and mode")
+        parser.add_argument("--endpoints", nargs="*", choices=sorted(ENDPOINTS), help="Default: all")
+        parser.add_argument("--group", help="mgrp_code for the group endpoints (default: largest group)")
+        parser.add_argument("--query", help="Search text (default: first word of an item in the group)")
+        parser.add_argument("--emp-id", type=int, help="Employee for the authenticated endpoints")
+        parser.add_argument("--use-result-cache", action="store_true",
+                            help="Keep the response cache on (default: every request misses)")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        group, query = self.pick_group(options)
+        employee = (
+            Employee.objects.filter(emp_id=options["emp_id"]).first()
+            if options["emp_id"] else Employee.objects.order_by("emp_id").first()
+        )
+        names = options["endpoints"] or list(ENDPOINTS)
+        if employee is None and any(ENDPOINTS[n][4] for n in names):
+            raise CommandError("No employee found for the authenticated endpoints (use --emp-id)")
+
+        token = None
+        if employee is not None:
+            token = jwt.encode(
+                {
+                    "emp_id": employee.emp_id,
+                    "role": "Admin",
+                    "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+                },
+                settings.SECRET_KEY, algorithm="HS256",
+            )
+
+        max_entries = result_cache.max_entries
+        if not options["use_result_cache"]:
+            result_cache.clear()
+            result_cache.max_entries = 0  # every set() is evicted at once
+
+        results = {}
+        try:
+            # Synthetic traffic stays out of the search query log, and all comes
+            # from one caller, so rate limits and admission control are off
+            with override_settings(
+                ROOT_URLCONF=LoadTestURLConf, SEARCH_QUERY_LOG={"ENABLED": False},
+                RATE_LIMITS={"ENABLED": False}, ADMISSION_CONTROL={"ENABLED": False},
+            ):
+                Admission._controller = None
+                app = ASGIHandler()
+                # The authenticate decorator prints every user it lets through
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for name in names:
+                        results[name] = {
+                            mode: asyncio.run(self.run_endpoint(app, mode, name, group, query, token, options))
+                            for mode in ("sync", "async")
+                        }
+                        sync_rps = results[name]["sync"]["requests_per_sec"]
+                        async_rps = results[name]["async"]["requests_per_sec"]
+                        results[name]["async_speedup"] = round(async_rps / sync_rps, 2) if sync_rps else None
+        finally:
+            result_cache.max_entries = max_entries
+            Admission._controller = None
+
+        report = {
+            "config": {
+                "concurrency": options["concurrency"],
+                "requests": options["requests"],
+                "group": group,
+                "query": query,
+                "emp_id": employee.emp_id if employee else None,
+                "use_result_cache": options["use_result_cache"],
+            },
+            "endpoints": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def pick_group(self, options):
+        group = options["group"]
+        if not group:
+            largest = (
+                ItemMaster.objects.filter(is_deleted=False)
+                .values("mgrp_code").annotate(n=Count("local_item_id")).order_by("-n").first()
+            )
+            if largest is None:
+                raise CommandError("No items in the catalog")
+            group = largest["mgrp_code"]
+
+        query = options["query"]
+        if not query:
+            name = (
+                ItemMaster.objects.filter(mgrp_code=group, is_deleted=False)
+                .exclude(short_name="").values_list("short_name", flat=True).first()
+            )
+            query = (name or group).replace(",", " ").split()[0]
+        return group, query
+
+    # ============================================================
+    # ✅ In-process ASGI client
+    # ============================================================
+    def build_request(self, mode, name, group, query, token):
+        route, _, _, method, needs_auth = ENDPOINTS[name]
+        path_ = "/" + mode + "/" + route.replace("<str:mgrp_code>", group).replace("<str:group_code>", group)
+        query_string, body = b"", b""
+        if name == "search_groups":
+            body = json.dumps({"query": query}).encode()
+        elif name == "items_by_group":
+            query_string = f"q={query}&limit=50".encode()
+
+        headers = [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if needs_auth:
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path_,
+            "raw_path": path_.encode(),
+            "query_string": query_string,
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        return scope, body
+
+    async def request(self, app, scope, body):
+        sent = {"status": None}
+        done = asyncio.Event()
+
+        async def receive():
+            if not sent.get("body_sent"):
+                sent["body_sent"] = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                sent["status"] = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+
+        await app(scope, receive, send)
+        done.set()
+        return sent["status"]
+
+    async def run_endpoint(self, app, mode, name, group, query, token, options):
+        scope, body = self.build_request(mode, name, group, query, token)
+
+        # One warm-up request (snapshot / index builds, connections)
+        status = await self.request(app, dict(scope), body)
+        if status != 200:
+            raise CommandError(f"{mode} {name}: warm-up request returned {status}")
+
+        latencies, statuses = [], {}
+        remaining = iter(range(options["requests"]))
+
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                status = await self.request(app, dict(scope), body)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(options["concurrency"])))
+        elapsed = time.perf_counter() - start
+
+        return {
+            "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else None,
+            "latency_ms": {
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "p99": _percentile(latencies, 99),
+            },
+            "statuses": {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))},
+        }
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from material_api.search_documents import refresh_search_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored MatGroup search documents used by search_groups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mgrp-code", action="append", help="Only rebuild this MatGroup (repeatable)")
+
+    def handle(self, *args, **options):
+        written = refresh_search_documents(options["mgrp_code"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} search document(s)"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from material_api.item_counts import reconcile_item_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount final items per (mgrp_code, mat_type_code) and per super group "
+        "from ItemMaster and fix the drill-down count rollups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mgrp-code", action="append", help="Only reconcile this MatGroup (repeatable)")
+
+    def handle(self, *args, **options):
+        fixed = reconcile_item_counts(options["mgrp_code"])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled item counts ({fixed} count(s) corrected)"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from material_api.popularity import refresh_popularity
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute item and MatGroup popularity (favorites, shares, requests) and "
+        "store it in ItemMaster.popularity / MatGroup.popularity for search ranking."
+    )
+
+    def handle(self, *args, **options):
+        changed = refresh_popularity()
+        if changed is None:
+            raise CommandError("Another popularity refresh is running")
+        items, groups = changed
+        self.stdout.write(self.style.SUCCESS(f"Updated popularity of {items} item(s) and {groups} group(s)"))
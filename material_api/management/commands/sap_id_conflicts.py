@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from material_api.sap_ids import sap_id_conflicts
+
+
+class Command(BaseCommand):
+    help = (
+        "List SAP ids shared by more than one non-deleted ItemMaster row. These "
+        "must be resolved before the unique SAP id constraint can be applied."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Write the conflicts as JSON to this file")
+
+    def handle(self, *args, **options):
+        conflicts = sap_id_conflicts()
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(conflicts, f, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        for conflict in conflicts:
+            self.stdout.write(f"SAP id {conflict['sap_item_id']}:")
+            for item in conflict["items"]:
+                self.stdout.write(
+                    f"  local_item_id={item['local_item_id']} mgrp_code={item['mgrp_code']} "
+                    f"final={item['is_final']} updated={item['updated']:%Y-%m-%d} {item['short_name']}"
+                )
+        if conflicts:
+            self.stdout.write(self.style.WARNING(f"{len(conflicts)} conflicting SAP id(s)"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No conflicting SAP ids"))
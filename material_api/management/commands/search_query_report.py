@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from material_api.query_log import search_query_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the slowest, zero-result and most frequent search queries and the "
+        "search volume over time, from the SearchQueryLog table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Look back this many days (default 7)")
+        parser.add_argument("--limit", type=int, default=20, help="Queries per list (default 20)")
+        parser.add_argument("--endpoint", help="Only this endpoint (search_groups, items_by_group, ...)")
+        parser.add_argument("--bucket", choices=["day", "hour"], default="day", help="Volume period")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        report = search_query_report(
+            days=options["days"], limit=options["limit"],
+            endpoint=options["endpoint"], bucket=options["bucket"],
+        )
+        output = json.dumps(report, indent=2, default=str)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-19 05:02
+
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_search_documents(apps, schema_editor):
+    # Raw SQL only, so it is safe to reuse the runtime helper here
+    from material_api.search_documents import refresh_search_documents
+    refresh_search_documents()
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('matgroups', '0012_matgroup_uom_values'),
+        ('itemmaster', '0012_itemattributenumber'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='MatGroupSearchDocument',
+            fields=[
+                ('mgrp_code', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='matgroups.matgroup')),
+                ('document', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('text', models.TextField(blank=True, default='')),
+                ('item_count', models.IntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [
+                    django.contrib.postgres.indexes.GinIndex(fields=['document'], name='matgroupsearch_document_gin'),
+                    django.contrib.postgres.indexes.GinIndex(fields=['text'], name='matgroupsearch_text_trgm', opclasses=['gin_trgm_ops']),
+                ],
+            },
+        ),
+        # Build documents for the existing catalog
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
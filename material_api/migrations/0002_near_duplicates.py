@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-19 04:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('itemmaster', '0013_itemmaster_trigram_indexes'),
+        ('material_api', '0001_matgroupsearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NearDuplicateRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('items_scanned', models.IntegerField(default=0)),
+                ('candidate_pairs', models.IntegerField(default=0)),
+                ('verified_pairs', models.IntegerField(default=0)),
+                ('cluster_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='NearDuplicateMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.IntegerField()),
+                ('similarity', models.FloatField()),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='near_duplicate_memberships', to='itemmaster.itemmaster')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='material_api.nearduplicaterun')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='nearduplicatemember',
+            index=models.Index(fields=['run', 'cluster'], name='neardup_run_cluster_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 05:04
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('material_api', '0002_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQueryLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField()),
+                ('endpoint', models.CharField(max_length=50)),
+                ('query', models.CharField(blank=True, max_length=255)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('result_count', models.IntegerField()),
+                ('latency_ms', models.FloatField()),
+                ('backend', models.CharField(max_length=20)),
+                ('degraded', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchquerylog',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created'], name='searchquerylog_created_brin'),
+        ),
+    ]
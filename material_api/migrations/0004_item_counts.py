@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-19 05:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MaterialType', '0005_alter_materialtype_createdby_and_more'),
+        ('matgroups', '0013_matgroup_popularity'),
+        ('supergroups', '0003_alter_supergroup_createdby_and_more'),
+        ('material_api', '0003_searchquerylog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuperGroupItemCount',
+            fields=[
+                ('sgrp_code', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='item_total', serialize=False, to='supergroups.supergroup')),
+                ('item_count', models.IntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GroupTypeItemCount',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('item_count', models.IntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('mat_type_code', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_item_counts', to='MaterialType.materialtype')),
+                ('mgrp_code', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='type_item_counts', to='matgroups.matgroup')),
+            ],
+            options={
+                'unique_together': {('mgrp_code', 'mat_type_code')},
+            },
+        ),
+        # Seed the counts from the existing catalog
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO material_api_grouptypeitemcount (mgrp_code_id, mat_type_code_id, item_count, updated)
+                SELECT i.mgrp_code, i.mat_type_code, COUNT(*), NOW()
+                FROM itemmaster_itemmaster AS i
+                WHERE i.is_deleted = false AND i.is_final = true
+                  AND i.mgrp_code IS NOT NULL AND i.mat_type_code IS NOT NULL
+                GROUP BY i.mgrp_code, i.mat_type_code
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO material_api_supergroupitemcount (sgrp_code_id, item_count, updated)
+                SELECT g.sgrp_code_id, SUM(c.item_count), NOW()
+                FROM material_api_grouptypeitemcount AS c
+                JOIN matgroups_matgroup AS g ON g.mgrp_code = c.mgrp_code_id
+                WHERE g.is_deleted = false AND g.sgrp_code_id IS NOT NULL
+                GROUP BY g.sgrp_code_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 09:40
+
+from django.db import migrations
+
+
+# Add item long names to the stored trigram text of existing documents
+# (new and refreshed documents get them from search_documents.REFRESH_SQL)
+ADD_LONG_NAMES_SQL = """
+    UPDATE material_api_matgroupsearchdocument AS d
+    SET text = concat_ws(' ', g.mgrp_shortname, g.mgrp_longname, g.notes, agg.short_names, agg.long_names, agg.search_texts)
+    FROM matgroups_matgroup AS g
+    LEFT JOIN LATERAL (
+        SELECT
+            string_agg(DISTINCT i.short_name, ' ') AS short_names,
+            string_agg(DISTINCT i.long_name, ' ') AS long_names,
+            string_agg(DISTINCT i.search_text, ' ') AS search_texts
+        FROM itemmaster_itemmaster AS i
+        WHERE i.mgrp_code = g.mgrp_code AND i.is_deleted = false
+    ) AS agg ON true
+    WHERE d.mgrp_code_id = g.mgrp_code
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('material_api', '0005_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(ADD_LONG_NAMES_SQL, migrations.RunSQL.noop),
+    ]
@@ -1,3 +1,154 @@
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
-# Create your models here.
+
+class MatGroupSearchDocument(models.Model):
+    """
+    Pre-built search document per MatGroup (group names/notes plus the names
+    and search_text of its non-deleted items), maintained incrementally from
+    ItemMaster/MatGroup writes so search_groups is a GIN index lookup.
+    """
+    mgrp_code = models.OneToOneField(
+        "matgroups.MatGroup",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document"
+    )
+
+    # Weighted tsvector (A: item names + notes, B: search_text + group names)
+    document = SearchVectorField(null=True)
+
+    # Aggregated plain text for trigram (fuzzy) matching
+    text = models.TextField(blank=True, default="")
+
+    item_count = models.IntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["document"], name="matgroupsearch_document_gin"),
+            GinIndex(fields=["text"], name="matgroupsearch_text_trgm", opclasses=["gin_trgm_ops"]),
+        ]
+
+    def __str__(self):
+        return f"Search document for {self.mgrp_code_id}"
+
+
+class NearDuplicateRun(models.Model):
+    """One run of the find_near_duplicates job (MinHash/LSH over the catalog)."""
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    params = models.JSONField(default=dict, blank=True)
+
+    items_scanned = models.IntegerField(default=0)
+    candidate_pairs = models.IntegerField(default=0)
+    verified_pairs = models.IntegerField(default=0)
+    cluster_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-created"]
+
+    def __str__(self):
+        return f"Near-duplicate run {self.pk} ({self.cluster_count} clusters)"
+
+
+class NearDuplicateMember(models.Model):
+    """An item in a cluster of near-duplicates found by a NearDuplicateRun."""
+    run = models.ForeignKey(NearDuplicateRun, on_delete=models.CASCADE, related_name="members")
+    cluster = models.IntegerField()
+    item = models.ForeignKey(
+        "itemmaster.ItemMaster",
+        on_delete=models.CASCADE,
+        related_name="near_duplicate_memberships"
+    )
+
+    # Best verified Jaccard similarity to another item in the cluster
+    similarity = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["run", "cluster"], name="neardup_run_cluster_idx"),
+        ]
+
+    def __str__(self):
+        return f"Run {self.run_id} cluster {self.cluster}: item {self.item_id}"
+
+
+class SearchQueryLog(models.Model):
+    """
+    One search served by material_api (append-only, written in batches by
+    material_api.query_log). Feeds the slow / zero-result query report.
+    """
+    created = models.DateTimeField()
+    endpoint = models.CharField(max_length=50)
+    # Lower-cased, whitespace-collapsed query text
+    query = models.CharField(max_length=255, blank=True)
+    filters = models.JSONField(default=dict, blank=True)
+    result_count = models.IntegerField()
+    latency_ms = models.FloatField()
+    backend = models.CharField(max_length=20)
+    degraded = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Rows arrive in time order, so a BRIN index covers date ranges cheaply
+            BrinIndex(fields=["created"], name="searchquerylog_created_brin"),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint}: {self.query!r} ({self.result_count} results, {self.latency_ms:.0f} ms)"
+
+
+class GroupTypeItemCount(models.Model):
+    """
+    Number of final, non-deleted items per (MatGroup, MaterialType), shown
+    by the drill-down. Maintained incrementally from ItemMaster writes (see
+    item_counts.py) and repairable with the reconcile_item_counts command.
+    """
+    id = models.AutoField(primary_key=True)
+    mgrp_code = models.ForeignKey(
+        "matgroups.MatGroup",
+        on_delete=models.CASCADE,
+        related_name="type_item_counts"
+    )
+    mat_type_code = models.ForeignKey(
+        "MaterialType.MaterialType",
+        on_delete=models.CASCADE,
+        related_name="group_item_counts"
+    )
+    item_count = models.IntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("mgrp_code", "mat_type_code")
+
+    def __str__(self):
+        return f"{self.mgrp_code_id}/{self.mat_type_code_id}: {self.item_count}"
+
+
+class SuperGroupItemCount(models.Model):
+    """Total of GroupTypeItemCount over the non-deleted MatGroups of a SuperGroup."""
+    sgrp_code = models.OneToOneField(
+        "supergroups.SuperGroup",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="item_total"
+    )
+    item_count = models.IntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.sgrp_code_id}: {self.item_count}"
+
+
+class CatalogVersion(models.Model):
+    """
+    Single row counting catalog writes. Cached search / drill-down results
+    and the catalog snapshot are keyed by it, in every worker process.
+    """
+    version = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
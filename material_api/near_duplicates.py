@@ -0,0 +1,252 @@
+import zlib
+from itertools import islice
+
+import numpy as np
+import openpyxl
+from django.db import transaction
+from django.utils import timezone
+
+from itemmaster.models import ItemMaster
+from .models import NearDuplicateRun, NearDuplicateMember
+from .similarity import char_ngrams, item_document
+
+
+NEAR_DUPLICATE_DEFAULTS = {
+    "NUM_PERM": 128,
+    # BANDS x ROWS = NUM_PERM. 16 x 8 puts the LSH threshold near 0.71
+    # (~95% of pairs at 0.8 become candidates); more bands find less similar ones
+    "BANDS": 16,
+    # Verified (exact) Jaccard similarity needed to report a pair
+    "THRESHOLD": 0.8,
+    "SHINGLE_SIZE": 3,
+    "CHUNK_SIZE": 2000,
+    # Buckets larger than this are only paired against their first member
+    "MAX_BUCKET": 50,
+    # Stop collecting candidate pairs past this many (bounds memory; the run
+    # records that it was capped)
+    "MAX_CANDIDATES": 1000000,
+}
+
+# Mersenne prime 2**31 - 1 for the universal hash family (a*x + b) mod p.
+# With x, a, b < p, a*x + b < 2**63, so the uint64 arithmetic can't overflow.
+_PRIME = 2 ** 31 - 1
+
+
+# ============================================================
+# ✅ Shingles + MinHash signatures
+# ============================================================
+def item_shingles(short_name, attributes, size=3):
+    """Character n-grams of the item's name and attribute values (normalized)."""
+    return set(char_ngrams(item_document(short_name, "", attributes), (size,)))
+
+
+class MinHasher:
+    def __init__(self, num_perm, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, shingles):
+        if not shingles:
+            return None
+        # Reduce the 32-bit CRCs mod p first so every product stays below 2**62
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        return ((self.a * hashes[None, :] + self.b) % np.uint64(_PRIME)).min(axis=1)
+
+
+def band_keys(signature, bands):
+    """One hash per LSH band of the signature."""
+    return [hash(band.tobytes()) for band in np.split(signature, bands)]
+
+
+def bucket_pairs(members, max_bucket):
+    """Candidate pairs of one LSH bucket (sorted ids); big buckets pair with their first member only."""
+    if len(members) <= max_bucket:
+        return (
+            (members[i], members[j])
+            for i in range(len(members)) for j in range(i + 1, len(members))
+        )
+    return ((members[0], other) for other in members[1:])
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        root = x
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while x != root:  # path compression
+            self.parent[x], x = root, self.parent.get(x, x)
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+# ============================================================
+# ✅ Catalog scan
+# ============================================================
+def _item_rows(queryset, chunk_size):
+    return queryset.values_list("local_item_id", "short_name", "attributes").iterator(chunk_size=chunk_size)
+
+
+def find_near_duplicates(mgrp_codes=None, include_unfinal=True, log=print, **options):
+    """
+    Stream non-deleted items, MinHash them and bucket the signatures with
+    LSH, then verify candidate pairs with exact Jaccard similarity and
+    store the clusters as a NearDuplicateRun.
+
+    Memory is bounded per item: only the id and one 64-bit key per band are
+    kept while scanning; texts are re-read in chunks for verification.
+    """
+    conf = {**NEAR_DUPLICATE_DEFAULTS, **{k.upper(): v for k, v in options.items() if v is not None}}
+    if conf["NUM_PERM"] % conf["BANDS"]:
+        raise ValueError("NUM_PERM must be a multiple of BANDS")
+
+    items = ItemMaster.objects.filter(is_deleted=False)
+    if mgrp_codes:
+        items = items.filter(mgrp_code__in=mgrp_codes)
+    if not include_unfinal:
+        items = items.filter(is_final=True)
+
+    # 1. Signatures → LSH band keys
+    hasher = MinHasher(conf["NUM_PERM"])
+    id_chunks, key_chunks = [], []
+    ids, keys = [], []
+    for local_item_id, short_name, attributes in _item_rows(items, conf["CHUNK_SIZE"]):
+        signature = hasher.signature(item_shingles(short_name, attributes, conf["SHINGLE_SIZE"]))
+        if signature is None:
+            continue
+        ids.append(local_item_id)
+        keys.append(band_keys(signature, conf["BANDS"]))
+        if len(ids) >= conf["CHUNK_SIZE"]:
+            id_chunks.append(np.array(ids, dtype=np.int64))
+            key_chunks.append(np.array(keys, dtype=np.int64))
+            ids, keys = [], []
+    if ids:
+        id_chunks.append(np.array(ids, dtype=np.int64))
+        key_chunks.append(np.array(keys, dtype=np.int64))
+
+    all_ids = np.concatenate(id_chunks) if id_chunks else np.zeros(0, dtype=np.int64)
+    all_keys = np.concatenate(key_chunks) if key_chunks else np.zeros((0, conf["BANDS"]), dtype=np.int64)
+    del id_chunks, key_chunks
+    log(f"Signed {len(all_ids)} items")
+
+    # 2. Candidate pairs: items sharing any band key
+    candidates = set()
+    capped = False
+    for band in range(all_keys.shape[1]):
+        order = np.argsort(all_keys[:, band], kind="stable")
+        column = all_keys[order, band]
+        starts = np.flatnonzero(np.r_[True, column[1:] != column[:-1]])
+        ends = np.r_[starts[1:], len(column)]
+        for start, end in zip(starts, ends):
+            if end - start < 2:
+                continue
+            members = sorted(all_ids[order[start:end]].tolist())
+            room = conf["MAX_CANDIDATES"] - len(candidates)
+            candidates.update(islice(bucket_pairs(members, conf["MAX_BUCKET"]), room))
+            if len(candidates) >= conf["MAX_CANDIDATES"]:
+                capped = True
+                break
+        if capped:
+            log(f"Stopped at {conf['MAX_CANDIDATES']} candidate pairs (band {band + 1} of {all_keys.shape[1]})")
+            break
+    log(f"{len(candidates)} candidate pairs")
+    items_scanned = len(all_ids)
+    del all_ids, all_keys
+
+    # 3. Verify candidates with exact Jaccard, a chunk of pairs at a time
+    clusters = _UnionFind()
+    best = {}
+    verified = 0
+    pairs = sorted(candidates)
+    del candidates
+    step = conf["CHUNK_SIZE"]
+    for start in range(0, len(pairs), step):
+        chunk = pairs[start:start + step]
+        needed = {i for pair in chunk for i in pair}
+        shingles = {
+            local_item_id: item_shingles(short_name, attributes, conf["SHINGLE_SIZE"])
+            for local_item_id, short_name, attributes in _item_rows(
+                ItemMaster.objects.filter(local_item_id__in=needed), step
+            )
+        }
+        for a, b in chunk:
+            score = jaccard(shingles.get(a), shingles.get(b))
+            if score >= conf["THRESHOLD"]:
+                verified += 1
+                clusters.union(a, b)
+                best[a] = max(best.get(a, 0.0), score)
+                best[b] = max(best.get(b, 0.0), score)
+    log(f"{verified} pairs at or above {conf['THRESHOLD']}")
+
+    # 4. Store clusters (numbered by their smallest item id)
+    groups = {}
+    for local_item_id in best:
+        groups.setdefault(clusters.find(local_item_id), []).append(local_item_id)
+
+    with transaction.atomic():
+        run = NearDuplicateRun.objects.create(
+            params={
+                **{k.lower(): v for k, v in conf.items()},
+                "mgrp_codes": list(mgrp_codes or []),
+                "include_unfinal": include_unfinal,
+                "candidates_capped": capped,
+            },
+            items_scanned=items_scanned,
+            candidate_pairs=len(pairs),
+            verified_pairs=verified,
+            cluster_count=len(groups),
+        )
+        NearDuplicateMember.objects.bulk_create(
+            (
+                NearDuplicateMember(run=run, cluster=number, item_id=local_item_id, similarity=round(best[local_item_id], 4))
+                for number, root in enumerate(sorted(groups), start=1)
+                for local_item_id in sorted(groups[root])
+            ),
+            batch_size=1000,
+        )
+        run.finished = timezone.now()
+        run.save(update_fields=["finished"])
+    return run
+
+
+# ============================================================
+# ✅ Excel report
+# ============================================================
+REPORT_HEADERS = [
+    "Cluster", "Local Item ID", "SAP Item ID", "MatGroup", "Material Type",
+    "Short Name", "Similarity", "Final",
+]
+
+
+def write_report(run, stream):
+    """Write a run's clusters as .xlsx to ``stream`` (write-only workbook, streamed rows)."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Near Duplicates")
+    ws.append(REPORT_HEADERS)
+    members = (
+        NearDuplicateMember.objects.filter(run=run)
+        .order_by("cluster", "item_id")
+        .values_list(
+            "cluster", "item_id", "item__sap_item_id", "item__mgrp_code_id",
+            "item__mat_type_code_id", "item__short_name", "similarity", "item__is_final",
+        )
+    )
+    for row in members.iterator(chunk_size=2000):
+        ws.append(list(row))
+    wb.save(stream)
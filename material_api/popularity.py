@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+
+from favorites.models import Favorite, SharedMaterial
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from requests.models import Request
+from .autocomplete import update_popularity
+from .result_cache import bump_catalog_version
+from .search_backends import get_search_backend
+from .snapshot import patch_snapshot
+
+
+# Defaults for settings.POPULARITY
+POPULARITY_DEFAULTS = {
+    # Seconds between refreshes of the stored scores (0 disables the
+    # background refresher; run `manage.py refresh_popularity` instead)
+    "REFRESH_INTERVAL": 3600,
+}
+
+# pg advisory lock key, so only one worker refreshes at a time
+REFRESH_LOCK_ID = 460046
+
+
+def popularity_settings():
+    return {**POPULARITY_DEFAULTS, **getattr(settings, "POPULARITY", {})}
+
+
+# ============================================================
+# ✅ Popularity scores per item / MatGroup
+# ============================================================
+def item_popularity():
+    """
+    {local_item_id: score}: active favorites + shares + requests that
+    reference the item. Items without any activity are left out (score 0).
+    """
+    scores = Counter()
+    sources = (
+        (Favorite.objects.filter(is_deleted=False), "item_id"),
+        (SharedMaterial.objects.filter(is_deleted=False), "item_id"),
+        (Request.objects.filter(is_deleted=False, sap_item__isnull=False), "sap_item_id"),
+    )
+    for qs, field in sources:
+        for item_id, count in qs.values_list(field).annotate(n=Count("pk")):
+            scores[item_id] += count
+    return scores
+
+
+def group_popularity(item_scores=None):
+    """
+    {mgrp_code: score}: popularity of the group's non-deleted items plus
+    requests raised against the group itself.
+    """
+    if item_scores is None:
+        item_scores = item_popularity()
+
+    scores = Counter()
+    items = ItemMaster.objects.filter(
+        is_deleted=False, local_item_id__in=list(item_scores)
+    ).values_list("local_item_id", "mgrp_code_id")
+    for item_id, mgrp_code in items:
+        scores[mgrp_code] += item_scores[item_id]
+
+    requests = (
+        Request.objects.filter(is_deleted=False, material_group__isnull=False)
+        .values_list("material_group_id")
+        .annotate(n=Count("pk"))
+    )
+    for mgrp_code, count in requests:
+        scores[mgrp_code] += count
+    return scores
+
+
+# ============================================================
+# ✅ Stored scores (ItemMaster.popularity / MatGroup.popularity)
+# ============================================================
+# Search reads the stored columns, so ranking never joins the favorites /
+# shares / requests tables at query time.
+def _store_scores(model, key, scores):
+    """
+    Write ``scores`` to ``model.popularity``, touching only rows whose value
+    changed. Returns the number of rows updated (scores of rows that no
+    longer exist update none).
+    """
+    current = dict(model.objects.filter(popularity__gt=0).values_list(key, "popularity"))
+    changed = {pk: score for pk, score in scores.items() if current.get(pk, 0) != score}
+    changed.update({pk: 0 for pk in current if pk not in scores})
+    if not changed:
+        return 0
+    return model.objects.bulk_update(
+        [model(**{key: pk, "popularity": score}) for pk, score in changed.items()],
+        ["popularity"],
+        batch_size=1000,
+    )
+
+
+def refresh_popularity():
+    """
+    Recompute item and group popularity and store it. Returns
+    (items changed, groups changed), or None if another worker is
+    refreshing right now.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [REFRESH_LOCK_ID])
+                if not cursor.fetchone()[0]:
+                    return None
+
+        item_scores = item_popularity()
+        group_scores = group_popularity(item_scores)
+        items = _store_scores(ItemMaster, "local_item_id", item_scores)
+        groups = _store_scores(MatGroup, "mgrp_code", group_scores)
+
+    if items or groups:
+        # Cached result order may have changed; the snapshot holds no scores
+        patch_snapshot(bump_catalog_version())
+    # Also when no row changed here: another worker may have stored these
+    # scores, and this worker's in-memory copies still hold the old ones
+    update_popularity(item_scores, group_scores)
+    get_search_backend().popularity_changed(item_scores, group_scores)
+    return items, groups
+
+
+def start_popularity_refresher():
+    """Refresh the stored scores now and every REFRESH_INTERVAL seconds (daemon thread)."""
+    interval = popularity_settings()["REFRESH_INTERVAL"]
+    if not interval:
+        return
+
+    def _run():
+        while True:
+            try:
+                refresh_popularity()
+            except Exception as e:
+                print("Popularity refresh failed:", e)
+            time.sleep(interval)
+    threading.Thread(target=_run, name="popularity-refresh", daemon=True).start()
@@ -0,0 +1,270 @@
+import asyncio
+import atexit
+import functools
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from itemmaster.filters import ATTRIBUTE_PARAM_PREFIX
+from .models import SearchQueryLog
+from .result_cache import json_body
+from .search_backends import get_search_backend, DEGRADED_HEADER
+
+
+# Defaults for settings.SEARCH_QUERY_LOG
+QUERY_LOG_DEFAULTS = {
+    "ENABLED": True,
+    # Rows per INSERT, and the queue length that triggers an early flush
+    "BATCH_SIZE": 500,
+    # Seconds between flushes of the in-process queue
+    "FLUSH_INTERVAL": 5,
+    # Searches held in memory at most; further ones are dropped (and counted)
+    "MAX_QUEUE": 20000,
+    # Rows older than this are deleted by the writer (0 keeps everything)
+    "RETENTION_DAYS": 90,
+}
+
+# Seconds between retention sweeps
+PRUNE_INTERVAL = 3600
+
+
+def query_log_settings():
+    return {**QUERY_LOG_DEFAULTS, **getattr(settings, "SEARCH_QUERY_LOG", {})}
+
+
+def normalize_query(query):
+    return " ".join(str(query or "").lower().split())[:255]
+
+
+# ============================================================
+# ✅ Batched writer (off the request path)
+# ============================================================
+class QueryLogWriter:
+    """
+    Requests append a tuple to an in-process queue; a daemon thread turns
+    them into SearchQueryLog rows with one bulk INSERT per BATCH_SIZE,
+    every FLUSH_INTERVAL seconds (or sooner when the queue fills up).
+    """
+
+    def __init__(self, conf):
+        self.conf = conf
+        self._queue = deque()
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pruned_at = 0.0
+        self.written = 0
+        self.dropped = 0
+
+    def add(self, entry):
+        if len(self._queue) >= self.conf["MAX_QUEUE"]:
+            self.dropped += 1
+            return
+        self._queue.append(entry)
+        if self._thread is None:
+            self._start()
+        if len(self._queue) >= self.conf["BATCH_SIZE"]:
+            self._wakeup.set()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="search-query-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.conf["FLUSH_INTERVAL"])
+            self._wakeup.clear()
+            try:
+                self.flush()
+                self.prune()
+            except Exception as e:
+                print("Search query log write failed:", e)
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of rows written."""
+        with self._flush_lock:
+            written = 0
+            while self._queue:
+                rows = []
+                while self._queue and len(rows) < self.conf["BATCH_SIZE"]:
+                    rows.append(_log_row(*self._queue.popleft()))
+                SearchQueryLog.objects.bulk_create(rows)
+                written += len(rows)
+            self.written += written
+            return written
+
+    def prune(self):
+        days = self.conf["RETENTION_DAYS"]
+        if not days or time.monotonic() - self._pruned_at < PRUNE_INTERVAL:
+            return
+        self._pruned_at = time.monotonic()
+        SearchQueryLog.objects.filter(created__lt=timezone.now() - timedelta(days=days)).delete()
+
+    def stats(self):
+        return {"queued": len(self._queue), "written": self.written, "dropped": self.dropped}
+
+
+def _log_row(created, endpoint, query, filters, result_count, latency_ms, backend, degraded):
+    return SearchQueryLog(
+        created=created,
+        endpoint=endpoint,
+        query=normalize_query(query),
+        filters=filters,
+        result_count=result_count,
+        latency_ms=latency_ms,
+        backend=backend,
+        degraded=degraded,
+    )
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_query_log_writer():
+    """The worker's query log writer (one per process)."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = QueryLogWriter(query_log_settings())
+    return _writer
+
+
+# ============================================================
+# ✅ What a search asked for
+# ============================================================
+def group_search_params(request, kwargs):
+    """(query, filters) of a search_groups request."""
+    data = request.data if hasattr(request, "data") else json_body(request)
+    if not isinstance(data, dict):
+        return None
+    filters = {"search_type": data["search_type"]} if data.get("search_type") else {}
+    return data.get("query"), filters
+
+
+def item_search_params(request, kwargs):
+    """(query, filters) of an items_by_group(_and_type) request; None for plain listings."""
+    params = request.GET
+    attributes = {key: params.get(key) for key in params if key.startswith(ATTRIBUTE_PARAM_PREFIX)}
+    query = params.get("q", "").strip()
+    if not query and not attributes:
+        return None
+    filters = {"mgrp_code": kwargs.get("group_code"), **attributes}
+    if kwargs.get("mat_type_code"):
+        filters["mat_type_code"] = kwargs["mat_type_code"]
+    for key in ("limit", "offset"):
+        if params.get(key):
+            filters[key] = params[key]
+    return query, filters
+
+
+def result_count(response):
+    """Results in a search response (DRF data, or the count async views set)."""
+    if hasattr(response, "data"):
+        return len(response.data) if isinstance(response.data, list) else 0
+    return getattr(response, "result_count", 0) or 0
+
+
+# 🔹 Search logging decorator (works on sync and async views)
+def log_search(endpoint, params):
+    """
+    Queue one SearchQueryLog row per successful search served by the view:
+    ``params(request, kwargs)`` gives (query, filters), or None to skip.
+    Place it above @cached_result so cache hits are counted too.
+    """
+    def entry(request, kwargs, response, started):
+        if response.status_code != 200:
+            return None
+        searched = params(request, kwargs)
+        if searched is None:
+            return None
+        query, filters = searched
+        return (
+            timezone.now(), endpoint, query, filters, result_count(response),
+            (time.perf_counter() - started) * 1000,
+            get_search_backend().name, response.has_header(DEGRADED_HEADER),
+        )
+
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @functools.wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                started = time.perf_counter()
+                response = await view_func(request, *args, **kwargs)
+                if query_log_settings()["ENABLED"]:
+                    logged = entry(request, kwargs, response, started)
+                    if logged:
+                        get_query_log_writer().add(logged)
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            started = time.perf_counter()
+            response = view_func(request, *args, **kwargs)
+            if query_log_settings()["ENABLED"]:
+                logged = entry(request, kwargs, response, started)
+                if logged:
+                    get_query_log_writer().add(logged)
+            return response
+
+        return wrapper
+    return decorator
+
+
+# ============================================================
+# ✅ Report (slow, zero-result and frequent queries)
+# ============================================================
+def search_query_report(days=7, limit=20, endpoint=None, bucket="day"):
+    """Aggregates over the last ``days`` days of SearchQueryLog."""
+    logs = SearchQueryLog.objects.filter(created__gte=timezone.now() - timedelta(days=days))
+    if endpoint:
+        logs = logs.filter(endpoint=endpoint)
+    by_query = logs.exclude(query="").values("endpoint", "query")
+
+    slow = (
+        by_query
+        .annotate(searches=Count("id"), avg_ms=Avg("latency_ms"), max_ms=Max("latency_ms"))
+        .order_by("-avg_ms")[:limit]
+    )
+    zero_results = (
+        by_query.filter(result_count=0)
+        .annotate(searches=Count("id"), last_seen=Max("created"))
+        .order_by("-searches")[:limit]
+    )
+    top = (
+        by_query
+        .annotate(searches=Count("id"), zero_results=Count("id", filter=Q(result_count=0)))
+        .order_by("-searches")[:limit]
+    )
+    trunc = TruncHour if bucket == "hour" else TruncDay
+    volume = (
+        logs.annotate(period=trunc("created")).values("period")
+        .annotate(
+            searches=Count("id"),
+            zero_results=Count("id", filter=Q(result_count=0)),
+            degraded=Count("id", filter=Q(degraded=True)),
+            avg_ms=Avg("latency_ms"),
+        )
+        .order_by("period")
+    )
+    return {
+        "days": days,
+        "total_searches": logs.count(),
+        "slow_queries": list(slow),
+        "zero_result_queries": list(zero_results),
+        "top_queries": list(top),
+        "volume": list(volume),
+    }
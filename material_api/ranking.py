@@ -0,0 +1,166 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connection, transaction, OperationalError
+from django.db.models import F, Q, Value, FloatField
+
+
+# Defaults for settings.MATERIAL_SEARCH
+SEARCH_DEFAULTS = {
+    # "postgres", "memory" or a dotted path (see material_api.search_backends)
+    "BACKEND": "postgres",
+    # score = TEXT_RANK_WEIGHT * ts_rank + TRIGRAM_WEIGHT * trigram similarity
+    "TEXT_RANK_WEIGHT": 1.0,
+    "TRIGRAM_WEIGHT": 0.5,
+    # Drop ranked hits scoring below this (0 keeps every prefiltered candidate)
+    "MIN_SCORE": 0.0,
+    # pg_trgm.word_similarity_threshold used by the `%>` candidate prefilter
+    "TRIGRAM_SIMILARITY_THRESHOLD": 0.3,
+    "DEFAULT_LIMIT": 50,
+    "MAX_LIMIT": 500,
+    # Most groups search_groups returns
+    "MAX_GROUP_RESULTS": 100,
+    # Postgres statement_timeout for the full hybrid search queries; when it
+    # fires, the cheaper trigram-only fallback runs under FALLBACK_TIMEOUT_MS
+    # and the response carries X-Search-Degraded. 0 disables the timeout.
+    "STATEMENT_TIMEOUT_MS": 2000,
+    "FALLBACK_TIMEOUT_MS": 1000,
+}
+
+
+def search_settings():
+    """SEARCH_DEFAULTS overridden by settings.MATERIAL_SEARCH."""
+    return {**SEARCH_DEFAULTS, **getattr(settings, "MATERIAL_SEARCH", {})}
+
+
+# ============================================================
+# ✅ limit / offset query params
+# ============================================================
+def parse_pagination(params, default_limit=None):
+    """
+    Read ``limit`` / ``offset`` from query params.
+    Returns (limit, offset); limit is None when not given and no default applies.
+    Raises ValueError for values that are not non-negative integers.
+    """
+    conf = search_settings()
+
+    def _int(name):
+        raw = (params.get(name) or "").strip()
+        if not raw:
+            return None
+        try:
+            value = int(raw)
+        except ValueError:
+            raise ValueError(f"'{name}' must be an integer")
+        if value < 0:
+            raise ValueError(f"'{name}' must not be negative")
+        return value
+
+    limit = _int("limit")
+    if limit is None:
+        limit = default_limit
+    if limit is not None:
+        limit = min(limit, conf["MAX_LIMIT"])
+    return limit, _int("offset") or 0
+
+
+def paginate(queryset, limit, offset):
+    if limit is None:
+        return queryset[offset:] if offset else queryset
+    return queryset[offset:offset + limit]
+
+
+# ============================================================
+# ✅ Single-pass hybrid (tsvector + trigram) item ranking
+# ============================================================
+@contextmanager
+def trigram_threshold(name, value, timeout_ms=None):
+    """
+    Run the block in a transaction with a pg_trgm threshold
+    (``similarity_threshold`` or ``word_similarity_threshold``) set locally,
+    and with ``statement_timeout`` when ``timeout_ms`` is given.
+    Querysets must be evaluated inside the block.
+    """
+    name = f"pg_trgm.{name}"
+    nested = connection.in_atomic_block
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT current_setting(%s, true), current_setting('statement_timeout')", [name]
+            )
+            previous_value, previous_timeout = cursor.fetchone()
+            cursor.execute("SELECT set_config(%s, %s, true)", [name, str(value)])
+            if timeout_ms:
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", [str(int(timeout_ms))])
+        yield
+
+    # Local settings last until the outer transaction ends, not our savepoint:
+    # put the caller's back (a rolled-back savepoint has already done so)
+    if nested:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config(%s, %s, true), set_config('statement_timeout', %s, true)",
+                [name, previous_value, previous_timeout],
+            )
+
+
+def is_query_timeout(exc):
+    """True for the error Postgres raises when statement_timeout cancels a query."""
+    return isinstance(exc, OperationalError) and getattr(exc.__cause__, "pgcode", None) == "57014"
+
+
+def hybrid_rank(items, query, vector_fields, trigram_fields, prefilter_fields=None, prefilter_config=None):
+    """
+    Rank an ItemMaster queryset against ``query`` in one pass.
+
+    ``vector_fields`` is [(field, weight)] for the tsvector; ``trigram_fields``
+    are summed into the trigram score. Candidates come from GIN indexes: the
+    query must be word-similar (``%>``) to one of ``prefilter_fields``
+    (defaults to ``trigram_fields``) or, when ``prefilter_config`` is given,
+    match those fields' tsvector in that text search config (an index built
+    on the same expression serves it). Without it, a query whose words are
+    split across the fields can miss. Each candidate is scored once and the
+    queryset is ordered best first, equal scores by stored popularity.
+    """
+    conf = search_settings()
+    search_query = SearchQuery(query)
+
+    search_vector = None
+    for field, weight in vector_fields:
+        vector = SearchVector(field, weight=weight)
+        search_vector = vector if search_vector is None else search_vector + vector
+
+    # %> rather than %: a query word found inside a longer name still
+    # qualifies, as it does for a tsvector match
+    prefilter_fields = prefilter_fields or trigram_fields
+    candidates = Q()
+    for field in prefilter_fields:
+        candidates |= Q(**{f"{field}__trigram_word_similar": query})
+    if prefilter_config:
+        items = items.alias(prefilter=SearchVector(*prefilter_fields, config=prefilter_config))
+        candidates |= Q(prefilter=SearchQuery(query, config=prefilter_config))
+
+    trigram_score = None
+    for field in trigram_fields:
+        similarity = TrigramSimilarity(field, query)
+        trigram_score = similarity if trigram_score is None else trigram_score + similarity
+
+    ranked = (
+        items
+        .alias(search=search_vector)
+        .filter(candidates)
+        .annotate(
+            rank=SearchRank(F("search"), search_query),
+            trigram_score=trigram_score,
+        )
+        .annotate(
+            score=(
+                F("rank") * Value(conf["TEXT_RANK_WEIGHT"], output_field=FloatField()) +
+                F("trigram_score") * Value(conf["TRIGRAM_WEIGHT"], output_field=FloatField())
+            )
+        )
+    )
+    if conf["MIN_SCORE"]:
+        ranked = ranked.filter(score__gte=conf["MIN_SCORE"])
+    return ranked.order_by("-score", "-rank", "-popularity", "local_item_id")
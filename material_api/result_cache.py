@@ -0,0 +1,390 @@
+import asyncio
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.response import Response
+
+from .models import CatalogVersion
+from .search_backends.base import DEGRADED_HEADER
+
+
+# ============================================================
+# ✅ Catalog version (bumped on ItemMaster/MatGroup/MaterialType writes)
+# ============================================================
+# A counter in the CatalogVersion row, so a bump from any worker, command or
+# background job is seen by all of them. Cached results and snapshots are
+# keyed by the version, so a bump makes all of them unreachable. It is read
+# at most once per request (catalog_version_middleware scopes the read).
+CATALOG_VERSION_ID = 1
+
+# [version or None, served stale data] for the current request
+_request_version = contextvars.ContextVar("catalog_version", default=None)
+
+
+def _read_version():
+    return CatalogVersion.objects.filter(pk=CATALOG_VERSION_ID).values_list("version", flat=True).first() or 0
+
+
+def catalog_version():
+    holder = _request_version.get()
+    if holder is None:
+        # Outside a request (commands, background threads): always read
+        return _read_version()
+    if holder[0] is None:
+        holder[0] = _read_version()
+    return holder[0]
+
+
+async def acatalog_version():
+    """catalog_version for async code (reads the row in a worker thread)."""
+    holder = _request_version.get()
+    if holder is not None and holder[0] is not None:
+        return holder[0]
+    version = await sync_to_async(_read_version)()
+    if holder is not None:
+        holder[0] = version
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached search/drill-down result. Returns the new version."""
+    with transaction.atomic():
+        row, _ = CatalogVersion.objects.select_for_update().get_or_create(pk=CATALOG_VERSION_ID)
+        row.version += 1
+        row.save(update_fields=["version", "updated"])
+    holder = _request_version.get()
+    if holder is not None:
+        holder[0] = row.version
+    return row.version
+
+
+def mark_stale_read():
+    """This request answered from data older than its catalog version: don't cache the response."""
+    holder = _request_version.get()
+    if holder is not None:
+        holder[1] = True
+
+
+def _served_stale():
+    holder = _request_version.get()
+    return holder is not None and holder[1]
+
+
+# 🔹 One catalog version read per request (works on sync and async stacks)
+@sync_and_async_middleware
+def catalog_version_middleware(get_response):
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _request_version.set([None, False])
+            try:
+                return await get_response(request)
+            finally:
+                _request_version.reset(token)
+
+        return middleware
+
+    def middleware(request):
+        token = _request_version.set([None, False])
+        try:
+            return get_response(request)
+        finally:
+            _request_version.reset(token)
+
+    return middleware
+
+
+# ============================================================
+# ✅ Bounded in-process LRU with TTL
+# ============================================================
+class LRUCache:
+    """Thread-safe LRU of at most ``max_entries`` values, each valid for ``ttl`` seconds."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def _cache_settings():
+    conf = getattr(settings, "SEARCH_RESULT_CACHE", {})
+    return conf.get("MAX_ENTRIES", 1024), conf.get("TTL", 300)
+
+
+result_cache = LRUCache(*_cache_settings())
+
+
+# ============================================================
+# ✅ Single-flight: one computation per key at a time
+# ============================================================
+# After an invalidation (or on a cold key) concurrent identical requests
+# would all miss the cache and run the same query. The first one computes;
+# the others wait for its cacheable result and reuse it. If the leader's
+# response is not cacheable (error, degraded) or takes longer than
+# COALESCE_TIMEOUT, followers compute their own.
+#
+# The cached material_api views are public and their responses don't depend
+# on the caller, so the result cache key is the whole sharing scope.
+class _Flight:
+    __slots__ = ("event", "data")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.data = None
+
+
+class SingleFlight:
+    """In-flight computations by key, for threads (sync views)."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def join(self, key):
+        """Returns (flight, is_leader). The leader must call finish()."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            self.leaders += 1
+            return flight, True
+
+    def wait(self, flight):
+        """The leader's cacheable result, or None."""
+        flight.event.wait(self.timeout)
+        return flight.data
+
+    def finish(self, key, flight, data):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.data = data
+        flight.event.set()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._flights), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class AsyncSingleFlight:
+    """In-flight computations by key, for coroutines on one event loop (async views)."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._flights = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def join(self, key):
+        """Returns (future, is_leader). The leader must call finish()."""
+        loop = asyncio.get_running_loop()
+        future = self._flights.get(key)
+        if future is not None and future.get_loop() is loop:
+            self.coalesced += 1
+            return future, False
+        future = self._flights[key] = loop.create_future()
+        self.leaders += 1
+        return future, True
+
+    async def wait(self, future):
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def finish(self, key, future, data):
+        if self._flights.get(key) is future:
+            del self._flights[key]
+        if not future.done():
+            future.set_result(data)
+
+    def stats(self):
+        return {"in_flight": len(self._flights), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+def _coalesce_timeout():
+    return getattr(settings, "SEARCH_RESULT_CACHE", {}).get("COALESCE_TIMEOUT", 10)
+
+
+in_flight = SingleFlight(_coalesce_timeout())
+async_in_flight = AsyncSingleFlight(_coalesce_timeout())
+
+
+# ============================================================
+# ✅ Request normalization + view decorator
+# ============================================================
+# Free-text params; their case and spacing do not change the results
+TEXT_PARAMS = {"q", "query"}
+
+
+def _normalize(name, value):
+    value = str(value)
+    if name in TEXT_PARAMS:
+        return " ".join(value.lower().split())
+    return value.strip()
+
+
+def result_cache_key(request, view_name, view_kwargs, data=None):
+    """
+    Version + view + method + URL kwargs + normalized query params / body
+    fields. Works with DRF requests and, given the parsed body as ``data``,
+    plain Django ones. The method keeps e.g. a POST to a GET-only async view
+    (checked inside the view, after the lookup) from getting the GET answer.
+    """
+    query_params = getattr(request, "query_params", request.GET)
+    params = sorted(
+        (key, sorted(_normalize(key, v) for v in query_params.getlist(key)))
+        for key in query_params.keys()
+    )
+    if data is None:
+        data = getattr(request, "data", None)
+    body = []
+    if request.method == "POST" and hasattr(data, "items"):
+        body = sorted(
+            (key, _normalize(key, value))
+            for key, value in data.items()
+            if value not in (None, "")
+        )
+    return json.dumps(
+        [catalog_version(), view_name, request.method, sorted(view_kwargs.items()), params, body],
+        sort_keys=True, default=str
+    )
+
+
+def _cacheable(response):
+    # Degraded (fallback) search results and answers from a stale snapshot
+    # are not kept, the next request retries
+    return response.status_code == 200 and not response.has_header(DEGRADED_HEADER) and not _served_stale()
+
+
+def cached_result(view):
+    """
+    Cache successful responses of a read-only material_api view, computing
+    each key once when identical requests arrive together.
+    Place it below @api_view so the view receives the DRF request.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = result_cache_key(request, view.__name__, kwargs)
+        data = result_cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        flight, leader = in_flight.join(key)
+        if not leader:
+            data = in_flight.wait(flight)
+            if data is not None:
+                return Response(data)
+            return view(request, *args, **kwargs)
+
+        data = None
+        try:
+            response = view(request, *args, **kwargs)
+            if _cacheable(response):
+                data = response.data
+                # Plain copy, so the cache doesn't keep the serializer (and its instances) alive
+                if isinstance(data, list):
+                    data = list(data)
+                elif isinstance(data, dict):
+                    data = dict(data)
+                result_cache.set(key, data)
+            return response
+        finally:
+            in_flight.finish(key, flight, data)
+    return wrapper
+
+
+def async_cached_result(view):
+    """
+    cached_result for the async views in material_api.async_views. Stores
+    the rendered JSON body (and its result_count), so a hit is returned
+    without re-serializing.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        await acatalog_version()  # read here, not from the event loop in result_cache_key
+        key = result_cache_key(request, f"async:{view.__name__}", kwargs, data=json_body(request))
+        cached = result_cache.get(key)
+        if cached is not None:
+            return _json_hit(cached)
+
+        future, leader = async_in_flight.join(key)
+        if not leader:
+            cached = await async_in_flight.wait(future)
+            if cached is not None:
+                return _json_hit(cached)
+            return await view(request, *args, **kwargs)
+
+        cached = None
+        try:
+            response = await view(request, *args, **kwargs)
+            if _cacheable(response):
+                cached = (response.content, getattr(response, "result_count", None))
+                result_cache.set(key, cached)
+            return response
+        finally:
+            async_in_flight.finish(key, future, cached)
+    return wrapper
+
+
+def _json_hit(cached):
+    body, result_count = cached
+    response = HttpResponse(body, content_type="application/json")
+    response.result_count = result_count
+    return response
+
+
+def json_body(request):
+    """Parsed JSON body of a plain Django POST request ({} if empty or invalid)."""
+    if request.method != "POST":
+        return None
+    if not hasattr(request, "_json_body"):
+        try:
+            request._json_body = json.loads(request.body or b"{}")
+        except ValueError:
+            request._json_body = {}
+    return request._json_body
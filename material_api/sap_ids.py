@@ -0,0 +1,49 @@
+from collections import defaultdict
+
+from django.db.models import Count, TextField
+from django.db.models.functions import Cast, Collate
+
+from itemmaster.models import ItemMaster
+
+
+# ============================================================
+# ✅ SAP id prefix search
+# ============================================================
+def search_sap_ids(prefix, limit):
+    """
+    Final, non-deleted items whose SAP id starts with ``prefix`` (digits),
+    in SAP id text order. The filter and the ordering both use the
+    itemmaster_sap_item_id_prefix expression (sap_item_id::text COLLATE "C"),
+    so the index scan returns rows in order and LIMIT stops it early.
+    """
+    return list(
+        ItemMaster.objects
+        .annotate(sap_text=Collate(Cast("sap_item_id", output_field=TextField()), "C"))
+        .filter(is_deleted=False, sap_text__startswith=prefix, is_final=True)
+        .order_by("sap_text")
+        .values("sap_item_id", "local_item_id", "short_name", "mgrp_code")[:limit]
+    )
+
+
+# ============================================================
+# ✅ Duplicate SAP ids
+# ============================================================
+def sap_id_conflicts():
+    """
+    [{"sap_item_id", "items": [...]}] for every SAP id held by more than one
+    non-deleted item (these block the itemmaster_sap_item_id_unique constraint).
+    """
+    duplicated = (
+        ItemMaster.objects.filter(is_deleted=False, sap_item_id__isnull=False)
+        .values("sap_item_id").annotate(n=Count("pk")).filter(n__gt=1)
+        .values_list("sap_item_id", flat=True)
+    )
+    items = (
+        ItemMaster.objects.filter(is_deleted=False, sap_item_id__in=list(duplicated))
+        .order_by("sap_item_id", "local_item_id")
+        .values("sap_item_id", "local_item_id", "short_name", "mgrp_code", "is_final", "updated")
+    )
+    by_sap_id = defaultdict(list)
+    for item in items:
+        by_sap_id[item.pop("sap_item_id")].append(item)
+    return [{"sap_item_id": sap_id, "items": rows} for sap_id, rows in by_sap_id.items()]
@@ -0,0 +1,30 @@
+import threading
+
+from django.utils.module_loading import import_string
+
+from ..ranking import search_settings
+from .base import SearchBackend, GroupHit, SearchResults, DEGRADED_HEADER, is_degraded  # noqa: F401
+
+
+# Built-in engines, selectable by name in settings.MATERIAL_SEARCH["BACKEND"]
+BACKENDS = {
+    "postgres": "material_api.search_backends.postgres.PostgresSearchBackend",
+    "memory": "material_api.search_backends.memory.MemorySearchBackend",
+}
+
+_backend = None
+_lock = threading.Lock()
+
+
+def get_search_backend():
+    """
+    The configured search backend (one instance per process).
+    MATERIAL_SEARCH["BACKEND"] is "postgres", "memory" or a dotted class path.
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                path = search_settings()["BACKEND"]
+                _backend = import_string(BACKENDS.get(path, path))()
+    return _backend
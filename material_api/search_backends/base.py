@@ -0,0 +1,113 @@
+from asgiref.sync import sync_to_async
+
+
+# Minimum text rank / trigram similarity for a search_groups hit
+BM25_THRESHOLD = 0.1
+TRIGRAM_THRESHOLD = 0.2
+
+# Columns with a trigram GIN index, used for the item candidate prefilter
+ITEM_PREFILTER_FIELDS = ("short_name", "search_text")
+# Text search config of the tsvector GIN index over the same columns
+ITEM_PREFILTER_CONFIG = "english"
+
+# Response header set when a search was answered by the cheaper fallback
+DEGRADED_HEADER = "X-Search-Degraded"
+
+
+class GroupHit:
+    """
+    One search_groups result: the serialized MatGroup plus its scores.
+
+    ``rank`` is the text rank of the group's whole document. ``score`` is the
+    word similarity (0..1) of the query to the document's trigram text. It
+    used to be the sum of six TrigramSimilarity values (group names, notes
+    and one joined item's names, so 0..6, per item row). Scores are therefore
+    lower than before, while the 0.2 cut-off and the ordering by rank, then
+    score, are kept.
+    """
+    __slots__ = ("mgrp_code", "data", "rank", "score")
+
+    def __init__(self, mgrp_code, data, rank, score):
+        self.mgrp_code = mgrp_code
+        self.data = data
+        self.rank = rank
+        self.score = score
+
+
+class SearchResults(list):
+    """
+    Search hits or items, flagged ``degraded`` when the full query ran out of
+    time and a cheaper fallback produced them. Backends may return plain lists.
+    """
+
+    def __init__(self, results=(), degraded=False):
+        super().__init__(results)
+        self.degraded = degraded
+
+
+def is_degraded(results):
+    return getattr(results, "degraded", False)
+
+
+class SearchBackend:
+    """
+    Interface shared by the search engines behind search_groups,
+    items_by_group and items_by_group_and_type.
+    """
+    name = None
+
+    def search_groups(self, query, search_type=None):
+        """
+        Material groups matching ``query`` (optionally of one search_type),
+        best first, as a list of GroupHit (at most MAX_GROUP_RESULTS).
+        """
+        raise NotImplementedError
+
+    def rank_items(self, items, query, vector_fields, trigram_fields, limit, offset, scope=None):
+        """
+        One page of the ItemMaster queryset ``items`` ranked against ``query``.
+
+        ``vector_fields`` is [(field, weight)] for the text rank and
+        ``trigram_fields`` are summed into the trigram score. ``scope`` carries
+        the plain equality filters already in ``items`` (mgrp_code,
+        mat_type_code), which a backend may use to narrow candidates early.
+        Returns a list of ItemMaster instances.
+
+        Either method may return SearchResults(..., degraded=True) when it had
+        to answer with a cheaper query.
+        """
+        raise NotImplementedError
+
+    # Async entry points for the async views. By default the sync method runs
+    # in a worker thread; backends that can answer in-process override them.
+    async def asearch_groups(self, query, search_type=None):
+        return await sync_to_async(self.search_groups)(query, search_type)
+
+    async def arank_items(self, items, query, vector_fields, trigram_fields, limit, offset, scope=None):
+        return await sync_to_async(self.rank_items)(
+            items, query, vector_fields, trigram_fields, limit, offset, scope=scope
+        )
+
+    # Index maintenance hooks, called after commit by signals
+    def item_changed(self, local_item_id):
+        pass
+
+    def items_changed(self, local_item_ids):
+        """Several items were written in one transaction."""
+        for local_item_id in local_item_ids:
+            self.item_changed(local_item_id)
+
+    def group_changed(self, mgrp_code):
+        pass
+
+    def group_items_changed(self, mgrp_code):
+        """All items of a group were updated at once (bulk UPDATE, no signals)."""
+        pass
+
+    def popularity_changed(self, item_scores, group_scores):
+        """Stored popularity was refreshed ({pk: score}, missing = 0; bulk UPDATE, no signals)."""
+        pass
+
+    def warm(self):
+        """Prepare the backend at server startup."""
+        pass
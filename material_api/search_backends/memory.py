@@ -0,0 +1,544 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from ..ranking import search_settings
+from ..serializers import MatGroupSerializer
+from .base import SearchBackend, GroupHit, BM25_THRESHOLD, TRIGRAM_THRESHOLD, ITEM_PREFILTER_FIELDS
+
+
+# Postgres' default ts_rank weights, so both backends weigh fields alike
+FIELD_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+# Item fields kept in memory (text fields are indexed per field)
+ITEM_TEXT_FIELDS = ("short_name", "long_name", "search_text", "mat_type_code")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(str(text).lower()) if text else []
+
+
+def trigrams(text):
+    """Character trigrams the way pg_trgm builds them (words padded "  w ")."""
+    grams = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(a, b):
+    """pg_trgm similarity(): shared trigrams over all distinct trigrams."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def word_similarity(query_grams, text_grams):
+    """Share of the query's trigrams found in the text (close to pg_trgm's word_similarity)."""
+    if not query_grams:
+        return 0.0
+    return len(query_grams & text_grams) / len(query_grams)
+
+
+def normalize_rank(raw):
+    """Squash an unbounded BM25 score into 0..1, the range ts_rank works in."""
+    return raw / (raw + 1.0)
+
+
+# ============================================================
+# ✅ Inverted index with BM25 scoring
+# ============================================================
+class BM25Index:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {doc: term frequency}
+        self.doc_terms = {}                # doc -> Counter(term)
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def add(self, doc, text):
+        self.remove(doc)
+        terms = Counter(tokenize(text))
+        if not terms:
+            return
+        self.doc_terms[doc] = terms
+        self.total_length += sum(terms.values())
+        for term, tf in terms.items():
+            self.postings[term][doc] = tf
+
+    def remove(self, doc):
+        terms = self.doc_terms.pop(doc, None)
+        if terms is None:
+            return
+        self.total_length -= sum(terms.values())
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc, None)
+                if not docs:
+                    del self.postings[term]
+
+    def docs_with(self, term):
+        return self.postings.get(term, {})
+
+    def score(self, doc, terms):
+        doc_terms = self.doc_terms.get(doc)
+        if not doc_terms:
+            return 0.0
+        n = len(self.doc_terms)
+        avg_length = self.total_length / n
+        length = sum(doc_terms.values())
+        total = 0.0
+        for term in terms:
+            tf = doc_terms.get(term)
+            if not tf:
+                continue
+            df = len(self.postings[term])
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            total += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+        return total
+
+
+# ============================================================
+# ✅ Character-trigram index
+# ============================================================
+class TrigramIndex:
+    def __init__(self):
+        self.postings = defaultdict(set)  # trigram -> {doc}
+        self.doc_grams = {}               # doc -> frozenset(trigram)
+
+    def add(self, doc, text):
+        self.remove(doc)
+        grams = trigrams(text)
+        if not grams:
+            return
+        self.doc_grams[doc] = grams
+        for gram in grams:
+            self.postings[gram].add(doc)
+
+    def remove(self, doc):
+        grams = self.doc_grams.pop(doc, None)
+        for gram in grams or ():
+            docs = self.postings.get(gram)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self.postings[gram]
+
+    def grams(self, doc):
+        return self.doc_grams.get(doc, frozenset())
+
+    def similar(self, query_grams, threshold):
+        """Docs whose similarity() to the query can reach ``threshold``."""
+        if not query_grams:
+            return set()
+        # similarity >= t needs at least t * |query| shared trigrams
+        needed = max(1, math.ceil(threshold * len(query_grams)))
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+        return {
+            doc for doc, count in shared.items()
+            if count >= needed and similarity(query_grams, self.doc_grams[doc]) >= threshold
+        }
+
+
+# ============================================================
+# ✅ Catalog held in memory
+# ============================================================
+class ItemRecord:
+    __slots__ = ("local_item_id", "mgrp_code", "is_final", "popularity") + ITEM_TEXT_FIELDS
+
+    def __init__(self, item):
+        self.local_item_id = item.local_item_id
+        self.mgrp_code = item.mgrp_code_id
+        self.is_final = item.is_final
+        self.popularity = item.popularity
+        self.short_name = item.short_name or ""
+        self.long_name = item.long_name or ""
+        self.search_text = item.search_text or ""
+        self.mat_type_code = item.mat_type_code_id or ""
+
+
+class GroupRecord:
+    __slots__ = ("mgrp_code", "search_type", "data", "shortname", "longname", "notes", "popularity")
+
+    def __init__(self, group):
+        self.mgrp_code = group.mgrp_code
+        self.search_type = group.search_type
+        self.popularity = group.popularity
+        self.data = MatGroupSerializer(group).data
+        self.shortname = group.mgrp_shortname or ""
+        self.longname = group.mgrp_longname or ""
+        self.notes = group.notes or ""
+
+
+class MemoryIndex:
+    """
+    Non-deleted items and groups with per-field BM25 and trigram indexes.
+    Group documents cover all non-deleted items (as search_documents does);
+    the item indexes only final ones, the items searches can return.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.groups = {}
+        self.group_items = defaultdict(set)  # mgrp_code -> {local_item_id}
+        self.item_text = {field: BM25Index() for field in ITEM_TEXT_FIELDS}
+        self.item_grams = {field: TrigramIndex() for field in ITEM_TEXT_FIELDS}
+        # Group documents: "A" = item names + notes, "B" = search_text + group names
+        self.group_text = {"A": BM25Index(), "B": BM25Index()}
+        self.group_grams = TrigramIndex()
+        self.built_at = time.monotonic()
+        self.lock = threading.RLock()
+
+    # ---------- items ----------
+    def put_item(self, item, reindex_group=True):
+        with self.lock:
+            previous = self.items.get(item.local_item_id)
+            self.remove_item(item.local_item_id, reindex_group=False)
+            record = ItemRecord(item)
+            self.add_record(record)
+            if reindex_group:
+                self.index_group(record.mgrp_code)
+            if previous is not None and previous.mgrp_code != record.mgrp_code:
+                self.index_group(previous.mgrp_code)
+
+    def add_record(self, record):
+        self.items[record.local_item_id] = record
+        self.group_items[record.mgrp_code].add(record.local_item_id)
+        if not record.is_final:
+            return
+        for field in ITEM_TEXT_FIELDS:
+            value = getattr(record, field)
+            self.item_text[field].add(record.local_item_id, value)
+            self.item_grams[field].add(record.local_item_id, value)
+
+    def remove_item(self, local_item_id, reindex_group=True):
+        with self.lock:
+            record = self.items.pop(local_item_id, None)
+            if record is None:
+                return
+            self.group_items[record.mgrp_code].discard(local_item_id)
+            for field in ITEM_TEXT_FIELDS:
+                self.item_text[field].remove(local_item_id)
+                self.item_grams[field].remove(local_item_id)
+            if reindex_group:
+                self.index_group(record.mgrp_code)
+
+    # ---------- groups ----------
+    def put_group(self, group):
+        with self.lock:
+            self.groups[group.mgrp_code] = GroupRecord(group)
+            self.index_group(group.mgrp_code)
+
+    def remove_group(self, mgrp_code):
+        with self.lock:
+            self.groups.pop(mgrp_code, None)
+            self.index_group(mgrp_code)
+
+    def index_group(self, mgrp_code):
+        """Rebuild one group's document from its record and its items (as search_documents does)."""
+        group = self.groups.get(mgrp_code)
+        items = [self.items[i] for i in self.group_items.get(mgrp_code, ())]
+        if group is None or not items:
+            for index in self.group_text.values():
+                index.remove(mgrp_code)
+            self.group_grams.remove(mgrp_code)
+            return
+
+        names = " ".join(sorted({i.short_name for i in items} | {i.long_name for i in items}))
+        search_texts = " ".join(sorted({i.search_text for i in items}))
+        self.group_text["A"].add(mgrp_code, f"{names} {group.notes}")
+        self.group_text["B"].add(mgrp_code, f"{search_texts} {group.shortname} {group.longname}")
+        self.group_grams.add(
+            mgrp_code, f"{group.shortname} {group.longname} {group.notes} {names} {search_texts}"
+        )
+
+    # ---------- queries ----------
+    def search_groups(self, query, search_type=None):
+        terms = tokenize(query)
+        query_grams = trigrams(query)
+        hits = []
+        with self.lock:
+            matched = _docs_with_all(terms, self.group_text.values())
+            candidates = matched | self._gram_candidates(self.group_grams, query_grams)
+            for mgrp_code in candidates:
+                group = self.groups.get(mgrp_code)
+                if group is None or (search_type and group.search_type != search_type):
+                    continue
+                raw = 0.0
+                if mgrp_code in matched:
+                    raw = sum(
+                        FIELD_WEIGHTS[weight] * index.score(mgrp_code, terms)
+                        for weight, index in self.group_text.items()
+                    )
+                rank = normalize_rank(raw)
+                score = word_similarity(query_grams, self.group_grams.grams(mgrp_code))
+                if rank >= BM25_THRESHOLD or score >= TRIGRAM_THRESHOLD:
+                    hits.append((GroupHit(mgrp_code, group.data, rank, score), group.popularity))
+        hits.sort(key=lambda h: (-h[0].rank, -h[0].score, -h[1], h[0].mgrp_code))
+        hits = [hit for hit, _ in hits]
+        return hits[:search_settings()["MAX_GROUP_RESULTS"]]
+
+    def _gram_candidates(self, index, query_grams):
+        """Docs sharing enough trigrams to reach the word-similarity cut-off."""
+        if not query_grams:
+            return set()
+        needed = max(1, math.ceil(TRIGRAM_THRESHOLD * len(query_grams)))
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(index.postings.get(gram, ()))
+        return {doc for doc, count in shared.items() if count >= needed}
+
+    def rank_items(self, query, vector_fields, trigram_fields, scope=None):
+        """[(local_item_id, score, rank)] of matching items, best first."""
+        conf = search_settings()
+        terms = tokenize(query)
+        query_grams = trigrams(query)
+        scope = scope or {}
+
+        with self.lock:
+            matched = _docs_with_all(terms, [self.item_text[f] for f, _ in vector_fields])
+            candidates = set(matched)
+            for field in ITEM_PREFILTER_FIELDS:
+                candidates |= self.item_grams[field].similar(query_grams, conf["TRIGRAM_SIMILARITY_THRESHOLD"])
+
+            ranked = []
+            for item_id in candidates:
+                record = self.items.get(item_id)
+                if record is None or any(getattr(record, k) != v for k, v in scope.items()):
+                    continue
+                raw = 0.0
+                if item_id in matched:
+                    raw = sum(
+                        FIELD_WEIGHTS[weight] * self.item_text[field].score(item_id, terms)
+                        for field, weight in vector_fields
+                    )
+                rank = normalize_rank(raw)
+                trigram_score = sum(
+                    similarity(query_grams, self.item_grams[field].grams(item_id))
+                    for field in trigram_fields
+                )
+                score = conf["TEXT_RANK_WEIGHT"] * rank + conf["TRIGRAM_WEIGHT"] * trigram_score
+                if score >= conf["MIN_SCORE"]:
+                    ranked.append((item_id, score, rank, record.popularity))
+
+        ranked.sort(key=lambda r: (-r[1], -r[2], -r[3], r[0]))
+        return [r[:3] for r in ranked]
+
+
+def _docs_with_all(terms, indexes):
+    """Docs containing every term in at least one of ``indexes`` (plainto_tsquery AND)."""
+    if not terms:
+        return set()
+    docs = None
+    for term in set(terms):
+        with_term = set()
+        for index in indexes:
+            with_term.update(index.docs_with(term))
+        docs = with_term if docs is None else docs & with_term
+        if not docs:
+            return set()
+    return docs
+
+
+# ============================================================
+# ✅ In-memory backend
+# ============================================================
+class MemorySearchBackend(SearchBackend):
+    """
+    Pure-Python BM25 + trigram engine over an in-process copy of the catalog.
+    Only the final page of items is read from the database.
+    """
+    name = "memory"
+
+    # Seconds before a background rebuild, to pick up writes made by other
+    # workers (signals only update the local copy)
+    REBUILD_INTERVAL = 900
+
+    def __init__(self):
+        self._index = None
+        self._build_lock = threading.Lock()
+        self._building = False
+        self._pending = set()
+
+    # ---------- lifecycle ----------
+    def build(self):
+        index = MemoryIndex()
+        for group in MatGroup.objects.filter(is_deleted=False):
+            index.groups[group.mgrp_code] = GroupRecord(group)
+        items = ItemMaster.objects.filter(is_deleted=False).only(
+            "local_item_id", "mgrp_code", "is_final", "popularity", *ITEM_TEXT_FIELDS
+        )
+        for item in items.iterator(chunk_size=2000):
+            index.add_record(ItemRecord(item))
+        for mgrp_code in index.groups:
+            index.index_group(mgrp_code)
+        return index
+
+    def rebuild(self):
+        """Build a fresh index and swap it in, then replay changes made meanwhile."""
+        with self._build_lock:
+            self._building = True
+            self._pending.clear()
+            try:
+                index = self.build()
+            finally:
+                self._building = False
+            self._index = index
+            changed = list(self._pending)
+            self._pending.clear()
+        for kind, key in changed:
+            self._refresh(kind, key)
+        return index
+
+    def warm(self):
+        def _run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print("Memory search index build failed:", e)
+        threading.Thread(target=_run, name="memory-search-index", daemon=True).start()
+
+    def index(self):
+        index = self._index
+        if index is None:
+            with self._build_lock:
+                index = self._index
+            return index or self.rebuild()
+        if time.monotonic() - index.built_at > self.REBUILD_INTERVAL and not self._building:
+            index.built_at = time.monotonic()  # only one refresh per interval
+            self.warm()
+        return index
+
+    # ---------- maintenance ----------
+    def item_changed(self, local_item_id):
+        self._refresh("item", local_item_id)
+
+    def items_changed(self, local_item_ids):
+        self._refresh("items", tuple(sorted(local_item_ids)))
+
+    def group_changed(self, mgrp_code):
+        self._refresh("group", mgrp_code)
+
+    def group_items_changed(self, mgrp_code):
+        self._refresh("group_items", mgrp_code)
+
+    def popularity_changed(self, item_scores, group_scores):
+        # Only read as a tie-breaker at query time, so set in place
+        index = self._index
+        if index is None:
+            return
+        with index.lock:
+            for item_id, record in index.items.items():
+                record.popularity = item_scores.get(item_id, 0)
+            for mgrp_code, group in index.groups.items():
+                group.popularity = group_scores.get(mgrp_code, 0)
+
+    def _refresh(self, kind, key):
+        if self._building:
+            self._pending.add((kind, key))
+        index = self._index
+        if index is None:
+            return
+        if kind == "group_items":
+            items = list(ItemMaster.objects.filter(mgrp_code=key, is_deleted=False).only(
+                "local_item_id", "mgrp_code", "is_final", "popularity", *ITEM_TEXT_FIELDS
+            ))
+            # One group document rebuild for the lot, not one per item
+            with index.lock:
+                for item in items:
+                    index.put_item(item, reindex_group=False)
+                index.index_group(key)
+        elif kind == "items":
+            items = {item.local_item_id: item for item in ItemMaster.objects.filter(
+                local_item_id__in=key, is_deleted=False
+            ).only("local_item_id", "mgrp_code", "is_final", "popularity", *ITEM_TEXT_FIELDS)}
+            # Each affected group document is rebuilt once
+            with index.lock:
+                groups = {index.items[i].mgrp_code for i in key if i in index.items}
+                groups.update(item.mgrp_code_id for item in items.values())
+                for item_id in key:
+                    if item_id in items:
+                        index.put_item(items[item_id], reindex_group=False)
+                    else:
+                        index.remove_item(item_id, reindex_group=False)
+                for mgrp_code in groups:
+                    index.index_group(mgrp_code)
+        elif kind == "item":
+            item = ItemMaster.objects.filter(local_item_id=key, is_deleted=False).first()
+            if item is None:
+                index.remove_item(key)
+            else:
+                index.put_item(item)
+        else:
+            group = MatGroup.objects.filter(mgrp_code=key, is_deleted=False).first()
+            if group is None:
+                index.remove_group(key)
+            else:
+                index.put_group(group)
+
+    # ---------- queries ----------
+    def search_groups(self, query, search_type=None):
+        return self.index().search_groups(query, search_type)
+
+    def rank_items(self, items, query, vector_fields, trigram_fields, limit, offset, scope=None):
+        ranked = self.index().rank_items(query, vector_fields, trigram_fields, scope)
+        if not ranked:
+            return []
+
+        # The queryset still decides which candidates qualify (is_final, attr.* filters)
+        allowed = set(items.filter(local_item_id__in=[r[0] for r in ranked]).values_list("local_item_id", flat=True))
+        page = _page(ranked, allowed, limit, offset)
+        return _attach_scores(page, ItemMaster.objects.in_bulk([r[0] for r in page]))
+
+    # ---------- async queries (in-process once the index is built) ----------
+    async def asearch_groups(self, query, search_type=None):
+        if self._index is None:
+            return await super().asearch_groups(query, search_type)
+        return self.index().search_groups(query, search_type)
+
+    async def arank_items(self, items, query, vector_fields, trigram_fields, limit, offset, scope=None):
+        if self._index is None:
+            return await super().arank_items(
+                items, query, vector_fields, trigram_fields, limit, offset, scope=scope
+            )
+        ranked = self.index().rank_items(query, vector_fields, trigram_fields, scope)
+        if not ranked:
+            return []
+
+        allowed = {
+            pk async for pk in items.filter(
+                local_item_id__in=[r[0] for r in ranked]
+            ).values_list("local_item_id", flat=True)
+        }
+        page = _page(ranked, allowed, limit, offset)
+        return _attach_scores(page, await ItemMaster.objects.ain_bulk([r[0] for r in page]))
+
+
+def _page(ranked, allowed, limit, offset):
+    ranked = [r for r in ranked if r[0] in allowed]
+    return ranked[offset:offset + limit] if limit is not None else ranked[offset:]
+
+
+def _attach_scores(page, by_id):
+    results = []
+    for item_id, score, rank in page:
+        item = by_id.get(item_id)
+        if item is None:  # deleted since it was ranked
+            continue
+        item.score, item.rank = score, rank
+        results.append(item)
+    return results
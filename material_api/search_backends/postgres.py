@@ -0,0 +1,117 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import OperationalError
+from django.db.models import F, Q, Value, FloatField
+
+from ..models import MatGroupSearchDocument
+from ..ranking import search_settings, paginate, hybrid_rank, trigram_threshold, is_query_timeout
+from ..serializers import MatGroupSerializer
+from .base import (
+    SearchBackend, SearchResults, GroupHit, BM25_THRESHOLD, TRIGRAM_THRESHOLD, ITEM_PREFILTER_FIELDS,
+    ITEM_PREFILTER_CONFIG,
+)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Full-text search (tsvector) + pg_trgm, served by GIN indexes.
+
+    The hybrid queries run under STATEMENT_TIMEOUT_MS. If Postgres cancels
+    one, a trigram-only query on the GIN-indexed text columns answers
+    instead (flagged degraded); if that times out too, the result is empty.
+    """
+    name = "postgres"
+
+    def search_groups(self, query, search_type=None):
+        conf = search_settings()
+        docs = MatGroupSearchDocument.objects.filter(
+            mgrp_code__is_deleted=False,
+            item_count__gt=0
+        )
+        if search_type:
+            docs = docs.filter(mgrp_code__search_type=search_type)
+
+        search_query = SearchQuery(query)
+
+        # Let the trigram index return candidates down to our 0.2 cut-off
+        try:
+            with trigram_threshold("word_similarity_threshold", TRIGRAM_THRESHOLD, conf["STATEMENT_TIMEOUT_MS"]):
+                return self._group_hits(
+                    docs
+                    .filter(Q(document=search_query) | Q(text__trigram_word_similar=query))
+                    .annotate(
+                        rank=SearchRank(F("document"), search_query),
+                        score=TrigramWordSimilarity(query, "text")
+                    )
+                    .filter(Q(rank__gte=BM25_THRESHOLD) | Q(score__gte=TRIGRAM_THRESHOLD))
+                    .order_by("-rank", "-score", "-mgrp_code__popularity"),
+                    conf
+                )
+        except OperationalError as e:
+            if not is_query_timeout(e):
+                raise
+            print(f"search_groups timed out for {query!r}, using trigram fallback")
+
+        # Fallback: word similarity on the trigram-indexed text only
+        try:
+            with trigram_threshold("word_similarity_threshold", TRIGRAM_THRESHOLD, conf["FALLBACK_TIMEOUT_MS"]):
+                hits = self._group_hits(
+                    docs
+                    .filter(text__trigram_word_similar=query)
+                    .annotate(
+                        rank=Value(0.0, output_field=FloatField()),
+                        score=TrigramWordSimilarity(query, "text")
+                    )
+                    .order_by("-score", "-mgrp_code__popularity"),
+                    conf
+                )
+        except OperationalError as e:
+            if not is_query_timeout(e):
+                raise
+            hits = []
+        return SearchResults(hits, degraded=True)
+
+    def _group_hits(self, docs, conf):
+        return [
+            GroupHit(doc.mgrp_code_id, MatGroupSerializer(doc.mgrp_code).data, doc.rank, doc.score)
+            for doc in docs.select_related("mgrp_code")[:conf["MAX_GROUP_RESULTS"]]
+        ]
+
+    def rank_items(self, items, query, vector_fields, trigram_fields, limit, offset, scope=None):
+        conf = search_settings()
+        ranked = hybrid_rank(
+            items, query, vector_fields, trigram_fields,
+            prefilter_fields=ITEM_PREFILTER_FIELDS, prefilter_config=ITEM_PREFILTER_CONFIG
+        )
+        try:
+            with trigram_threshold(
+                "word_similarity_threshold", conf["TRIGRAM_SIMILARITY_THRESHOLD"], conf["STATEMENT_TIMEOUT_MS"]
+            ):
+                return list(paginate(ranked, limit, offset))
+        except OperationalError as e:
+            if not is_query_timeout(e):
+                raise
+            print(f"rank_items timed out for {query!r}, using trigram fallback")
+
+        # Fallback: trigram word similarity on the GIN-indexed columns only
+        candidates = Q()
+        for field in ITEM_PREFILTER_FIELDS:
+            candidates |= Q(**{f"{field}__trigram_word_similar": query})
+        fallback = (
+            items
+            .filter(candidates)
+            .annotate(
+                rank=Value(0.0, output_field=FloatField()),
+                score=TrigramWordSimilarity(query, "short_name")
+            )
+            .order_by("-score", "-popularity", "local_item_id")
+        )
+        try:
+            with trigram_threshold(
+                "word_similarity_threshold", conf["TRIGRAM_SIMILARITY_THRESHOLD"], conf["FALLBACK_TIMEOUT_MS"]
+            ):
+                page = list(paginate(fallback, limit, offset))
+        except OperationalError as e:
+            if not is_query_timeout(e):
+                raise
+            page = []
+        return SearchResults(page, degraded=True)
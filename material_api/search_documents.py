@@ -0,0 +1,77 @@
+from django.db import connection
+
+from .commit_hooks import on_commit_batch
+
+
+# ============================================================
+# ✅ Build / refresh MatGroupSearchDocument rows
+# ============================================================
+# One statement per refresh: aggregate the group's non-deleted items and
+# upsert the weighted tsvector + trigram text. Weights follow the original
+# on-the-fly search_groups vector.
+REFRESH_SQL = """
+    INSERT INTO material_api_matgroupsearchdocument (mgrp_code_id, document, text, item_count, updated)
+    SELECT
+        g.mgrp_code,
+        setweight(to_tsvector(concat_ws(' ', agg.short_names, agg.long_names)), 'A') ||
+        setweight(to_tsvector(coalesce(agg.search_texts, '')), 'B') ||
+        setweight(to_tsvector(coalesce(g.notes, '')), 'A') ||
+        setweight(to_tsvector(coalesce(g.mgrp_shortname, '')), 'B') ||
+        setweight(to_tsvector(coalesce(g.mgrp_longname, '')), 'B'),
+        concat_ws(' ', g.mgrp_shortname, g.mgrp_longname, g.notes, agg.short_names, agg.long_names, agg.search_texts),
+        coalesce(agg.item_count, 0),
+        NOW()
+    FROM matgroups_matgroup AS g
+    LEFT JOIN LATERAL (
+        SELECT
+            COUNT(*) AS item_count,
+            string_agg(DISTINCT i.short_name, ' ') AS short_names,
+            string_agg(DISTINCT i.long_name, ' ') AS long_names,
+            string_agg(DISTINCT i.search_text, ' ') AS search_texts
+        FROM itemmaster_itemmaster AS i
+        WHERE i.mgrp_code = g.mgrp_code AND i.is_deleted = false
+    ) AS agg ON true
+    {where}
+    ON CONFLICT (mgrp_code_id) DO UPDATE SET
+        document = EXCLUDED.document,
+        text = EXCLUDED.text,
+        item_count = EXCLUDED.item_count,
+        updated = EXCLUDED.updated
+"""
+
+
+def refresh_search_documents(mgrp_codes=None):
+    """
+    Rebuild the search documents of the given groups (all groups if None).
+    Returns the number of documents written.
+    """
+    params = []
+    where = ""
+    if mgrp_codes is not None:
+        mgrp_codes = [code for code in mgrp_codes if code]
+        if not mgrp_codes:
+            return 0
+        where = "WHERE g.mgrp_code = ANY(%s)"
+        params.append(mgrp_codes)
+
+    with connection.cursor() as cursor:
+        cursor.execute(REFRESH_SQL.format(where=where), params)
+        return cursor.rowcount
+
+
+def schedule_search_document_refresh(mgrp_codes):
+    """
+    Refresh after the surrounding transaction commits (immediately in
+    autocommit). However many writes in one transaction touch a group, its
+    document is re-aggregated once, in one statement for all the groups.
+    """
+    mgrp_codes = {code for code in mgrp_codes if code}
+    # Documents are tsvector rows, kept only on PostgreSQL
+    if not mgrp_codes or connection.vendor != "postgresql":
+        return
+
+    on_commit_batch(
+        "search_documents",
+        lambda batch: batch.setdefault("groups", set()).update(mgrp_codes),
+        lambda batch: refresh_search_documents(sorted(batch["groups"])),
+    )
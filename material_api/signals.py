@@ -0,0 +1,181 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from MaterialType.models import MaterialType
+from supergroups.models import SuperGroup
+from .item_counts import apply_item_change, refresh_super_group_counts
+from .item_names import schedule_group_name_propagation
+from .result_cache import bump_catalog_version
+from .snapshot import patch_snapshot
+from .autocomplete import refresh_suggestion
+from .commit_hooks import on_commit_batch
+from .search_backends import get_search_backend
+from .search_documents import schedule_search_document_refresh
+from .similarity import item_changed as similarity_item_changed
+
+
+# ============================================================
+# ✅ Invalidate derived search data on catalog writes
+# ============================================================
+def _affected_groups(instance):
+    """Group the item is in now, plus the one it moved out of (if any)."""
+    groups = {instance.mgrp_code_id}
+    previous = getattr(instance, "_previous_state", None)
+    if previous:
+        groups.add(previous["mgrp_code"])
+    return {g for g in groups if g}
+
+
+@receiver(post_save, sender=ItemMaster)
+@receiver(post_delete, sender=ItemMaster)
+def itemmaster_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_search_document_refresh(_affected_groups(instance))
+
+
+@receiver(post_save, sender=MatGroup)
+def matgroup_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Group names/notes are part of the search document
+    schedule_search_document_refresh([instance.mgrp_code])
+
+
+@receiver(post_save, sender=ItemMaster)
+@receiver(post_delete, sender=ItemMaster)
+@receiver(post_save, sender=MatGroup)
+@receiver(post_delete, sender=MatGroup)
+@receiver(post_save, sender=MaterialType)
+@receiver(post_delete, sender=MaterialType)
+@receiver(post_save, sender=SuperGroup)
+@receiver(post_delete, sender=SuperGroup)
+def catalog_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    def _add(batch):
+        # Item writes patch just those items into the drill-down snapshot
+        if sender is ItemMaster:
+            batch.setdefault("items", set()).add(instance.local_item_id)
+            batch.setdefault("groups", set()).update(_affected_groups(instance))
+        else:
+            batch["catalog"] = True
+    on_commit_batch("catalog", _add, _catalog_committed)
+
+
+def _catalog_committed(batch):
+    # Bumped once per transaction, after its writes are visible, so nothing
+    # built from pre-commit data can carry the new version. Cached results
+    # and snapshots are keyed by it. This process's snapshot is brought up
+    # to date before the response; other workers rebuild theirs.
+    version = bump_catalog_version()
+    patch_snapshot(version, batch.get("items", ()), batch.get("groups", ()), batch.get("catalog", False))
+
+
+# ============================================================
+# ✅ Maintain drill-down item counts from ItemMaster writes
+# ============================================================
+def _count_state(item):
+    return {
+        "mgrp_code": item.mgrp_code_id,
+        "mat_type_code": item.mat_type_code_id,
+        "is_final": item.is_final,
+        "is_deleted": item.is_deleted,
+    }
+
+
+@receiver(post_save, sender=ItemMaster)
+def itemmaster_counts_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    # _previous_state is captured by itemmaster.signals (pre_save)
+    previous = None if created else getattr(instance, "_previous_state", None)
+    apply_item_change(previous, _count_state(instance))
+
+
+@receiver(post_delete, sender=ItemMaster)
+def itemmaster_counts_deleted(sender, instance, **kwargs):
+    apply_item_change(_count_state(instance), None)
+
+
+@receiver(post_save, sender=MatGroup)
+def matgroup_counts_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    # Only a move to another SuperGroup or a (soft-)delete changes the totals;
+    # _previous_counted is captured by matgroup_pre_save
+    previous = getattr(instance, "_previous_counted", None)
+    if previous != (instance.sgrp_code_id, instance.is_deleted):
+        refresh_super_group_counts()
+
+
+@receiver(post_delete, sender=MatGroup)
+def matgroup_counts_deleted(sender, instance, **kwargs):
+    refresh_super_group_counts()
+
+
+@receiver(post_save, sender=ItemMaster)
+@receiver(post_delete, sender=ItemMaster)
+def itemmaster_in_memory_indexes(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    item_id = instance.local_item_id
+    groups = _affected_groups(instance)
+    on_commit_batch(
+        "in_memory_indexes",
+        lambda batch: batch.setdefault(item_id, set()).update(groups),
+        _refresh_in_memory_indexes,
+    )
+
+
+def _refresh_in_memory_indexes(items):
+    """Items ({local_item_id: groups}) written in one transaction."""
+    for item_id, groups in items.items():
+        refresh_suggestion("item", item_id)
+        similarity_item_changed(item_id, groups)
+    # One document rebuild per group, not one per item
+    get_search_backend().items_changed(list(items))
+
+
+@receiver(post_save, sender=MatGroup)
+@receiver(post_delete, sender=MatGroup)
+def matgroup_in_memory_indexes(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    mgrp_code = instance.mgrp_code
+
+    def _refresh():
+        refresh_suggestion("group", mgrp_code)
+        get_search_backend().group_changed(mgrp_code)
+    transaction.on_commit(_refresh)
+
+
+# ============================================================
+# ✅ Propagate MatGroup renames into ItemMaster names
+# ============================================================
+@receiver(pre_save, sender=MatGroup)
+def matgroup_pre_save(sender, instance, raw=False, **kwargs):
+    # Stored name (renames) and SuperGroup / deleted flag (super group counts)
+    instance._previous_longname = None
+    instance._previous_counted = None
+    if raw or instance._state.adding:
+        return
+    previous = (
+        MatGroup.objects.filter(pk=instance.pk).values_list("mgrp_longname", "sgrp_code", "is_deleted").first()
+    )
+    if previous is not None:
+        instance._previous_longname = previous[0]
+        instance._previous_counted = previous[1:]
+
+
+@receiver(post_save, sender=MatGroup)
+def matgroup_renamed(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    # Items carry the group's long name in mgrp_long_name / long_name
+    if hasattr(instance, "_previous_longname") and instance.mgrp_longname != instance._previous_longname:
+        schedule_group_name_propagation(instance.mgrp_code, instance._previous_longname)
@@ -0,0 +1,327 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+
+from itemmaster.models import ItemMaster
+
+
+# Defaults for settings.SIMILAR_ITEMS
+SIMILARITY_DEFAULTS = {
+    # Character n-gram sizes (taken inside each word, padded with spaces)
+    "NGRAM_SIZES": (2, 3),
+    "DEFAULT_K": 10,
+    "MAX_K": 50,
+    # Cosine similarity below this is never returned
+    "MIN_SCORE": 0.3,
+    # create_itemmaster warns about near-duplicates at or above this score
+    # (None turns the pre-check off)
+    "PRECHECK_THRESHOLD": 0.85,
+    # Seconds before a group's matrix is rebuilt from the database, to pick up
+    # writes made by other workers (signals only update the local matrices).
+    # The old matrix keeps serving while the rebuild runs in the background.
+    "REBUILD_INTERVAL": 900,
+    # Dead rows (updated/deleted items) tolerated before a matrix is compacted
+    "COMPACT_RATIO": 0.25,
+}
+
+
+def similarity_settings():
+    return {**SIMILARITY_DEFAULTS, **getattr(settings, "SIMILAR_ITEMS", {})}
+
+
+# ============================================================
+# ✅ Item documents → character n-grams
+# ============================================================
+_SPLIT = re.compile(r"[^\w.]+")
+
+
+def item_document(short_name, long_name, attributes):
+    """Text compared for similarity: names plus attribute values."""
+    parts = [short_name or "", long_name or ""]
+    if isinstance(attributes, dict):
+        parts.extend(str(v) for v in attributes.values() if v not in (None, ""))
+    return " ".join(parts)
+
+
+def char_ngrams(text, sizes):
+    """N-grams of every word padded with spaces, so word order doesn't matter."""
+    for word in _SPLIT.sub(" ", str(text).lower()).split():
+        padded = f" {word} "
+        for n in sizes:
+            for i in range(len(padded) - n + 1):
+                yield padded[i:i + n]
+
+
+# ============================================================
+# ✅ Per-group TF-IDF matrix
+# ============================================================
+class GroupVectors:
+    """
+    Raw n-gram counts for one MatGroup's items as a CSR matrix (one row per
+    item). IDF weights and row norms are derived lazily and cached until the
+    next write. Updates append a row and zero the old one; dead rows are
+    compacted away once they pass COMPACT_RATIO.
+    """
+
+    def __init__(self, mgrp_code, documents=(), sizes=(2, 3)):
+        self.mgrp_code = mgrp_code
+        self.sizes = tuple(sizes)
+        self.vocabulary = {}
+        self.ids = []        # row -> local_item_id (None once the row is dead)
+        self.rows = {}       # local_item_id -> row
+        self._matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._pending = []   # (cols, counts) of rows not yet in _matrix
+        self._dead = 0
+        self._weighted = None
+        self.built_at = time.monotonic()
+        self._lock = threading.Lock()
+        for ident, text in documents:
+            self._append(ident, text)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def upsert(self, ident, text):
+        with self._lock:
+            self._kill(ident)
+            self._append(ident, text)
+
+    def remove(self, ident):
+        with self._lock:
+            self._kill(ident)
+
+    def _append(self, ident, text):
+        counts = Counter(char_ngrams(text, self.sizes))
+        cols = np.empty(len(counts), dtype=np.int32)
+        vals = np.empty(len(counts), dtype=np.float32)
+        for pos, (gram, n) in enumerate(counts.items()):
+            col = self.vocabulary.get(gram)
+            if col is None:
+                col = self.vocabulary[gram] = len(self.vocabulary)
+            cols[pos] = col
+            vals[pos] = n
+        self.rows[ident] = len(self.ids)
+        self.ids.append(ident)
+        self._pending.append((cols, vals))
+        self._weighted = None
+
+    def _kill(self, ident):
+        if ident not in self.rows:
+            return
+        # Fold first: the row may still be pending
+        self._materialize()
+        row = self.rows.pop(ident)
+        matrix = self._matrix
+        matrix.data[matrix.indptr[row]:matrix.indptr[row + 1]] = 0
+        self.ids[row] = None
+        self._dead += 1
+        self._weighted = None
+
+    def _materialize(self):
+        """Fold pending rows into the matrix."""
+        width = len(self.vocabulary)
+        if self._pending:
+            indptr = np.zeros(len(self._pending) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(cols) for cols, _ in self._pending])
+            pending = sparse.csr_matrix(
+                (
+                    np.concatenate([vals for _, vals in self._pending]),
+                    np.concatenate([cols for cols, _ in self._pending]),
+                    indptr,
+                ),
+                shape=(len(self._pending), width),
+            )
+            self._matrix.resize((self._matrix.shape[0], width))
+            self._matrix = sparse.vstack([self._matrix, pending], format="csr")
+            self._pending = []
+
+    def _compact(self):
+        """Drop dead rows once they pass COMPACT_RATIO (renumbers ids/rows)."""
+        if self._dead and self._dead > similarity_settings()["COMPACT_RATIO"] * len(self.ids):
+            alive = [row for row, ident in enumerate(self.ids) if ident is not None]
+            self._matrix = self._matrix[alive]
+            self._matrix.eliminate_zeros()
+            self.ids = [self.ids[row] for row in alive]
+            self.rows = {ident: row for row, ident in enumerate(self.ids)}
+            self._dead = 0
+
+    def _weights(self):
+        if self._weighted is None:
+            self._materialize()
+            self._compact()
+            matrix = self._matrix
+            n_docs = len(self.rows)
+            width = len(self.vocabulary)
+            df = np.bincount(matrix.indices[matrix.data > 0], minlength=width)
+            # n-grams shared by every item (e.g. the group prefix in long_name) weigh 0
+            idf = np.log((1.0 + n_docs) / (1.0 + df)).astype(np.float32)
+            weighted = matrix @ sparse.diags(idf)
+            norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            weighted = sparse.diags(1.0 / norms) @ weighted
+            self._weighted = (weighted.tocsr(), idf, math.log(1.0 + n_docs))
+        return self._weighted
+
+    def query(self, text, k, min_score, exclude=()):
+        """Top ``k`` (local_item_id, cosine similarity) pairs for ``text``."""
+        with self._lock:
+            if not self.rows:
+                return []
+            weighted, idf, unseen_idf = self._weights()
+            vector = np.zeros(weighted.shape[1], dtype=np.float32)
+            unseen = 0.0
+            for gram, n in Counter(char_ngrams(text, self.sizes)).items():
+                col = self.vocabulary.get(gram)
+                if col is None or col >= len(vector):
+                    unseen += (n * unseen_idf) ** 2
+                else:
+                    vector[col] += n * idf[col]
+            norm = math.sqrt(float(vector @ vector) + unseen)
+            if norm == 0:
+                return []
+            scores = weighted @ (vector / norm)
+            ids = self.ids
+
+        candidates = np.flatnonzero(scores >= max(min_score, 1e-6))
+        wanted = k + len(exclude)
+        if len(candidates) > wanted:
+            top = np.argpartition(-scores[candidates], wanted - 1)[:wanted]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        hits = []
+        for row in candidates:
+            ident = ids[row]
+            if ident is None or ident in exclude:
+                continue
+            hits.append((ident, float(scores[row])))
+            if len(hits) == k:
+                break
+        return hits
+
+
+# ============================================================
+# ✅ Process-wide matrices (built per group on first use)
+# ============================================================
+# Each group is built under its own lock, so a slow build only holds up the
+# first requests for that group. Once built, a matrix is refreshed in the
+# background after REBUILD_INTERVAL while the old one keeps serving.
+_groups = {}
+_groups_lock = threading.Lock()  # guards _build_locks
+_build_locks = {}
+_pending = {}  # mgrp_code -> items written while its build runs (None: discard the build)
+
+
+def _group_documents(mgrp_code, **filters):
+    rows = ItemMaster.objects.filter(mgrp_code=mgrp_code, is_deleted=False, **filters).values_list(
+        "local_item_id", "short_name", "long_name", "attributes"
+    )
+    return [(ident, item_document(short, long, attrs)) for ident, short, long, attrs in rows]
+
+
+def _build_lock(mgrp_code):
+    with _groups_lock:
+        return _build_locks.setdefault(mgrp_code, threading.Lock())
+
+
+def build_group_vectors(mgrp_code, if_missing=False):
+    """Build the group's matrix and swap it in, then replay items written meanwhile."""
+    with _build_lock(mgrp_code):
+        if if_missing and mgrp_code in _groups:
+            return _groups[mgrp_code]  # built while we waited
+        _pending[mgrp_code] = set()
+        try:
+            vectors = GroupVectors(mgrp_code, _group_documents(mgrp_code), similarity_settings()["NGRAM_SIZES"])
+            if _pending[mgrp_code] is not None:
+                _groups[mgrp_code] = vectors
+        finally:
+            changed = _pending.pop(mgrp_code)
+    for local_item_id in changed or ():
+        item_changed(local_item_id, [mgrp_code])
+    return vectors
+
+
+def _rebuild_in_background(mgrp_code):
+    def _run():
+        try:
+            build_group_vectors(mgrp_code)
+        except Exception as e:
+            print(f"Similarity matrix build for {mgrp_code} failed:", e)
+    threading.Thread(target=_run, name="similarity-group", daemon=True).start()
+
+
+def get_group_vectors(mgrp_code):
+    vectors = _groups.get(mgrp_code)
+    if vectors is None:
+        return build_group_vectors(mgrp_code, if_missing=True)
+    expired = time.monotonic() - vectors.built_at > similarity_settings()["REBUILD_INTERVAL"]
+    if expired and mgrp_code not in _pending:
+        vectors.built_at = time.monotonic()  # only one refresh per interval
+        _rebuild_in_background(mgrp_code)
+    return vectors
+
+
+def item_changed(local_item_id, mgrp_codes):
+    """Re-read one item after a write and update the loaded matrices of ``mgrp_codes``."""
+    for code in mgrp_codes:
+        changed = _pending.get(code)
+        if changed is not None:
+            changed.add(local_item_id)
+    loaded = [_groups[code] for code in mgrp_codes if code in _groups]
+    if not loaded:
+        return
+    row = ItemMaster.objects.filter(local_item_id=local_item_id, is_deleted=False).values_list(
+        "mgrp_code_id", "short_name", "long_name", "attributes"
+    ).first()
+    for vectors in loaded:
+        if row is not None and row[0] == vectors.mgrp_code:
+            vectors.upsert(local_item_id, item_document(*row[1:]))
+        else:
+            vectors.remove(local_item_id)
+
+
+def group_changed(mgrp_code):
+    """Drop the group's loaded matrix after a bulk update of its items (rebuilt on next use)."""
+    if mgrp_code in _pending:
+        _pending[mgrp_code] = None  # a build reading from before the update
+    _groups.pop(mgrp_code, None)
+
+
+def clear_similarity_index():
+    for mgrp_code in list(_pending):
+        _pending[mgrp_code] = None
+    _groups.clear()
+
+
+def find_similar_items(mgrp_code, short_name="", long_name="", attributes=None,
+                       k=None, min_score=None, exclude=()):
+    """
+    Items in ``mgrp_code`` most similar to the given names/attributes,
+    best first, each with its cosine "similarity".
+    """
+    conf = similarity_settings()
+    k = min(k or conf["DEFAULT_K"], conf["MAX_K"])
+    min_score = conf["MIN_SCORE"] if min_score is None else min_score
+
+    text = item_document(short_name, long_name, attributes)
+    hits = get_group_vectors(mgrp_code).query(text, k, min_score, exclude=set(exclude))
+    if not hits:
+        return []
+
+    items = {
+        row["local_item_id"]: row
+        for row in ItemMaster.objects.filter(local_item_id__in=[ident for ident, _ in hits]).values(
+            "local_item_id", "sap_item_id", "mgrp_code", "short_name", "attributes", "is_final"
+        )
+    }
+    return [
+        {**items[ident], "similarity": round(score, 4)}
+        for ident, score in hits
+        if ident in items
+    ]
@@ -0,0 +1,413 @@
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from operator import attrgetter
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from MaterialType.models import MaterialType
+from supergroups.models import SuperGroup
+from .item_counts import item_counts
+from .result_cache import catalog_version, acatalog_version, mark_stale_read
+
+
+# ============================================================
+# ✅ Compact read-only records
+# ============================================================
+class SuperGroupRecord:
+    __slots__ = ("sgrp_code", "sgrp_name")
+
+    def __init__(self, sgrp_code, sgrp_name):
+        self.sgrp_code = sgrp_code
+        self.sgrp_name = sgrp_name
+
+
+class GroupRecord:
+    __slots__ = ("mgrp_code", "sgrp_code", "mgrp_shortname", "mgrp_longname", "search_type", "is_deleted")
+
+    def __init__(self, mgrp_code, sgrp_code, mgrp_shortname, mgrp_longname, search_type, is_deleted):
+        self.mgrp_code = mgrp_code
+        self.sgrp_code = sgrp_code
+        self.mgrp_shortname = mgrp_shortname
+        self.mgrp_longname = mgrp_longname
+        self.search_type = search_type
+        self.is_deleted = is_deleted
+
+
+class MaterialTypeRecord:
+    __slots__ = ("mat_type_code", "mat_type_desc", "is_deleted")
+
+    def __init__(self, mat_type_code, mat_type_desc, is_deleted):
+        self.mat_type_code = mat_type_code
+        self.mat_type_desc = mat_type_desc
+        self.is_deleted = is_deleted
+
+
+class ItemRecord:
+    __slots__ = ("local_item_id", "sap_item_id", "short_name", "long_name", "mgrp_code", "mat_type_code")
+
+    def __init__(self, local_item_id, sap_item_id, short_name, long_name, mgrp_code, mat_type_code):
+        self.local_item_id = local_item_id
+        self.sap_item_id = sap_item_id
+        self.short_name = short_name
+        self.long_name = long_name
+        self.mgrp_code = mgrp_code
+        self.mat_type_code = mat_type_code
+
+
+ITEM_FIELDS = ("local_item_id", "sap_item_id", "short_name", "long_name", "mgrp_code_id", "mat_type_code_id")
+
+
+def item_records(queryset):
+    """ItemRecords for an ItemMaster queryset, read with a single values_list."""
+    return [ItemRecord(*row) for row in queryset.values_list(*ITEM_FIELDS)]
+
+
+async def aitem_records(queryset):
+    """item_records for async code (Django's async ORM)."""
+    return [ItemRecord(*row) async for row in queryset.values_list(*ITEM_FIELDS)]
+
+
+def _final_items(**filters):
+    return item_records(ItemMaster.objects.filter(is_deleted=False, is_final=True, **filters))
+
+
+# ============================================================
+# ✅ Versioned catalog snapshot
+# ============================================================
+class CatalogSnapshot:
+    """
+    Immutable in-memory view of the drill-down data: non-deleted super
+    groups, all groups and material types (for lookups), final, non-deleted
+    items indexed by group and by material type, and their counts (read
+    from the GroupTypeItemCount / SuperGroupItemCount rollups).
+    Changes produce a new snapshot; a snapshot is never modified.
+    """
+
+    def __init__(self, version, super_groups, groups, mat_types, items, counts):
+        self.version = version
+        self._set_catalog(super_groups, groups, mat_types)
+        self._set_items(items)
+        self._set_counts(*counts)
+
+    def _set_catalog(self, super_groups, groups, mat_types):
+        self.super_groups = tuple(super_groups)
+        self.groups = {g.mgrp_code: g for g in groups}
+        self.groups_by_upper = {g.mgrp_code.upper(): g for g in groups if not g.is_deleted}
+        self.mat_types = {m.mat_type_code: m for m in mat_types}
+
+        by_super = defaultdict(list)
+        for g in sorted(groups, key=lambda g: g.mgrp_code):
+            if not g.is_deleted and g.sgrp_code:
+                by_super[g.sgrp_code].append(g)
+        self.groups_by_super = {code: tuple(gs) for code, gs in by_super.items()}
+
+    def _set_items(self, items):
+        by_group = defaultdict(list)
+        by_type = defaultdict(list)
+        for item in sorted(items, key=_item_id):
+            by_group[item.mgrp_code].append(item)
+            by_type[item.mat_type_code].append(item)
+        self.items_by_group = {code: tuple(i) for code, i in by_group.items()}
+        self.items_by_type = {code: tuple(i) for code, i in by_type.items()}
+
+    def _set_counts(self, type_counts, super_counts, mgrp_codes=None):
+        """Counts from the rollups; ``mgrp_codes`` limits the per-group totals recomputed."""
+        self.type_counts = type_counts  # {mgrp_code: {mat_type_code: count}}
+        self.super_counts = super_counts  # {sgrp_code: count}
+        if mgrp_codes is None:
+            self.group_counts = {code: sum(counts.values()) for code, counts in type_counts.items()}
+            self.types_by_group = {code: self._types_of(counts) for code, counts in type_counts.items()}
+            return
+
+        self.group_counts = dict(self.group_counts)
+        self.types_by_group = dict(self.types_by_group)
+        for code in mgrp_codes:
+            counts = type_counts.get(code)
+            if counts:
+                self.group_counts[code] = sum(counts.values())
+                self.types_by_group[code] = self._types_of(counts)
+            else:
+                self.group_counts.pop(code, None)
+                self.types_by_group.pop(code, None)
+
+    def _types_of(self, counts):
+        """Material types with items in a group, from its {mat_type_code: count}."""
+        return tuple(
+            self.mat_types[c] for c in sorted(counts)
+            if c in self.mat_types and not self.mat_types[c].is_deleted
+        )
+
+    def _copy(self, version):
+        """Shallow copy under a new version; callers replace what changed."""
+        snapshot = object.__new__(CatalogSnapshot)
+        snapshot.__dict__.update(self.__dict__)
+        snapshot.version = version
+        return snapshot
+
+    def with_group_items(self, version, mgrp_codes, items, counts):
+        """
+        New snapshot with the items of ``mgrp_codes`` replaced by ``items``
+        and their counts by ``counts`` (item_counts() of those groups).
+        """
+        snapshot = self._copy(version)
+
+        mgrp_codes = set(mgrp_codes)
+        by_group = dict(self.items_by_group)
+        fresh = defaultdict(list)
+        for item in sorted(items, key=_item_id):
+            fresh[item.mgrp_code].append(item)
+        for code in mgrp_codes:
+            if fresh.get(code):
+                by_group[code] = tuple(fresh[code])
+            else:
+                by_group.pop(code, None)
+
+        type_counts, super_counts = counts
+        merged_counts = {code: c for code, c in self.type_counts.items() if code not in mgrp_codes}
+        merged_counts.update(type_counts)
+
+        # Material type slices: drop the affected groups' items, add the fresh ones
+        affected_types = {i.mat_type_code for code in mgrp_codes for i in self.items_by_group.get(code, ())}
+        affected_types.update(i.mat_type_code for i in items)
+        by_type = dict(self.items_by_type)
+        for type_code in affected_types:
+            kept = [i for i in self.items_by_type.get(type_code, ()) if i.mgrp_code not in mgrp_codes]
+            kept.extend(i for i in items if i.mat_type_code == type_code)
+            if kept:
+                by_type[type_code] = tuple(sorted(kept, key=_item_id))
+            else:
+                by_type.pop(type_code, None)
+
+        snapshot.items_by_group = by_group
+        snapshot.items_by_type = by_type
+        snapshot._set_counts(merged_counts, super_counts, mgrp_codes)
+        return snapshot
+
+    def with_items(self, version, item_ids, mgrp_codes, items):
+        """
+        New snapshot with the items ``item_ids`` (held, if at all, under one
+        of ``mgrp_codes``) replaced by ``items``, their current final records.
+        Only the slices holding them are copied, and the counts move by the
+        difference, as apply_item_change moves the rollups.
+        """
+        item_ids = set(item_ids)
+        old = [
+            i for code in set(mgrp_codes) for i in self.items_by_group.get(code, ())
+            if i.local_item_id in item_ids
+        ]
+
+        snapshot = self._copy(version)
+        by_group = dict(self.items_by_group)
+        by_type = dict(self.items_by_type)
+        type_counts = dict(self.type_counts)
+        super_counts = dict(self.super_counts)
+
+        def count(record, delta):
+            if not record.mgrp_code or not record.mat_type_code:
+                return
+            counts = type_counts[record.mgrp_code] = dict(type_counts.get(record.mgrp_code, {}))
+            _add(counts, record.mat_type_code, delta)
+            if not counts:
+                del type_counts[record.mgrp_code]
+            group = self.groups.get(record.mgrp_code)
+            if group is not None and not group.is_deleted and group.sgrp_code:
+                _add(super_counts, group.sgrp_code, delta)
+
+        for record in old:
+            by_group[record.mgrp_code] = _without(by_group[record.mgrp_code], record)
+            by_type[record.mat_type_code] = _without(by_type[record.mat_type_code], record)
+            count(record, -1)
+        for record in items:
+            by_group[record.mgrp_code] = _with(by_group.get(record.mgrp_code, ()), record)
+            by_type[record.mat_type_code] = _with(by_type.get(record.mat_type_code, ()), record)
+            count(record, 1)
+
+        snapshot.items_by_group = {code: i for code, i in by_group.items() if i}
+        snapshot.items_by_type = {code: i for code, i in by_type.items() if i}
+        snapshot._set_counts(type_counts, super_counts, {i.mgrp_code for i in old + list(items)})
+        return snapshot
+
+    def with_catalog(self, version, super_groups, groups, mat_types, counts):
+        """New snapshot with the super groups, groups, material types and counts replaced; items are kept."""
+        snapshot = self._copy(version)
+        snapshot._set_catalog(super_groups, groups, mat_types)
+        snapshot._set_counts(*counts)
+        return snapshot
+
+
+_item_id = attrgetter("local_item_id")
+
+
+def _without(items, record):
+    """``items`` (sorted by local_item_id) without ``record``."""
+    at = bisect_left(items, record.local_item_id, key=_item_id)
+    if at < len(items) and items[at].local_item_id == record.local_item_id:
+        return items[:at] + items[at + 1:]
+    return items
+
+
+def _with(items, record):
+    """``items`` (sorted by local_item_id) with ``record`` added."""
+    items = list(items)
+    insort(items, record, key=_item_id)
+    return tuple(items)
+
+
+def _add(counts, key, delta):
+    count = counts.get(key, 0) + delta
+    if count > 0:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+def _catalog_records():
+    """(super groups, groups, material types) records; small tables, read whole."""
+    super_groups = [
+        SuperGroupRecord(*row)
+        for row in SuperGroup.objects.filter(is_deleted=False).order_by("sgrp_code")
+        .values_list("sgrp_code", "sgrp_name")
+    ]
+    groups = [
+        GroupRecord(*row)
+        for row in MatGroup.objects.values_list(
+            "mgrp_code", "sgrp_code_id", "mgrp_shortname", "mgrp_longname", "search_type", "is_deleted"
+        )
+    ]
+    mat_types = [
+        MaterialTypeRecord(*row)
+        for row in MaterialType.objects.values_list("mat_type_code", "mat_type_desc", "is_deleted")
+    ]
+    return super_groups, groups, mat_types
+
+
+def build_snapshot(version):
+    return CatalogSnapshot(version, *_catalog_records(), _final_items(), item_counts())
+
+
+# ============================================================
+# ✅ Process-wide snapshot
+# ============================================================
+_snapshot = None
+_lock = threading.Lock()
+_rebuild_lock = threading.Lock()  # held by the one background rebuild
+
+
+def _rebuild():
+    global _snapshot
+    try:
+        # Version first: writes committed during the build make it stale again
+        snapshot = build_snapshot(catalog_version())
+        with _lock:
+            if _snapshot is None or _snapshot.version < snapshot.version:
+                _snapshot = snapshot
+    except Exception as e:
+        print("Catalog snapshot rebuild failed:", e)
+    finally:
+        _rebuild_lock.release()
+        connection.close()
+
+
+def _start_rebuild():
+    """Rebuild the snapshot in a background thread (unless one is running)."""
+    if not _rebuild_lock.acquire(blocking=False):
+        return
+    try:
+        threading.Thread(target=_rebuild, name="catalog-snapshot", daemon=True).start()
+    except Exception:
+        _rebuild_lock.release()
+        raise
+
+
+def _current_or_stale(snapshot, version):
+    if snapshot.version < version:
+        # Keep answering from the previous snapshot while the new one builds;
+        # those responses are not cached under the new version
+        _start_rebuild()
+        mark_stale_read()
+    return snapshot
+
+
+def get_catalog_snapshot():
+    """
+    Current snapshot. Writes made by this process are patched in as they
+    commit (patch_snapshot); when the catalog version (the CatalogVersion
+    row) moves on because of another worker's write, the previous snapshot
+    is served while a new one is built in the background. Only the first
+    request of a process waits for a build.
+    """
+    global _snapshot
+    version = catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None:
+        return _current_or_stale(snapshot, version)
+
+    with _lock:
+        if _snapshot is None:
+            _snapshot = build_snapshot(version)
+        snapshot = _snapshot
+    return _current_or_stale(snapshot, version)
+
+
+async def aget_catalog_snapshot():
+    """get_catalog_snapshot for async views: no thread hop unless there is no snapshot yet."""
+    snapshot = _snapshot
+    if snapshot is not None:
+        return _current_or_stale(snapshot, await acatalog_version())
+    return await sync_to_async(get_catalog_snapshot)()
+
+
+def _patch(version, apply):
+    """
+    Swap in ``apply(snapshot)`` for the write that bumped the catalog to
+    ``version``, right after it committed. That is a patch when the snapshot
+    was current just before (version - 1). If another bump came in between
+    (another worker's write), the snapshot is rebuilt here instead, so this
+    process never answers from data older than its own write.
+    """
+    global _snapshot
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version >= version:
+            return  # built by the next request / already includes the write
+        if snapshot.version == version - 1:
+            _snapshot = apply(snapshot)
+        else:
+            _snapshot = build_snapshot(catalog_version())
+
+
+def patch_snapshot_items(mgrp_codes, version):
+    """
+    Re-read the final items of ``mgrp_codes`` (after a bulk write) and swap
+    in a patched snapshot instead of a full rebuild. ``version`` is what the
+    write's bump returned.
+    """
+    mgrp_codes = [code for code in mgrp_codes if code]
+    _patch(version, lambda snapshot: snapshot.with_group_items(
+        version, mgrp_codes, _final_items(mgrp_code__in=mgrp_codes), item_counts(mgrp_codes)
+    ))
+
+
+def patch_snapshot(version, item_ids=(), mgrp_codes=(), catalog=False):
+    """
+    Apply one transaction's writes to the snapshot. ``version`` is what the
+    transaction's bump returned. The items ``item_ids`` (in ``mgrp_codes``
+    before or after the write) are re-read and patched in; ``catalog``
+    (super groups, groups or material types written) re-reads those tables
+    and the counts. With neither, only the version moves (e.g. popularity,
+    which the snapshot doesn't hold).
+    """
+    item_ids = list(item_ids)
+
+    def apply(snapshot):
+        snapshot = snapshot._copy(version)
+        if item_ids:
+            snapshot = snapshot.with_items(version, item_ids, mgrp_codes, _final_items(local_item_id__in=item_ids))
+        if catalog:
+            snapshot = snapshot.with_catalog(version, *_catalog_records(), item_counts())
+        return snapshot
+    _patch(version, apply)
@@ -0,0 +1,13 @@
+from .autocomplete import warm_autocomplete_index
+from .popularity import start_popularity_refresher
+from .search_backends import get_search_backend
+
+
+# ============================================================
+# ✅ Per-process background work (core/wsgi.py and core/asgi.py)
+# ============================================================
+def start_background_tasks():
+    """Build the in-memory autocomplete / search indexes and start the popularity refresher."""
+    warm_autocomplete_index()
+    get_search_backend().warm()
+    start_popularity_refresher()
@@ -1,3 +1,651 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
+import zlib
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import path
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from MaterialType.models import MaterialType
+from supergroups.models import SuperGroup
+
+from . import async_views, autocomplete, views
+from .autocomplete import PrefixIndex, Suggestion
+from . import snapshot
+from .item_counts import apply_item_change, item_counts, reconcile_item_counts
+from .models import GroupTypeItemCount, SuperGroupItemCount
+from .ranking import hybrid_rank, trigram_threshold
+from .search_backends.base import ITEM_PREFILTER_CONFIG, ITEM_PREFILTER_FIELDS
+from .near_duplicates import MinHasher, band_keys, bucket_pairs, item_shingles, jaccard, _PRIME
+from . import result_cache
+from .result_cache import (
+    AsyncSingleFlight, SingleFlight, bump_catalog_version, cached_result, catalog_version,
+)
+from . import similarity
+from .similarity import GroupVectors
+
+
+# ============================================================
+# ✅ Similar items: GroupVectors
+# ============================================================
+@override_settings(SIMILAR_ITEMS={"COMPACT_RATIO": 0.25})
+class GroupVectorsTests(SimpleTestCase):
+    def setUp(self):
+        self.vectors = GroupVectors("G", [(1, "gate valve ss316"), (2, "ball valve brass")])
+
+    def top(self, text):
+        return [ident for ident, _ in self.vectors.query(text, 5, 0.1)]
+
+    def test_finds_exact_text(self):
+        self.assertEqual(self.top("gate valve ss316")[0], 1)
+        self.assertEqual(self.top("ball valve brass")[0], 2)
+
+    def test_repeated_upserts_past_compact_ratio(self):
+        # Each upsert kills a row; the second one crosses COMPACT_RATIO
+        self.vectors.upsert(1, "gate valve ss316 flanged")
+        self.vectors.upsert(2, "ball valve brass threaded")
+        self.assertEqual(self.top("gate valve ss316 flanged")[0], 1)
+        self.assertEqual(self.top("ball valve brass threaded")[0], 2)
+        self.assertEqual(sorted(i for i in self.vectors.ids if i is not None), [1, 2])
+
+        for n in range(10):
+            self.vectors.upsert(1, f"gate valve ss316 rev {n}")
+            self.vectors.upsert(2, f"ball valve brass rev {n}")
+            self.assertEqual(self.top(f"gate valve ss316 rev {n}")[0], 1)
+        self.assertEqual(len(self.vectors), 2)
+        hits = self.top("ball valve brass rev 9")
+        self.assertEqual(hits[0], 2)
+        self.assertEqual(len(hits), len(set(hits)))
+
+    def test_remove(self):
+        self.vectors.remove(1)
+        self.vectors.upsert(3, "globe valve")
+        self.assertNotIn(1, self.top("gate valve ss316"))
+        self.assertEqual(self.top("globe valve")[0], 3)
+
+
+class GroupVectorsCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(similarity.clear_similarity_index)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def documents(self, mgrp_code, **filters):
+        if mgrp_code == "SLOW":
+            self.started.set()
+            self.release.wait(5)
+        return [(1, f"{mgrp_code} gate valve")]
+
+    def test_slow_build_only_holds_up_its_group(self):
+        with mock.patch.object(similarity, "_group_documents", self.documents):
+            slow = threading.Thread(target=similarity.get_group_vectors, args=("SLOW",))
+            slow.start()
+            self.started.wait(5)
+            self.assertEqual(similarity.get_group_vectors("FAST").mgrp_code, "FAST")
+            self.release.set()
+            slow.join(5)
+        self.assertIn("SLOW", similarity._groups)
+
+    @override_settings(SIMILAR_ITEMS={"REBUILD_INTERVAL": 0})
+    def test_expired_matrix_keeps_serving_while_rebuilt(self):
+        with mock.patch.object(similarity, "_group_documents", self.documents):
+            self.release.set()
+            old = similarity.get_group_vectors("SLOW")
+            self.started.clear()
+            self.release.clear()
+            old.built_at -= 1
+            self.assertIs(similarity.get_group_vectors("SLOW"), old)  # starts the rebuild
+            self.started.wait(5)
+            self.assertIs(similarity.get_group_vectors("SLOW"), old)
+            self.release.set()
+            for _ in range(100):
+                if similarity._groups["SLOW"] is not old:
+                    break
+                time.sleep(0.05)
+        self.assertIsNot(similarity._groups["SLOW"], old)
+
+
+# ============================================================
+# ✅ Near duplicates: MinHash / LSH
+# ============================================================
+class MinHashTests(SimpleTestCase):
+    def setUp(self):
+        self.hasher = MinHasher(128)
+
+    def test_signature_matches_exact_arithmetic(self):
+        shingles = item_shingles("Gate valve SS316 flanged", {"Size": "25 mm"})
+        expected = [
+            min((int(a) * (zlib.crc32(s.encode("utf-8")) % _PRIME) + int(b)) % _PRIME for s in shingles)
+            for a, b in zip(self.hasher.a[:, 0], self.hasher.b[:, 0])
+        ]
+        self.assertEqual(self.hasher.signature(shingles).tolist(), expected)
+
+    def test_signature_estimates_jaccard(self):
+        a = item_shingles("Gate valve SS316 flanged 25 mm class 150", {})
+        b = item_shingles("Gate valve SS316 flanged 25 mm class 300", {})
+        estimate = np.mean(self.hasher.signature(a) == self.hasher.signature(b))
+        self.assertAlmostEqual(estimate, jaccard(a, b), delta=0.1)
+        self.assertIsNone(self.hasher.signature(set()))
+
+    def test_similar_items_share_a_band(self):
+        a = self.hasher.signature(item_shingles("Ball valve brass 1 inch threaded", {}))
+        b = self.hasher.signature(item_shingles("Ball valve brass 1 inch threaded end", {}))
+        c = self.hasher.signature(item_shingles("Copper cable armoured 4 core", {}))
+        self.assertTrue(set(band_keys(a, 16)) & set(band_keys(b, 16)))
+        self.assertFalse(set(band_keys(a, 16)) & set(band_keys(c, 16)))
+
+    def test_bucket_pairs(self):
+        self.assertEqual(list(bucket_pairs([1, 2, 3], 5)), [(1, 2), (1, 3), (2, 3)])
+        self.assertEqual(list(bucket_pairs([1, 2, 3, 4], 3)), [(1, 2), (1, 3), (1, 4)])
+
+
+# ============================================================
+# ✅ Autocomplete: PrefixIndex
+# ============================================================
+def suggestion(ident, label, popularity=0):
+    sug = Suggestion("item", ident, label, "G", popularity=popularity)
+    sug.keys = tuple({label.lower(), label.lower().split()[-1]})
+    return sug
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def labels(self, index, prefix, limit=10):
+        return [s.label for s in index.lookup(prefix, limit)]
+
+    def test_lookup_orders_by_popularity(self):
+        index = PrefixIndex([suggestion(1, "Gate Valve", 1), suggestion(2, "Globe Valve", 5), suggestion(3, "Cable")])
+        self.assertEqual(self.labels(index, "valve"), ["Globe Valve", "Gate Valve"])
+        self.assertEqual(self.labels(index, "ga"), ["Gate Valve"])
+        self.assertEqual(self.labels(index, "x"), [])
+
+    def test_upsert_and_remove_before_merge(self):
+        index = PrefixIndex([suggestion(1, "Gate Valve"), suggestion(2, "Cable")], merge_threshold=100)
+        index.upsert(suggestion(1, "Ball Valve"))
+        index.upsert(suggestion(3, "Gasket"))
+        index.remove("item", 2)
+        self.assertEqual(self.labels(index, "ga"), ["Gasket"])
+        self.assertEqual(self.labels(index, "valve"), ["Ball Valve"])
+        self.assertEqual(self.labels(index, "cable"), [])
+
+    def test_merge_keeps_results(self):
+        index = PrefixIndex([suggestion(n, f"Item {n:03d}") for n in range(50)], merge_threshold=8)
+        for n in range(0, 50, 2):
+            index.upsert(suggestion(n, f"Part {n:03d}", popularity=n))
+        for n in range(1, 50, 10):
+            index.remove("item", n)
+        keys, refs, _, delta_keys, _, dead = index._state
+        self.assertLess(len(delta_keys) + len(dead), 8)
+        self.assertEqual(keys, sorted(keys))
+
+        fresh = PrefixIndex(list(index.records.values()))
+        for prefix in ("item", "part", "part 04", "item 01", "0"):
+            self.assertEqual(self.labels(index, prefix), self.labels(fresh, prefix))
+        self.assertEqual(len(index.records), 45)
+
+    def test_short_prefixes_rank_the_whole_index(self):
+        # The most popular "v..." suggestions sort last alphabetically
+        suggestions = [suggestion(n, f"Valve a{n:03d}") for n in range(100)]
+        suggestions += [suggestion(100 + n, f"Valve z{n:03d}", popularity=10 + n) for n in range(5)]
+        index = PrefixIndex(suggestions, merge_threshold=4, scan_limit=20, max_limit=3)
+        _, _, tops, _, _, _ = index._state
+        self.assertIn("v", tops)
+        self.assertEqual(self.labels(index, "v", 3), ["Valve z004", "Valve z003", "Valve z002"])
+
+        # Writes after the ranked lists were built still count
+        index.upsert(suggestion(7, "Valve a007", popularity=100))
+        index.remove("item", 104)
+        self.assertEqual(self.labels(index, "va", 3), ["Valve a007", "Valve z003", "Valve z002"])
+        fresh = PrefixIndex(list(index.records.values()))
+        for n in range(6):
+            index.remove("item", 100 + n)
+            fresh.remove("item", 100 + n)
+            for prefix in ("v", "va", "valve", "valve a0"):
+                self.assertEqual(self.labels(index, prefix, 3), self.labels(fresh, prefix, 3))
+
+    def test_refreshed_popularity_reorders_live_index(self):
+        index = PrefixIndex([suggestion(1, "Gate Valve", 1), suggestion(2, "Globe Valve", 5)])
+        self.addCleanup(setattr, autocomplete, "_index", autocomplete._index)
+        autocomplete._index = index
+        autocomplete.update_popularity({1: 9}, {})
+        self.assertEqual(self.labels(index, "valve"), ["Gate Valve", "Globe Valve"])
+        self.assertEqual([s.popularity for s in index.lookup("valve", 2)], [9, 0])
+
+
+# ============================================================
+# ✅ Catalog snapshot: patched on item writes
+# ============================================================
+def snapshot_view(s):
+    return (
+        {code: [i.local_item_id for i in items] for code, items in s.items_by_group.items()},
+        {code: [i.local_item_id for i in items] for code, items in s.items_by_type.items()},
+        s.type_counts, s.super_counts, s.group_counts,
+        {code: [t.mat_type_code for t in types] for code, types in s.types_by_group.items()},
+    )
+
+
+class CatalogSnapshotPatchTests(TestCase):
+    def setUp(self):
+        # Writes are batched per transaction: flush the fixtures' batch too
+        with self.captureOnCommitCallbacks(execute=True):
+            super_group = SuperGroup.objects.create(sgrp_code="TSV", sgrp_name="Valves")
+            self.valves = MatGroup.objects.create(mgrp_code="TSTVALVE", sgrp_code=super_group, mgrp_shortname="Valve")
+            self.cables = MatGroup.objects.create(mgrp_code="TSTCABLE", mgrp_shortname="Cable")
+            self.raw = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+            self.spares = MaterialType.objects.create(mat_type_code="TERS", mat_type_desc="Spares")
+            self.items = [
+                ItemMaster.objects.create(mgrp_code=group, mat_type_code=mat_type, short_name=name, is_final=final)
+                for group, mat_type, name, final in [
+                    (self.valves, self.raw, "Gate", True), (self.valves, self.spares, "Ball", True),
+                    (self.cables, self.raw, "4 core", True), (self.cables, self.raw, "2 core", False),
+                ]
+            ]
+        self.addCleanup(setattr, snapshot, "_snapshot", None)
+        snapshot._snapshot = None
+        snapshot.get_catalog_snapshot()
+
+    def write(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+        current = snapshot._snapshot
+        self.assertEqual(current.version, catalog_version())
+        self.assertEqual(snapshot_view(current), snapshot_view(snapshot.build_snapshot(current.version)))
+
+    def save(self, item, **fields):
+        for name, value in fields.items():
+            setattr(item, name, value)
+        item.save()
+
+    def test_moves_finalization_and_deletes(self):
+        gate, ball, core4, core2 = self.items
+        self.write(lambda: self.save(gate, short_name="Gate flanged"))
+        self.write(lambda: self.save(gate, mgrp_code=self.cables))
+        self.write(lambda: self.save(core2, is_final=True, mat_type_code=self.spares))
+        self.write(lambda: self.save(ball, is_deleted=True))
+        self.write(core4.delete)
+
+    def test_one_patch_per_transaction(self):
+        gate, ball, core4, core2 = self.items
+        version = catalog_version()
+
+        def writes():
+            self.save(gate, mgrp_code=self.cables)
+            self.save(ball, is_final=False)
+            ItemMaster.objects.create(mgrp_code=self.valves, mat_type_code=self.raw, short_name="Globe", is_final=True)
+        self.write(writes)
+        self.assertEqual(catalog_version(), version + 1)
+
+    def test_group_writes_are_visible_at_once(self):
+        def writes():
+            self.cables.sgrp_code_id = "TSV"
+            self.cables.mgrp_shortname = "Cables"
+            self.cables.save()
+            MatGroup.objects.create(mgrp_code="TSTPIPE", sgrp_code_id="TSV", mgrp_shortname="Pipe")
+        self.write(writes)
+
+        current = snapshot.get_catalog_snapshot()
+        self.assertEqual([g.mgrp_code for g in current.groups_by_super["TSV"]], ["TSTCABLE", "TSTPIPE", "TSTVALVE"])
+        self.assertEqual(current.groups["TSTCABLE"].mgrp_shortname, "Cables")
+
+    def test_rebuilds_after_a_bump_it_missed(self):
+        bump_catalog_version()  # e.g. another worker's write
+        gate = self.items[0]
+        self.write(lambda: self.save(gate, is_deleted=True))
+        self.assertNotIn(gate.pk, [i.local_item_id for i in snapshot._snapshot.items_by_group["TSTVALVE"]])
+
+
+# ============================================================
+# ✅ Hybrid item ranking (Postgres)
+# ============================================================
+class HybridRankTests(TestCase):
+    def setUp(self):
+        group = MatGroup.objects.create(mgrp_code="TSTVALVE", mgrp_shortname="Valve")
+        mat_type = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+        self.item = ItemMaster.objects.create(
+            mgrp_code=group, mat_type_code=mat_type, short_name="Flanged gate housing",
+            search_text="stainless butterfly valves", is_final=True,
+        )
+
+    def rank(self, query):
+        items = ItemMaster.objects.filter(pk=self.item.pk)
+        ranked = hybrid_rank(
+            items, query, [("short_name", "A"), ("search_text", "B")], list(ITEM_PREFILTER_FIELDS),
+            prefilter_fields=ITEM_PREFILTER_FIELDS, prefilter_config=ITEM_PREFILTER_CONFIG,
+        )
+        with trigram_threshold("word_similarity_threshold", 0.9):
+            return [item.pk for item in ranked]
+
+    def test_words_split_across_fields_are_candidates(self):
+        self.assertEqual(self.rank("gate valves stainless"), [self.item.pk])
+
+    def settings(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT current_setting('pg_trgm.word_similarity_threshold', true), "
+                "current_setting('statement_timeout')"
+            )
+            return cursor.fetchone()
+
+    def test_settings_are_restored_inside_an_outer_transaction(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', '0.4', true), "
+                "set_config('statement_timeout', '5s', true)"
+            )
+        with trigram_threshold("word_similarity_threshold", 0.9, 1500):
+            self.assertEqual(self.settings(), ("0.9", "1500ms"))
+        self.assertEqual(self.settings(), ("0.4", "5s"))
+
+
+# ============================================================
+# ✅ Result cache: version keying + single-flight
+# ============================================================
+def counting_view(calls, started=None, release=None):
+    @api_view(["GET"])
+    @cached_result
+    def view(request):
+        calls.append(1)
+        if started is not None:
+            started.set()
+            release.wait(5)
+        return Response({"calls": len(calls)})
+    return view
+
+
+class ResultCacheVersionTests(TestCase):
+    def setUp(self):
+        result_cache.result_cache.clear()
+        self.addCleanup(result_cache.result_cache.clear)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group = MatGroup.objects.create(mgrp_code="TSTVALVE", mgrp_shortname="Valve")
+            self.mat_type = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+        self.calls = []
+        self.view = counting_view(self.calls)
+
+    def get(self):
+        return self.view(RequestFactory().get("/x", {"q": "valve"})).data["calls"]
+
+    def test_bump_retires_cached_response(self):
+        self.assertEqual(self.get(), 1)
+        self.assertEqual(self.get(), 1)
+        bump_catalog_version()
+        self.assertEqual(self.get(), 2)
+
+    def test_catalog_write_bumps_version_on_commit(self):
+        self.assertEqual(self.get(), 1)
+        version = catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            ItemMaster.objects.create(mgrp_code=self.group, mat_type_code=self.mat_type, short_name="Gate")
+            ItemMaster.objects.create(mgrp_code=self.group, mat_type_code=self.mat_type, short_name="Ball")
+            # Not before commit: other requests can't see the write yet
+            self.assertEqual(catalog_version(), version)
+            self.assertEqual(self.get(), 1)
+        self.assertEqual(catalog_version(), version + 1)
+        self.assertEqual(self.get(), 2)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_followers_get_the_leaders_result(self):
+        flights = SingleFlight(timeout=5)
+        flight, leader = flights.join("k")
+        self.assertTrue(leader)
+        results = []
+        followers = []
+        for _ in range(3):
+            joined, is_leader = flights.join("k")
+            self.assertFalse(is_leader)
+            followers.append(threading.Thread(target=lambda f=joined: results.append(flights.wait(f))))
+        for thread in followers:
+            thread.start()
+        flights.finish("k", flight, {"n": 1})
+        for thread in followers:
+            thread.join(5)
+        self.assertEqual(results, [{"n": 1}] * 3)
+        self.assertEqual(flights.stats(), {"in_flight": 0, "leaders": 1, "coalesced": 3})
+        self.assertTrue(flights.join("k")[1])  # finished: the next request leads again
+
+    def test_followers_give_up_after_timeout(self):
+        flights = SingleFlight(timeout=0.01)
+        flights.join("k")
+        follower, _ = flights.join("k")
+        self.assertIsNone(flights.wait(follower))
+
+    def test_identical_requests_run_the_view_once(self):
+        result_cache.result_cache.clear()
+        self.addCleanup(result_cache.result_cache.clear)
+        calls, started, release = [], threading.Event(), threading.Event()
+        view = counting_view(calls, started, release)
+        responses = []
+
+        def get():
+            responses.append(view(RequestFactory().get("/x", {"q": "Valve "})).data)
+
+        with mock.patch.object(result_cache, "catalog_version", return_value=1):
+            leader = threading.Thread(target=get)
+            leader.start()
+            started.wait(5)
+            followers = [threading.Thread(target=get) for _ in range(3)]
+            for thread in followers:
+                thread.start()
+            for _ in range(100):
+                if result_cache.in_flight.stats()["coalesced"] >= 3:
+                    break
+                time.sleep(0.01)
+            release.set()
+            for thread in [leader, *followers]:
+                thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(responses, [{"calls": 1}] * 4)
+
+
+class AsyncSingleFlightTests(SimpleTestCase):
+    def test_followers_get_the_leaders_result(self):
+        flights = AsyncSingleFlight(timeout=5)
+
+        async def run():
+            future, leader = flights.join("k")
+            followers = [flights.join("k") for _ in range(2)]
+            waiting = [asyncio.ensure_future(flights.wait(f)) for f, _ in followers]
+            await asyncio.sleep(0)
+            flights.finish("k", future, b"[1]")
+            return leader, [is_leader for _, is_leader in followers], await asyncio.gather(*waiting)
+
+        leader, followers, results = asyncio.run(run())
+        self.assertTrue(leader)
+        self.assertEqual(followers, [False, False])
+        self.assertEqual(results, [b"[1]", b"[1]"])
+        self.assertEqual(flights.stats()["coalesced"], 2)
+
+    def test_uncacheable_result_lets_followers_compute(self):
+        flights = AsyncSingleFlight(timeout=5)
+
+        async def run():
+            future, _ = flights.join("k")
+            follower, _ = flights.join("k")
+            waiting = asyncio.ensure_future(flights.wait(follower))
+            flights.finish("k", future, None)
+            return await waiting
+
+        self.assertIsNone(asyncio.run(run()))
+
+
+# ============================================================
+# ✅ Drill-down item counts
+# ============================================================
+class ItemCountsTests(TestCase):
+    def setUp(self):
+        self.valves_super = SuperGroup.objects.create(sgrp_code="TSV", sgrp_name="Valves")
+        self.pipes_super = SuperGroup.objects.create(sgrp_code="TSP", sgrp_name="Pipes")
+        self.valves = MatGroup.objects.create(mgrp_code="TSTVALVE", sgrp_code=self.valves_super, mgrp_shortname="Valve")
+        self.pipes = MatGroup.objects.create(mgrp_code="TSTPIPE", sgrp_code=self.pipes_super, mgrp_shortname="Pipe")
+        self.raw = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+        self.spares = MaterialType.objects.create(mat_type_code="TERS", mat_type_desc="Spares")
+        self.gate = ItemMaster.objects.create(
+            mgrp_code=self.valves, mat_type_code=self.raw, short_name="Gate", is_final=True
+        )
+
+    def counts(self):
+        by_group, by_super = item_counts(["TSTVALVE", "TSTPIPE"])
+        return by_group, {code: by_super.get(code, 0) for code in ("TSV", "TSP")}
+
+    def test_only_final_items_count(self):
+        ItemMaster.objects.create(mgrp_code=self.valves, mat_type_code=self.raw, short_name="Ball")
+        self.assertEqual(self.counts(), ({"TSTVALVE": {"TROH": 1}}, {"TSV": 1, "TSP": 0}))
+
+    def test_finalization_adds_the_item(self):
+        ball = ItemMaster.objects.create(mgrp_code=self.valves, mat_type_code=self.spares, short_name="Ball")
+        ball.is_final = True
+        ball.save()
+        self.assertEqual(self.counts(), ({"TSTVALVE": {"TROH": 1, "TERS": 1}}, {"TSV": 2, "TSP": 0}))
+
+    def test_move_to_another_group(self):
+        self.gate.mgrp_code = self.pipes
+        self.gate.save()
+        self.assertEqual(self.counts(), ({"TSTPIPE": {"TROH": 1}}, {"TSV": 0, "TSP": 1}))
+
+    def test_type_change_keeps_the_super_group_total(self):
+        self.gate.mat_type_code = self.spares
+        self.gate.save()
+        self.assertEqual(self.counts(), ({"TSTVALVE": {"TERS": 1}}, {"TSV": 1, "TSP": 0}))
+
+    def test_soft_delete_and_restore(self):
+        self.gate.is_deleted = True
+        self.gate.save()
+        self.assertEqual(self.counts(), ({}, {"TSV": 0, "TSP": 0}))
+        self.gate.is_deleted = False
+        self.gate.save()
+        self.assertEqual(self.counts(), ({"TSTVALVE": {"TROH": 1}}, {"TSV": 1, "TSP": 0}))
+
+    def test_hard_delete(self):
+        self.gate.delete()
+        self.assertEqual(self.counts(), ({}, {"TSV": 0, "TSP": 0}))
+
+    def test_incomplete_states_never_count(self):
+        state = {"mgrp_code": "TSTPIPE", "mat_type_code": None, "is_final": True, "is_deleted": False}
+        apply_item_change(None, state)
+        apply_item_change(state, None)
+        self.assertEqual(self.counts(), ({"TSTVALVE": {"TROH": 1}}, {"TSV": 1, "TSP": 0}))
+
+    def test_reconcile_fixes_drift(self):
+        ItemMaster.objects.create(mgrp_code=self.pipes, mat_type_code=self.spares, short_name="Elbow", is_final=True)
+        GroupTypeItemCount.objects.filter(mgrp_code="TSTVALVE").update(item_count=5)
+        GroupTypeItemCount.objects.filter(mgrp_code="TSTPIPE").delete()
+        GroupTypeItemCount.objects.create(mgrp_code=self.pipes, mat_type_code=self.raw, item_count=2)
+        SuperGroupItemCount.objects.filter(sgrp_code="TSV").update(item_count=7)
+        SuperGroupItemCount.objects.filter(sgrp_code="TSP").delete()
+
+        # valves/raw, pipes/raw, pipes/spares (missing), and both totals
+        self.assertEqual(reconcile_item_counts(["TSTVALVE", "TSTPIPE"]), 5)
+        self.assertEqual(self.counts(), ({"TSTVALVE": {"TROH": 1}, "TSTPIPE": {"TERS": 1}}, {"TSV": 1, "TSP": 1}))
+        self.assertEqual(reconcile_item_counts(["TSTVALVE", "TSTPIPE"]), 0)
+
+
+# ============================================================
+# ✅ Async views answer like the sync views
+# ============================================================
+VIEW_ROUTES = [
+    ("matgroups/search/", "search_groups"),
+    ("matgroups/super-groups/", "super_material_groups"),
+    ("matgroups/super-groups/<str:super_code>/material-groups/", "material_groups_by_super"),
+    ("matgroups/<str:mgrp_code>/materials/", "materials_by_matgroup"),
+    ("materials/<str:mat_type_code>/items/", "items_by_material_type"),
+    ("matgroups/by-code/<str:mgrp_code>/", "search_by_matgroup_code"),
+    ("matgroups/<str:group_code>/items/", "items_by_group"),
+    ("matgroups/<str:group_code>/items/sap_ids/", "sap_ids_by_matgroup"),
+    ("matgroups/<str:group_code>/items/<str:mat_type_code>/", "items_by_group_and_type"),
+]
+
+
+class SyncAsyncURLConf:
+    """/sync/<route> and /async/<route> for every async view."""
+    urlpatterns = [
+        path(f"{mode}/{route}", getattr(module, name))
+        for route, name in VIEW_ROUTES
+        for mode, module in (("sync", views), ("async", async_views))
+    ]
+
+
+@override_settings(
+    ROOT_URLCONF=SyncAsyncURLConf, SEARCH_QUERY_LOG={"ENABLED": False}, RATE_LIMITS={"ENABLED": False},
+)
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            super_group = SuperGroup.objects.create(sgrp_code="TSV", sgrp_name="Valves")
+            valves = MatGroup.objects.create(
+                mgrp_code="TSTVALVE", sgrp_code=super_group, mgrp_shortname="Valve", mgrp_longname="Industrial valves"
+            )
+            MatGroup.objects.create(mgrp_code="TSTEMPTY", sgrp_code=super_group, mgrp_shortname="Empty")
+            raw = MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+            spares = MaterialType.objects.create(mat_type_code="TERS", mat_type_desc="Spares")
+            for name, mat_type, sap_id, final in [
+                ("Gate valve flanged", raw, "9000001", True), ("Ball valve threaded", raw, "9000002", True),
+                ("Valve seat kit", spares, "9000003", True), ("Globe valve", raw, None, False),
+            ]:
+                ItemMaster.objects.create(
+                    mgrp_code=valves, mat_type_code=mat_type, short_name=name, sap_item_id=sap_id, is_final=final
+                )
+        result_cache.result_cache.clear()
+        self.addCleanup(result_cache.result_cache.clear)
+        self.addCleanup(setattr, snapshot, "_snapshot", None)
+        snapshot._snapshot = None
+
+    def assertSameResponse(self, method, route, **kwargs):
+        sync = getattr(self.client, method)(f"/sync/{route}", **kwargs)
+
+        # In this thread, so the async ORM sees the test transaction
+        @async_to_sync
+        async def request():
+            return await getattr(self.async_client, method)(f"/async/{route}", **kwargs)
+        response = request()
+        self.assertEqual(
+            (response.status_code, response.json(), response.has_header("X-Search-Degraded")),
+            (sync.status_code, sync.json(), sync.has_header("X-Search-Degraded")),
+        )
+        return response
+
+    def test_search_groups(self):
+        for body in [{"query": "valve"}, {"query": "gate", "search_type": "TROH"}, {"query": " "}, {}]:
+            self.assertSameResponse("post", "matgroups/search/", data=body, content_type="application/json")
+        self.assertSameResponse("get", "matgroups/search/")
+
+    def test_drill_down(self):
+        for route in [
+            "matgroups/super-groups/",
+            "matgroups/super-groups/TSV/material-groups/",
+            "matgroups/super-groups/NONE/material-groups/",
+            "matgroups/TSTVALVE/materials/",
+            "matgroups/TSTEMPTY/materials/",
+            "materials/TROH/items/",
+            "materials/TROH/items/?mgrp_code=TSTVALVE",
+            "materials/NONE/items/",
+            "matgroups/by-code/TSTVALVE/",
+            "matgroups/by-code/NONE/",
+            "matgroups/TSTVALVE/items/sap_ids/",
+            "matgroups/TSTEMPTY/items/sap_ids/",
+        ]:
+            with self.subTest(route=route):
+                self.assertSameResponse("get", route)
+        self.assertSameResponse("post", "matgroups/super-groups/")
+
+    def test_items_by_group(self):
+        for route in [
+            "matgroups/TSTVALVE/items/",
+            "matgroups/TSTVALVE/items/?limit=1&offset=1",
+            "matgroups/TSTVALVE/items/?q=valve",
+            "matgroups/TSTVALVE/items/?q=gate&limit=1",
+            "matgroups/TSTVALVE/items/?limit=-1",
+            "matgroups/TSTVALVE/items/TROH/",
+            "matgroups/TSTVALVE/items/TROH/?q=ball",
+            "matgroups/TSTVALVE/items/TERS/?q=valve&offset=5",
+        ]:
+            with self.subTest(route=route):
+                self.assertSameResponse("get", route)
+        self.assertSameResponse("post", "matgroups/TSTVALVE/items/")
@@ -1,59 +1,93 @@
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# Search and drill-down routes use the async views (same responses as the
+# DRF views in views.py, without a thread per request under daphne).
 
 urlpatterns = [
     # ==========================================================
     # 🔹 1. Free Text Search (Hybrid BM25 + Trigram)
     # ==========================================================
-    path('matgroups/search/', views.search_groups, name='search_groups'),
+    path('matgroups/search/', async_views.search_groups, name='search_groups'),
+
+    # Typeahead suggestions (groups, items, SAP ids)
+    path('autocomplete/', views.autocomplete_suggestions, name='autocomplete_suggestions'),
 
     # ==========================================================
     # 🔹 2. Drill-Down Search Endpoints
     # ==========================================================
     # Get all top-level super material groups
-    path('matgroups/super-groups/', views.super_material_groups, name='super_material_groups'),
+    path('matgroups/super-groups/', async_views.super_material_groups, name='super_material_groups'),
 
     # Get all material groups under a specific super group
     path('matgroups/super-groups/<str:super_code>/material-groups/', 
-         views.material_groups_by_super, name='material_groups_by_super'),
+         async_views.material_groups_by_super, name='material_groups_by_super'),
 
     # Get all material types inside a material group (used in drill-down)
     path('matgroups/<str:mgrp_code>/materials/', 
-         views.materials_by_matgroup, name='materials_by_matgroup'),
+         async_views.materials_by_matgroup, name='materials_by_matgroup'),
 
     # Get all items under a material type (used in drill-down)
     path('materials/<str:mat_type_code>/items/', 
-         views.items_by_material_type, name='items_by_material_type'),
+         async_views.items_by_material_type, name='items_by_material_type'),
 
     # ==========================================================
     # 🔹 3. Direct Search by Material Group Code
     # ==========================================================
     path('matgroups/by-code/<str:mgrp_code>/', 
-         views.search_by_matgroup_code, name='search_by_matgroup_code'),
+         async_views.search_by_matgroup_code, name='search_by_matgroup_code'),
 
     # ==========================================================
     # 🔹 4. Item Retrieval APIs (existing ones)
     # ==========================================================
     # Get all materials inside a selected group
     path('matgroups/<str:group_code>/materials/', 
-         views.materials_by_matgroup, name='materials_by_group'),
+         async_views.materials_by_matgroup, name='materials_by_group'),
 
     # Get all items inside a selected group
     path('matgroups/<str:group_code>/items/', 
-         views.items_by_group, name='items_by_group'),
+         async_views.items_by_group, name='items_by_group'),
 
     # Get SAP IDs for a specific group
     path('matgroups/<str:group_code>/items/sap_ids/', 
-         views.sap_ids_by_matgroup, name='sap_ids_by_matgroup'),
+         async_views.sap_ids_by_matgroup, name='sap_ids_by_matgroup'),
 
     # Get all items by group + material type
     path('matgroups/<str:group_code>/items/<str:mat_type_code>/', 
-         views.items_by_group_and_type, name='items_by_group_and_type'),
+         async_views.items_by_group_and_type, name='items_by_group_and_type'),
      
      
     # Get item details with attributes
     path('items/<str:item_id>/details/', 
          views.item_details_with_attributes, name='item_details_with_attributes'),
 
+    # Excel report of the latest find_near_duplicates run
+    path('reports/near-duplicates/',
+         views.near_duplicate_report, name='near_duplicate_report'),
+
+    # Near-matches of a draft item within its material group
+    path('items/similar/',
+         views.similar_items, name='similar_items'),
+
+    # Typeahead over SAP ids (prefix match)
+    path('items/sap-ids/search/',
+         views.sap_id_search, name='sap_id_search'),
+
+    # SAP ids used by more than one non-deleted item
+    path('reports/sap-id-conflicts/',
+         views.sap_id_conflict_report, name='sap_id_conflict_report'),
+
+    # Slow / zero-result / frequent search queries
+    path('reports/search-queries/',
+         views.search_query_report_view, name='search_query_report'),
+
+    # Item details for many local/SAP ids in one request
+    path('items/details/batch/',
+         views.batch_item_details, name='batch_item_details'),
+
+    # Attribute value counts for a group's filter sidebar
+    path('matgroups/<str:group_code>/facets/', 
+         views.attribute_facets_by_group, name='attribute_facets_by_group'),
+
 
 ]
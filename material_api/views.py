@@ -1,96 +1,78 @@
-from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank, TrigramSimilarity
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import HttpResponse
+from django.db.models import Q
 
+from Common.Middleware import authenticate, restrict
+from Common.RateLimit import rate_limit
 from matgroups.models import MatGroup
-from supergroups.models import SuperGroup
-from MaterialType.models import MaterialType
 from itemmaster.models import ItemMaster
-from matg_attributes.models import MatgAttributeItem
-from .serializers import MatGroupSerializer, MaterialTypeSerializer, ItemMasterSerializer
+from matg_attributes.schema import get_attribute_schema
+from itemmaster.filters import apply_attribute_filters, ATTRIBUTE_PARAM_PREFIX
+from .serializers import MaterialTypeSerializer, ItemMasterSerializer
+from .facets import get_group_facets
+from .result_cache import cached_result
+from .query_log import log_search, group_search_params, item_search_params, search_query_report
+from .autocomplete import autocomplete, autocomplete_settings
+from .ranking import search_settings, parse_pagination, paginate
+from .search_backends import get_search_backend, is_degraded, DEGRADED_HEADER
+from .snapshot import get_catalog_snapshot, item_records
+from .similarity import find_similar_items, similarity_settings
+from .models import NearDuplicateRun
+from .near_duplicates import write_report
+from .sap_ids import search_sap_ids, sap_id_conflicts
 
 
 # ==============================================================
 # 🔹 1. Free Text Search (Hybrid BM25 + Trigram)
 # ==============================================================
+@rate_limit("search")
 @api_view(["POST"])
+@log_search("search_groups", group_search_params)
+@cached_result
 def search_groups(request):
     """
     Free-text hybrid search across Material Groups using BM25 + Trigram.
     Filters by search_type if provided.
+
+    Runs on the configured search backend (Postgres documents or the
+    in-memory index, see material_api.search_backends). Answers from the
+    cheaper fallback after a timeout carry an X-Search-Degraded header.
+    "score" is a 0..1 word similarity per group, no longer a sum over six
+    fields (see GroupHit).
     """
-    query = request.data.get("query", "").strip()
-    search_type = request.data.get("search_type", None)  # Optional filter by search_type
-    
+    query, search_type = search_groups_params(request.data)
+
     if not query:
         return Response({"error": "Field 'query' is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Base queryset with search_type filter
-    base_qs = MatGroup.objects.filter(
-        is_deleted=False,
-        items__is_deleted=False
-    ).distinct()
-    if search_type:
-        base_qs = base_qs.filter(search_type=search_type)
-
-    search_vector = (
-        SearchVector("items__short_name", weight="A") +
-        SearchVector("items__long_name", weight="A") +
-        SearchVector("items__search_text", weight="B") +
-        SearchVector("notes", weight="A") +  # MatGroup.notes field
-        SearchVector("mgrp_shortname", weight="B") +
-        SearchVector("mgrp_longname", weight="B")
-    )
-    search_query = SearchQuery(query)
-
-    # BM25 relevance
-    bm25_qs = (
-        base_qs
-        .annotate(search=search_vector)
-        .annotate(rank=SearchRank(search_vector, search_query))
-        .filter(rank__gte=0.1)
-    )
+    hits = get_search_backend().search_groups(query, search_type)
+    return flag_degraded(Response(group_hits_payload(hits)), hits)
 
-    # Trigram fuzzy search
-    trigram_qs = (
-        base_qs
-        .annotate(
-            trigram_score=(
-                TrigramSimilarity("items__short_name", query) +
-                TrigramSimilarity("items__long_name", query) +
-                TrigramSimilarity("items__search_text", query) +
-                TrigramSimilarity("notes", query) +  # MatGroup.notes field
-                TrigramSimilarity("mgrp_shortname", query) +
-                TrigramSimilarity("mgrp_longname", query)
-            )
-        )
-        .filter(trigram_score__gte=0.2)
-    )
 
-    # Merge both results
-    groups = (bm25_qs | trigram_qs).annotate(
-        rank=SearchRank(search_vector, search_query),
-        score=(
-            TrigramSimilarity("items__short_name", query) +
-            TrigramSimilarity("items__long_name", query) +
-            TrigramSimilarity("items__search_text", query) +
-            TrigramSimilarity("notes", query) +  # MatGroup.notes field
-            TrigramSimilarity("mgrp_shortname", query) +
-            TrigramSimilarity("mgrp_longname", query)
-        )
-    ).order_by("-rank", "-score").distinct()
+def search_groups_params(data):
+    query = str(data.get("query", "") or "").strip()
+    search_type = data.get("search_type", None)  # Optional filter by search_type
+    return query, search_type
+
 
+def group_hits_payload(hits):
     def truncate(num, digits=2):
         factor = 10.0 ** digits
         return int(num * factor) / factor
 
-    data = [
-        {**MatGroupSerializer(group).data, "score": group.score,
-         "rank": truncate(group.rank * 100, 2)}
-        for group in groups
+    return [
+        {**hit.data, "score": hit.score, "rank": truncate(hit.rank * 100, 2)}
+        for hit in hits
     ]
-    return Response(data)
+
+
+def flag_degraded(response, results):
+    """Mark a response built from fallback search results (the body is unchanged)."""
+    if is_degraded(results):
+        response[DEGRADED_HEADER] = "1"
+    return response
 
 
 # ==============================================================
@@ -98,46 +80,58 @@ def search_groups(request):
 # ==============================================================
 # This section enables manual navigation:
 # Super Material Group → Material Group → Material → Items
+#
+# Each view's body is a *_payload(snapshot, ...) function returning
+# (data, status), shared with the async views in material_api.async_views.
 # ==============================================================
 
 @api_view(["GET"])
+@cached_result
 def super_material_groups(request):
     """
-    Get all top-level (super) material groups.
-    Queries SuperGroup model directly.
+    Get all top-level (super) material groups, with their final item counts.
+    Served from the in-memory catalog snapshot.
     """
-    super_groups = SuperGroup.objects.filter(is_deleted=False)
+    data, code = super_groups_payload(get_catalog_snapshot())
+    return Response(data, status=code)
+
+
+def super_groups_payload(snapshot):
     data = [
         {
             "super_code": grp.sgrp_code,
             "super_name": grp.sgrp_name,
             "short_name": grp.sgrp_name,  # SuperGroup doesn't have short_name, using sgrp_name
+            "item_count": snapshot.super_counts.get(grp.sgrp_code, 0),
         }
-        for grp in super_groups
+        for grp in snapshot.super_groups
     ]
-    return Response(data)
+    return data, 200
 
 
 @api_view(["GET"])
+@cached_result
 def material_groups_by_super(request, super_code):
     """
-    Get all material groups under a selected super group.
-    Filters MatGroup by sgrp_code (ForeignKey to SuperGroup).
+    Get all material groups under a selected super group, with item counts.
+    Served from the in-memory catalog snapshot.
     Optionally filters by search_type if provided as query parameter.
     """
-    search_type = request.GET.get("search_type", None)
-    
-    groups = MatGroup.objects.filter(
-        sgrp_code__sgrp_code=super_code,
-        is_deleted=False
+    data, code = groups_by_super_payload(
+        get_catalog_snapshot(), super_code, request.GET.get("search_type", None)
     )
-    
+    return Response(data, status=code)
+
+
+def groups_by_super_payload(snapshot, super_code, search_type=None):
+    groups = snapshot.groups_by_super.get(super_code, ())
+
     # Filter by search_type if provided
     if search_type:
-        groups = groups.filter(search_type=search_type)
-    
-    if not groups.exists():
-        return Response({"message": "No material groups found for this super group"}, status=404)
+        groups = [g for g in groups if g.search_type == search_type]
+
+    if not groups:
+        return {"message": "No material groups found for this super group"}, 404
 
     data = [
         {
@@ -145,46 +139,65 @@ def material_groups_by_super(request, super_code):
             "mgrp_shortname": g.mgrp_shortname,
             "mgrp_longname": g.mgrp_longname,
             "search_type": g.search_type,
+            "item_count": snapshot.group_counts.get(g.mgrp_code, 0),
         }
         for g in groups
     ]
-    return Response(data)
+    return data, 200
 
 
 @api_view(["GET"])
+@cached_result
 def materials_by_matgroup(request, mgrp_code):
     """
     Get all material types under a specific material group.
-    Only returns material types that have items belonging to the specified material group.
-    """
-    # Filter material types that have items in the specified material group (only final items)
-    # items__mgrp_code matches against the ForeignKey (mgrp_code is the primary key in MatGroup)
-    # Django will match the string mgrp_code against the primary key automatically
-    materials = MaterialType.objects.filter(
-        items__mgrp_code=mgrp_code,
-        items__is_deleted=False,
-        items__is_final=True,
-        is_deleted=False
-    ).distinct()
+    Only returns material types that have final items in the specified material group,
+    each with its item count. Served from the in-memory catalog snapshot.
+    """
+    data, code = materials_payload(get_catalog_snapshot(), mgrp_code)
+    return Response(data, status=code)
+
 
+def materials_payload(snapshot, mgrp_code):
+    counts = snapshot.type_counts.get(mgrp_code, {})
     data = [
         {
             "mat_type_code": m.mat_type_code,
             "mat_type_desc": m.mat_type_desc,
+            "item_count": counts[m.mat_type_code],
         }
-        for m in materials
+        for m in snapshot.types_by_group.get(mgrp_code, ())
     ]
-    return Response(data)
+    return data, 200
 
 
 @api_view(["GET"])
+@cached_result
 def items_by_material_type(request, mat_type_code):
     """
     Get all items under a specific material type.
     Optionally filter by material group if mgrp_code query parameter is provided.
+    Served from the in-memory catalog snapshot unless attribute filters are given.
     """
     mgrp_code = request.GET.get("mgrp_code", None)
 
+    if has_attribute_filters(request.GET):
+        try:
+            items = item_records(filtered_items_by_type(request.GET, mat_type_code, mgrp_code))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        items = snapshot_items_by_type(get_catalog_snapshot(), mat_type_code, mgrp_code)
+
+    return Response(items_by_type_payload(items, mat_type_code))
+
+
+def has_attribute_filters(params):
+    return any(key.startswith(ATTRIBUTE_PARAM_PREFIX) for key in params)
+
+
+def filtered_items_by_type(params, mat_type_code, mgrp_code=None):
+    """Database path of items_by_material_type, for attr.* filtered requests."""
     items = ItemMaster.objects.filter(
         mat_type_code=mat_type_code,
         is_deleted=False,
@@ -195,7 +208,19 @@ def items_by_material_type(request, mat_type_code):
     if mgrp_code:
         items = items.filter(mgrp_code=mgrp_code)
 
-    data = [
+    # Filter by attribute values (?attr.<name>=<value>, ?attr.<name>__min=...)
+    return apply_attribute_filters(items, params).order_by("local_item_id")
+
+
+def snapshot_items_by_type(snapshot, mat_type_code, mgrp_code=None):
+    items = snapshot.items_by_type.get(mat_type_code, ())
+    if mgrp_code:
+        items = [i for i in items if i.mgrp_code == mgrp_code]
+    return items
+
+
+def items_by_type_payload(items, mat_type_code):
+    return [
         {
             "local_item_id": i.local_item_id,
             "sap_id": i.sap_item_id,
@@ -203,43 +228,40 @@ def items_by_material_type(request, mat_type_code):
             "short_name": i.short_name,
             "notes": i.long_name,  # Map to old field name for frontend compatibility
             "long_name": i.long_name,
-            "mgrp_code": i.mgrp_code.mgrp_code if i.mgrp_code else None,
+            "mgrp_code": i.mgrp_code,
             "mat_type_code": mat_type_code,
         }
         for i in items
     ]
-    return Response(data)
 
 
 # ==============================================================
 # 🔹 3. Search by Material Group Code (Direct Lookup)
 # ==============================================================
 @api_view(["GET"])
+@cached_result
 def search_by_matgroup_code(request, mgrp_code):
     """
     Search directly by a known Material Group code (case-insensitive).
     Returns the group, its materials, and items.
+    Served from the in-memory catalog snapshot.
     """
-    try:
-        # Case-insensitive search
-        group = MatGroup.objects.get(mgrp_code__iexact=mgrp_code, is_deleted=False)
-    except MatGroup.DoesNotExist:
-        return Response({"error": "Invalid Material Group Code"}, status=404)
+    data, code = matgroup_code_payload(get_catalog_snapshot(), mgrp_code)
+    return Response(data, status=code)
+
+
+def matgroup_code_payload(snapshot, mgrp_code):
+    # Case-insensitive search
+    group = snapshot.groups_by_upper.get(mgrp_code.upper())
+    if group is None:
+        return {"error": "Invalid Material Group Code"}, 404
 
     # Materials in this group (only those with final items)
-    materials = MaterialType.objects.filter(
-        items__mgrp_code=group,
-        items__is_final=True,
-        items__is_deleted=False,
-        is_deleted=False
-    ).distinct()
+    materials = snapshot.types_by_group.get(group.mgrp_code, ())
+    counts = snapshot.type_counts.get(group.mgrp_code, {})
 
     # Items in this group (only final items)
-    items = ItemMaster.objects.filter(
-        mgrp_code=group,
-        is_deleted=False,
-        is_final=True
-    )
+    items = snapshot.items_by_group.get(group.mgrp_code, ())
 
     data = {
         "group": {
@@ -247,11 +269,13 @@ def search_by_matgroup_code(request, mgrp_code):
             "mgrp_shortname": group.mgrp_shortname,
             "mgrp_longname": group.mgrp_longname,
             "search_type": group.search_type,
+            "item_count": snapshot.group_counts.get(group.mgrp_code, 0),
         },
         "materials": [
             {
                 "mat_type_code": m.mat_type_code,
                 "mat_type_desc": m.mat_type_desc,
+                "item_count": counts[m.mat_type_code],
             }
             for m in materials
         ],
@@ -264,142 +288,135 @@ def search_by_matgroup_code(request, mgrp_code):
             for i in items
         ]
     }
-    return Response(data)
+    return data, 200
 
 
 # ==============================================================
 # 🔹 4. Items by Group (with optional text filter)
 # ==============================================================
+@rate_limit("search")
 @api_view(["GET"])
+@log_search("items_by_group", item_search_params)
+@cached_result
 def items_by_group(request, group_code):
     """
-    Get items under a group, optionally filtered with text query.
+    Get items under a group, optionally filtered with text query
+    and attribute values (?attr.<name>=<value>, ?attr.<name>__min/__max).
+    Text search results are ranked and paged with ?limit= / ?offset=.
     """
-    query = request.GET.get("q", "").strip()
-
-    items = ItemMaster.objects.filter(
-        mgrp_code=group_code,
-        is_deleted=False,
-        is_final=True
-    )
-
-    if query:
-        search_vector = (
-            SearchVector("short_name", weight="A") +
-            SearchVector("search_text", weight="B") +
-            SearchVector("mat_type_code", weight="C")
-        )
-        search_query = SearchQuery(query)
-
-        bm25_qs = (
-            items.annotate(search=search_vector)
-            .annotate(rank=SearchRank(search_vector, search_query))
-            .filter(rank__gte=0.1)
-        )
-
-        trigram_qs = (
-            items.annotate(
-                trigram_score=(
-                    TrigramSimilarity("short_name", query) +
-                    TrigramSimilarity("search_text", query) +
-                    TrigramSimilarity("mat_type_code", query)
-                )
-            ).filter(trigram_score__gte=0.2)
-        )
-
-        items = (bm25_qs | trigram_qs).annotate(
-            rank=SearchRank(search_vector, search_query),
-            trigram_score=(
-                TrigramSimilarity("short_name", query) +
-                TrigramSimilarity("search_text", query) +
-                TrigramSimilarity("mat_type_code", query)
-            )
-        ).order_by("-rank", "-trigram_score").distinct()
+    try:
+        search = group_items_search(request.GET, group_code)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    serializer = ItemMasterSerializer(items, many=True)
-    return Response(serializer.data)
+    return _ranked_items_response(**search)
 
 
 # ==============================================================
 # 🔹 5. Items by Group + Material Type (Hybrid Search)
 # ==============================================================
+@rate_limit("search")
 @api_view(["GET"])
+@log_search("items_by_group_and_type", item_search_params)
+@cached_result
 def items_by_group_and_type(request, group_code, mat_type_code):
     """
-    Get items by group + material type, optionally with text search.
+    Get items by group + material type, optionally with text search
+    and attribute values (?attr.<name>=<value>, ?attr.<name>__min/__max).
+    Text search results are ranked and paged with ?limit= / ?offset=.
     """
-    query = request.GET.get("q", "").strip()
+    try:
+        search = group_items_search(request.GET, group_code, mat_type_code)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return _ranked_items_response(**search)
+
+
+def group_items_search(params, group_code, mat_type_code=None):
+    """
+    Arguments for ranking a group's items (optionally of one material type):
+    the filtered queryset, text query, page and the fields searched.
+    Raises ValueError for bad attr.* or paging params.
+    """
+    query = params.get("q", "").strip()
 
     items = ItemMaster.objects.filter(
         mgrp_code=group_code,
-        mat_type_code=mat_type_code,
         is_deleted=False,
         is_final=True
     )
+    if mat_type_code is None:
+        vector_fields = [("short_name", "A"), ("search_text", "B"), ("mat_type_code", "C")]
+        trigram_fields = ["short_name", "search_text", "mat_type_code"]
+        scope = {"mgrp_code": group_code}
+    else:
+        items = items.filter(mat_type_code=mat_type_code)
+        vector_fields = [("short_name", "A"), ("search_text", "B")]
+        trigram_fields = ["short_name", "search_text"]
+        scope = {"mgrp_code": group_code, "mat_type_code": mat_type_code}
+
+    items = apply_attribute_filters(items, params)
+    limit, offset = parse_pagination(
+        params, search_settings()["DEFAULT_LIMIT"] if query else None
+    )
+    return {
+        "items": items, "query": query, "limit": limit, "offset": offset,
+        "vector_fields": vector_fields, "trigram_fields": trigram_fields, "scope": scope,
+    }
 
-    if query:
-        search_vector = (
-            SearchVector("short_name", weight="A") +
-            SearchVector("search_text", weight="B")
-        )
-        search_query = SearchQuery(query)
 
-        bm25_qs = (
-            items.annotate(search=search_vector)
-            .annotate(rank=SearchRank(search_vector, search_query))
-            .filter(rank__gte=0.1)
-        )
+def unranked_page(items, limit, offset):
+    if limit is not None or offset:
+        items = items.order_by("local_item_id")  # stable pages
+    return paginate(items, limit, offset)
 
-        trigram_qs = (
-            items.annotate(
-                trigram_score=(
-                    TrigramSimilarity("short_name", query) +
-                    TrigramSimilarity("search_text", query)
-                )
-            ).filter(trigram_score__gte=0.2)
-        )
 
-        items = (bm25_qs | trigram_qs).annotate(
-            rank=SearchRank(search_vector, search_query),
-            trigram_score=(
-                TrigramSimilarity("short_name", query) +
-                TrigramSimilarity("search_text", query)
-            )
-        ).order_by("-rank", "-trigram_score").distinct()
+def _ranked_items_response(items, query, limit, offset, vector_fields, trigram_fields, scope):
+    """Serialize one page of items, hybrid-ranked when a text query is given."""
+    if not query:
+        serializer = ItemMasterSerializer(unranked_page(items, limit, offset), many=True)
+        return Response(serializer.data)
+
+    page = get_search_backend().rank_items(
+        items, query, vector_fields, trigram_fields, limit, offset, scope=scope
+    )
 
-    serializer = ItemMasterSerializer(items, many=True)
-    return Response(serializer.data)
+    serializer = ItemMasterSerializer(page, many=True)
+    return flag_degraded(Response(serializer.data), page)
 
 
 # ==============================================================
 # 🔹 6. SAP IDs by Material Group
 # ==============================================================
 @api_view(["GET"])
+@cached_result
 def sap_ids_by_matgroup(request, group_code):
     """
     Get all SAP IDs and related info for a selected material group.
+    Served from the in-memory catalog snapshot.
     """
-    try:
-        group = MatGroup.objects.get(mgrp_code=group_code, is_deleted=False)
-    except MatGroup.DoesNotExist:
-        return Response({"message": f"No MatGroup found for '{group_code}'"}, status=404)
+    data, code = sap_ids_payload(get_catalog_snapshot(), group_code)
+    return Response(data, status=code)
 
-    items = ItemMaster.objects.filter(
-        mgrp_code=group,
-        is_deleted=False,
-        is_final=True
-    )
 
-    if not items.exists():
-        return Response({"message": f"No items found for material group '{group_code}'"}, status=404)
+def sap_ids_payload(snapshot, group_code):
+    group = snapshot.groups.get(group_code)
+    if group is None or group.is_deleted:
+        return {"message": f"No MatGroup found for '{group_code}'"}, 404
+
+    items = snapshot.items_by_group.get(group.mgrp_code, ())
+
+    if not items:
+        return {"message": f"No items found for material group '{group_code}'"}, 404
 
     response_data = [
         {
             "sap_id": item.sap_item_id,
             "item_desc": item.short_name,  # Map to old field name for frontend compatibility
             "short_name": item.short_name,
-            "mat_type_code": getattr(item.mat_type_code, "mat_type_code", None),
-            "mat_type_desc": getattr(item.mat_type_code, "mat_type_desc", None),
+            "mat_type_code": getattr(snapshot.mat_types.get(item.mat_type_code), "mat_type_code", None),
+            "mat_type_desc": getattr(snapshot.mat_types.get(item.mat_type_code), "mat_type_desc", None),
             "mgrp_code": group.mgrp_code,
             "mgrp_shortname": group.mgrp_shortname,
             "mgrp_longname": group.mgrp_longname,
@@ -407,7 +424,7 @@ def sap_ids_by_matgroup(request, group_code):
         for item in items
     ]
 
-    return Response(response_data)
+    return response_data, 200
     
 
 # ==============================================================
@@ -449,25 +466,10 @@ def item_details_with_attributes(request, item_id):
         # Add material type info
         item_data['mat_type_desc'] = item.mat_type_code.mat_type_desc if item.mat_type_code else None
 
-        # Get all attributes for the material group
+        # Get all attributes for the material group (cached, ordered by print priority)
         attributes_data = []
-        if item.mgrp_code:
-            matg_attributes = MatgAttributeItem.objects.filter(
-                mgrp_code=item.mgrp_code,
-                is_deleted=False
-            )
-            
-            # Format attributes based on new model structure
-            for attr_item in matg_attributes:
-                attributes_data.append({
-                    "attrib_name": attr_item.attribute_name,
-                    "attrib_printname": attr_item.attribute_name,
-                    "attrib_tagname": attr_item.attribute_name.lower().replace(" ", "_"),
-                    "attrib_printpriority": attr_item.print_priority or 0,
-                    "values": attr_item.possible_values or [],
-                    "validation": attr_item.validation,
-                    "unit": attr_item.uom,
-                })
+        if item.mgrp_code_id:
+            attributes_data = get_attribute_schema(item.mgrp_code_id).as_list()
 
         response_data = {
             "item": item_data,
@@ -476,4 +478,271 @@ def item_details_with_attributes(request, item_id):
 
         return Response(response_data)
     except Exception as e:
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ==============================================================
+# 🔹 7b. Batch Item Details (local or SAP ids)
+# ==============================================================
+# Upper bound on ids per batch request
+MAX_BATCH_ITEM_IDS = 300
+
+
+@rate_limit("search")
+@api_view(["POST"])
+def batch_item_details(request):
+    """
+    Item details + attribute schema for many items in one request.
+    Body: {"ids": [<local_item_id or sap_item_id>, ...]}
+    Each id is matched on local_item_id first, then sap_item_id (as in
+    items/<id>/details/). Items are read in one query and each group's
+    attribute schema is included once under "attributes".
+    """
+    ids = request.data.get("ids")
+    if not isinstance(ids, list) or not ids:
+        return Response({"error": "ids must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > MAX_BATCH_ITEM_IDS:
+        return Response(
+            {"error": f"At most {MAX_BATCH_ITEM_IDS} ids per request"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    requested, invalid = [], []
+    for raw in ids:
+        try:
+            requested.append(int(raw))
+        except (TypeError, ValueError):
+            invalid.append(raw)
+    unique_ids = set(requested)
+
+    items = ItemMaster.objects.filter(
+        Q(local_item_id__in=unique_ids) | Q(sap_item_id__in=unique_ids),
+        is_deleted=False,
+        is_final=True
+    ).select_related("mgrp_code", "mat_type_code")
+
+    by_local, by_sap = {}, {}
+    for item in items:
+        by_local[item.local_item_id] = item
+        if item.sap_item_id is not None:
+            by_sap.setdefault(item.sap_item_id, item)
+
+    results, not_found, schemas = [], [], {}
+    for item_id in dict.fromkeys(requested):  # keep request order, drop repeats
+        item = by_local.get(item_id) or by_sap.get(item_id)
+        if item is None:
+            not_found.append(item_id)
+            continue
+
+        item_data = ItemMasterSerializer(item).data
+        item_data['mgrp_shortname'] = item.mgrp_code.mgrp_shortname if item.mgrp_code else None
+        item_data['mgrp_longname'] = item.mgrp_code.mgrp_longname if item.mgrp_code else None
+        item_data['mat_type_desc'] = item.mat_type_code.mat_type_desc if item.mat_type_code else None
+        results.append({
+            "id": item_id,
+            "matched_on": "local_item_id" if item.local_item_id == item_id else "sap_item_id",
+            "item": item_data,
+        })
+
+        # One schema per distinct group
+        if item.mgrp_code_id and item.mgrp_code_id not in schemas:
+            schemas[item.mgrp_code_id] = get_attribute_schema(item.mgrp_code_id).as_list()
+
+    return Response({
+        "items": results,
+        "attributes": schemas,
+        "not_found": not_found,
+        "invalid": invalid,
+    })
+
+
+# ==============================================================
+# 🔹 8. Attribute Facet Counts by Material Group
+# ==============================================================
+@api_view(["GET"])
+def attribute_facets_by_group(request, group_code):
+    """
+    Per-attribute value counts for the final items of a group, for filter sidebars.
+    Accepts the same ?mat_type_code= and ?attr.<name>=... filters as the item APIs.
+    """
+    if not MatGroup.objects.filter(mgrp_code=group_code, is_deleted=False).exists():
+        return Response({"message": f"No MatGroup found for '{group_code}'"}, status=404)
+
+    try:
+        facets = get_group_facets(group_code, request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        "mgrp_code": group_code,
+        "facets": facets,
+    })
+
+
+# ==============================================================
+# 🔹 9. Typeahead Autocomplete (in-process prefix index)
+# ==============================================================
+@api_view(["GET"])
+def autocomplete_suggestions(request):
+    """
+    Prefix suggestions over group codes/names, item short names and SAP ids,
+    most popular first. ?q=<prefix>&limit=<n>
+    """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return Response([])
+
+    try:
+        limit = int(request.GET.get("limit") or autocomplete_settings()["DEFAULT_LIMIT"])
+    except ValueError:
+        return Response({"error": "'limit' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(autocomplete(query, max(limit, 1)))
+
+
+# ==============================================================
+# 🔹 10. Similar Items (TF-IDF character n-grams)
+# ==============================================================
+@rate_limit("search")
+@api_view(["POST"])
+def similar_items(request):
+    """
+    Items in a material group most similar to a draft item, for reviewing
+    near-matches before creating it. Takes the create_itemmaster payload:
+    {"mgrp_code", "short_name"/"item_desc", "long_name"/"notes", "attributes"}
+    plus optional "k", "min_score" and "exclude" (local_item_ids).
+    """
+    data = request.data
+    mgrp_code = data.get("mgrp_code")
+    if not mgrp_code:
+        return Response({"error": "mgrp_code is required"}, status=status.HTTP_400_BAD_REQUEST)
+    if not MatGroup.objects.filter(mgrp_code=mgrp_code, is_deleted=False).exists():
+        return Response({"error": f"MatGroup {mgrp_code} not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    attributes = data.get("attributes") or {}
+    if not isinstance(attributes, dict):
+        return Response({"error": "attributes must be an object"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        k = int(data.get("k") or similarity_settings()["DEFAULT_K"])
+        min_score = data.get("min_score")
+        min_score = float(min_score) if min_score is not None else None
+        exclude = [int(i) for i in data.get("exclude") or []]
+    except (TypeError, ValueError):
+        return Response({"error": "k, min_score and exclude must be numeric"}, status=status.HTTP_400_BAD_REQUEST)
+    if k < 1:
+        return Response({"error": "k must be at least 1"}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = find_similar_items(
+        mgrp_code,
+        short_name=data.get("short_name") or data.get("item_desc") or "",
+        long_name=data.get("long_name") or data.get("notes") or "",
+        attributes=attributes,
+        k=k,
+        min_score=min_score,
+        exclude=exclude,
+    )
+    return Response({"mgrp_code": mgrp_code, "results": results})
+
+
+# ==============================================================
+# 🔹 11. Near-Duplicate Report (find_near_duplicates runs)
+# ==============================================================
+@authenticate
+@restrict(roles=["Admin", "SuperAdmin"])
+@api_view(["GET"])
+@authentication_classes([])  # the JWT is checked by @authenticate
+def near_duplicate_report(request):
+    """
+    Download the clusters found by the find_near_duplicates command as .xlsx.
+    Uses the latest finished run unless ?run=<id> is given.
+    """
+    runs = NearDuplicateRun.objects.filter(finished__isnull=False)
+    run_id = request.GET.get("run")
+    if run_id:
+        if not run_id.isdigit():
+            return Response({"error": "run must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        run = runs.filter(pk=int(run_id)).first()
+    else:
+        run = runs.first()
+    if run is None:
+        return Response({"error": "No near-duplicate report found"}, status=status.HTTP_404_NOT_FOUND)
+
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    filename = f"Near_Duplicates_run_{run.pk}_{run.created:%Y%m%d}.xlsx"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    write_report(run, response)
+    return response
+
+
+# ==============================================================
+# 🔹 12. SAP ID Prefix Search
+# ==============================================================
+@api_view(["GET"])
+def sap_id_search(request):
+    """
+    Final items whose SAP id starts with the typed digits, for typeahead.
+    ?q=<digits>&limit=<n>
+    """
+    prefix = request.GET.get("q", "").strip()
+    if not prefix:
+        return Response([])
+    if not prefix.isdigit():
+        return Response({"error": "'q' must contain digits only"}, status=status.HTTP_400_BAD_REQUEST)
+
+    conf = autocomplete_settings()
+    try:
+        limit = int(request.GET.get("limit") or conf["DEFAULT_LIMIT"])
+    except ValueError:
+        return Response({"error": "'limit' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+    items = search_sap_ids(prefix, min(max(limit, 1), conf["MAX_LIMIT"]))
+    return Response([
+        {
+            "sap_id": item["sap_item_id"],
+            "local_item_id": item["local_item_id"],
+            "short_name": item["short_name"],
+            "mgrp_code": item["mgrp_code"],
+        }
+        for item in items
+    ])
+
+
+# ==============================================================
+# 🔹 13. SAP ID Conflict Report
+# ==============================================================
+@authenticate
+@restrict(roles=["Admin", "SuperAdmin"])
+@api_view(["GET"])
+@authentication_classes([])  # the JWT is checked by @authenticate
+def sap_id_conflict_report(request):
+    """SAP ids shared by more than one non-deleted item, with those items."""
+    conflicts = sap_id_conflicts()
+    return Response({"count": len(conflicts), "conflicts": conflicts})
+
+
+# ==============================================================
+# 🔹 14. Search Query Report (SearchQueryLog)
+# ==============================================================
+@authenticate
+@restrict(roles=["Admin", "SuperAdmin"])
+@api_view(["GET"])
+@authentication_classes([])  # the JWT is checked by @authenticate
+def search_query_report_view(request):
+    """
+    Slowest, zero-result and most frequent search queries plus search volume
+    per day (or ?bucket=hour). ?days=<n>&limit=<n>&endpoint=<name>
+    """
+    try:
+        days = int(request.GET.get("days") or 7)
+        limit = int(request.GET.get("limit") or 20)
+    except ValueError:
+        return Response({"error": "'days' and 'limit' must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(search_query_report(
+        days=max(days, 1),
+        limit=min(max(limit, 1), 200),
+        endpoint=request.GET.get("endpoint") or None,
+        bucket=request.GET.get("bucket", "day"),
+    ))
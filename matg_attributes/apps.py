@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MatgAttributesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'matg_attributes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from matg_attributes.usage import reconcile_attribute_usage
+
+
+class Command(BaseCommand):
+    help = "Recount attribute usage per (mgrp_code, attribute_name) from ItemMaster and fix the counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mgrp-code", help="Only reconcile this MatGroup")
+
+    def handle(self, *args, **options):
+        fixed = reconcile_attribute_usage(options["mgrp_code"])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled attribute usage ({fixed} counter(s) corrected)"))
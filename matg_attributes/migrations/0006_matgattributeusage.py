@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-19 04:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matgroups', '0012_matgroup_uom_values'),
+        ('matg_attributes', '0005_matgattributeitem_delete_matgattribute'),
+        ('itemmaster', '0012_itemattributenumber'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatgAttributeUsage',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('attribute_name', models.CharField(max_length=150)),
+                ('item_count', models.IntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('mgrp_code', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attribute_usage', to='matgroups.matgroup')),
+            ],
+            options={
+                'unique_together': {('mgrp_code', 'attribute_name')},
+            },
+        ),
+        # Seed counters from the existing catalog
+        migrations.RunSQL(
+            sql="""
+                INSERT INTO matg_attributes_matgattributeusage (mgrp_code_id, attribute_name, item_count, updated)
+                SELECT i.mgrp_code, k.name, COUNT(*), NOW()
+                FROM itemmaster_itemmaster AS i
+                CROSS JOIN LATERAL jsonb_object_keys(
+                    CASE WHEN jsonb_typeof(i.attributes) = 'object' THEN i.attributes ELSE '{}'::jsonb END
+                ) AS k(name)
+                WHERE i.is_deleted = false
+                GROUP BY i.mgrp_code, k.name
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -50,3 +50,26 @@ class MatgAttributeItem(models.Model):
 
     def __str__(self):
         return f"{self.attribute_name} (@{self.mgrp_code_id})"
+
+
+class MatgAttributeUsage(models.Model):
+    """
+    Number of non-deleted items of a MatGroup that carry an attribute key.
+    Maintained incrementally from ItemMaster writes (see usage.py) and
+    repairable with the reconcile_attribute_usage command.
+    """
+    id = models.AutoField(primary_key=True)
+    mgrp_code = models.ForeignKey(
+        "matgroups.MatGroup",
+        on_delete=models.CASCADE,
+        related_name="attribute_usage"
+    )
+    attribute_name = models.CharField(max_length=150)
+    item_count = models.IntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("mgrp_code", "attribute_name")
+
+    def __str__(self):
+        return f"{self.attribute_name} (@{self.mgrp_code_id}): {self.item_count}"
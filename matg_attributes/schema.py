@@ -0,0 +1,140 @@
+import threading
+import time
+
+from django.conf import settings
+
+from itemmaster.units import is_numeric_attribute, split_uoms
+from .models import MatgAttributeItem
+
+
+# ============================================================
+# ✅ Compiled attribute schema per MatGroup
+# ============================================================
+class AttributeDefinition:
+    """Read-only, pre-processed view of one MatgAttributeItem row."""
+    __slots__ = (
+        "id", "name", "tag_name", "values", "value_set",
+        "uom", "uoms", "validation", "print_priority", "is_numeric",
+    )
+
+    def __init__(self, attr_item):
+        self.id = attr_item.id
+        self.name = attr_item.attribute_name
+        self.tag_name = attr_item.attribute_name.lower().replace(" ", "_")
+        self.values = tuple(attr_item.possible_values or [])
+        self.value_set = frozenset(str(v) for v in self.values)
+        self.uom = attr_item.uom
+        self.uoms = tuple(split_uoms(attr_item.uom))
+        self.validation = attr_item.validation
+        self.print_priority = attr_item.print_priority or 0
+        self.is_numeric = is_numeric_attribute(attr_item.validation, attr_item.uom)
+
+    def strip_uom(self, value):
+        """Remove a trailing " <uom>" (any of this attribute's UOMs) from a value."""
+        value = str(value).strip()
+        for u in self.uoms:
+            if value.endswith(f" {u}"):
+                return value[:-len(u) - 1].strip()
+        return value
+
+    def as_dict(self):
+        """Shape used by the item details APIs."""
+        return {
+            "attrib_name": self.name,
+            "attrib_printname": self.name,
+            "attrib_tagname": self.tag_name,
+            "attrib_printpriority": self.print_priority,
+            "values": list(self.values),
+            "validation": self.validation,
+            "unit": self.uom,
+        }
+
+
+class AttributeSchema:
+    """All non-deleted attribute definitions of a MatGroup, ordered by print_priority."""
+
+    def __init__(self, mgrp_code, attr_items):
+        self.mgrp_code = mgrp_code
+        definitions = [AttributeDefinition(a) for a in attr_items]
+        # Attributes without a priority (0/None) go last
+        definitions.sort(key=lambda d: (not d.print_priority, d.print_priority, d.name))
+        self.attributes = tuple(definitions)
+        self.by_name = {d.name: d for d in definitions}
+        self.created_at = time.monotonic()
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def __iter__(self):
+        return iter(self.attributes)
+
+    def __len__(self):
+        return len(self.attributes)
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def strip_uom(self, name, value):
+        definition = self.by_name.get(name)
+        return definition.strip_uom(value) if definition else str(value).strip()
+
+    def normalized(self, attributes):
+        """Attribute dict with UOM suffixes removed and empty values dropped."""
+        return {
+            key: self.strip_uom(key, value)
+            for key, value in (attributes or {}).items()
+            if value
+        }
+
+    def numeric_attributes(self):
+        """{attribute_name: default_uom} for numeric attributes."""
+        return {
+            d.name: (d.uoms[0] if d.uoms else "")
+            for d in self.attributes if d.is_numeric
+        }
+
+    def as_list(self):
+        return [d.as_dict() for d in self.attributes]
+
+
+# ============================================================
+# ✅ Process-level cache (invalidated by signals, see signals.py)
+# ============================================================
+_schemas = {}
+_generation = 0
+_lock = threading.Lock()
+
+
+def _ttl():
+    # Safety net for multi-worker deployments, where a signal only
+    # invalidates the cache of the worker that made the change.
+    return getattr(settings, "ATTRIBUTE_SCHEMA_CACHE_TTL", 300)
+
+
+def get_attribute_schema(mgrp_code):
+    """Return the compiled AttributeSchema for a MatGroup (code or instance)."""
+    mgrp_code = getattr(mgrp_code, "pk", mgrp_code)
+
+    schema = _schemas.get(mgrp_code)
+    if schema is not None and time.monotonic() - schema.created_at < _ttl():
+        return schema
+
+    generation = _generation
+    attr_items = list(MatgAttributeItem.objects.filter(mgrp_code=mgrp_code, is_deleted=False))
+    schema = AttributeSchema(mgrp_code, attr_items)
+    with _lock:
+        # Don't cache a schema read before a concurrent invalidation
+        if generation == _generation:
+            _schemas[mgrp_code] = schema
+    return schema
+
+
+def invalidate_attribute_schema(mgrp_code=None):
+    """Drop the cached schema of one MatGroup, or of all groups."""
+    global _generation
+    with _lock:
+        _generation += 1
+        if mgrp_code is None:
+            _schemas.clear()
+        else:
+            _schemas.pop(getattr(mgrp_code, "pk", mgrp_code), None)
@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from .models import MatgAttributeItem
+from .schema import invalidate_attribute_schema
+from .usage import apply_item_change
+
+
+# ============================================================
+# ✅ Invalidate cached attribute schemas on writes
+# ============================================================
+# After commit: dropped earlier, a concurrent request could re-cache the
+# old rows before the write is visible. These callbacks are registered
+# before itemmaster's (INSTALLED_APPS order), so its ItemAttributeNumber
+# rebuilds read the new schema.
+@receiver(post_save, sender=MatgAttributeItem)
+@receiver(post_delete, sender=MatgAttributeItem)
+def matgattribute_changed(sender, instance, **kwargs):
+    mgrp_code = instance.mgrp_code_id
+    transaction.on_commit(lambda: invalidate_attribute_schema(mgrp_code))
+
+
+@receiver(post_save, sender=MatGroup)
+@receiver(post_delete, sender=MatGroup)
+def matgroup_changed(sender, instance, **kwargs):
+    mgrp_code = instance.pk
+    transaction.on_commit(lambda: invalidate_attribute_schema(mgrp_code))
+
+
+# ============================================================
+# ✅ Maintain attribute usage counters from ItemMaster writes
+# ============================================================
+def _item_state(item):
+    return {
+        "mgrp_code": item.mgrp_code_id,
+        "attributes": item.attributes,
+        "is_deleted": item.is_deleted,
+    }
+
+
+@receiver(post_save, sender=ItemMaster)
+def itemmaster_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    # _previous_state is captured by itemmaster.signals (pre_save)
+    previous = None if created else getattr(instance, "_previous_state", None)
+    apply_item_change(previous, _item_state(instance))
+
+
+@receiver(post_delete, sender=ItemMaster)
+def itemmaster_deleted(sender, instance, **kwargs):
+    apply_item_change(_item_state(instance), None)
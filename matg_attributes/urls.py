@@ -10,4 +10,7 @@ urlpatterns = [
 
     # Delete a single attribute row
     path('delete/<int:item_id>/', views.delete_matgattribute, name='delete_matgattribute'),
+
+    # Attributes not used by any item of their group
+    path('unused/', views.unused_matgattributes, name='unused_matgattributes'),
 ]
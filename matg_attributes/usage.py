@@ -0,0 +1,112 @@
+from django.db import connection, IntegrityError, transaction
+from django.db.models import F
+
+from .models import MatgAttributeUsage
+
+
+# ============================================================
+# ✅ Attribute usage counters per (mgrp_code, attribute_name)
+# ============================================================
+def _usage_keys(state):
+    """(mgrp_code, attribute_name) pairs an item state contributes to."""
+    if not state or state.get("is_deleted") or not state.get("mgrp_code"):
+        return set()
+    attributes = state.get("attributes")
+    if not isinstance(attributes, dict):
+        return set()
+    return {(state["mgrp_code"], name) for name in attributes}
+
+
+def _bump(mgrp_code, attribute_name, delta):
+    updated = MatgAttributeUsage.objects.filter(
+        mgrp_code_id=mgrp_code, attribute_name=attribute_name
+    ).update(item_count=F("item_count") + delta)
+    if updated or delta < 0:
+        return
+
+    try:
+        with transaction.atomic():
+            MatgAttributeUsage.objects.create(
+                mgrp_code_id=mgrp_code, attribute_name=attribute_name, item_count=delta
+            )
+    except IntegrityError:
+        # Created concurrently - fall back to the increment
+        MatgAttributeUsage.objects.filter(
+            mgrp_code_id=mgrp_code, attribute_name=attribute_name
+        ).update(item_count=F("item_count") + delta)
+
+
+def apply_item_change(previous, current):
+    """
+    Adjust counters for one item going from ``previous`` to ``current``.
+    Each state is a dict with mgrp_code, attributes and is_deleted (or None).
+    """
+    before = _usage_keys(previous)
+    after = _usage_keys(current)
+    for mgrp_code, name in after - before:
+        _bump(mgrp_code, name, 1)
+    for mgrp_code, name in before - after:
+        _bump(mgrp_code, name, -1)
+
+
+def attribute_usage_count(mgrp_code, attribute_name):
+    """Number of non-deleted items in the group that use the attribute."""
+    return (
+        MatgAttributeUsage.objects.filter(mgrp_code_id=mgrp_code, attribute_name=attribute_name)
+        .values_list("item_count", flat=True)
+        .first()
+    ) or 0
+
+
+# ============================================================
+# ✅ Reconcile counters with ItemMaster (full recount)
+# ============================================================
+RECOUNT_SQL = """
+    SELECT i.mgrp_code, k.name, COUNT(*)
+    FROM itemmaster_itemmaster AS i
+    CROSS JOIN LATERAL jsonb_object_keys(
+        CASE WHEN jsonb_typeof(i.attributes) = 'object' THEN i.attributes ELSE '{{}}'::jsonb END
+    ) AS k(name)
+    WHERE i.is_deleted = false {group_filter}
+    GROUP BY i.mgrp_code, k.name
+"""
+
+
+def reconcile_attribute_usage(mgrp_code=None):
+    """
+    Recount usage from ItemMaster and rewrite the counters.
+    Returns the number of (group, attribute) counters that were wrong.
+    """
+    params = []
+    group_filter = ""
+    if mgrp_code:
+        group_filter = "AND i.mgrp_code = %s"
+        params.append(mgrp_code)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(RECOUNT_SQL.format(group_filter=group_filter), params)
+            actual = {(g, name): count for g, name, count in cursor.fetchall()}
+
+        existing = MatgAttributeUsage.objects.select_for_update()
+        if mgrp_code:
+            existing = existing.filter(mgrp_code_id=mgrp_code)
+        stored = {(u.mgrp_code_id, u.attribute_name): u for u in existing}
+
+        fixed = 0
+        for key, usage in stored.items():
+            count = actual.get(key, 0)
+            if usage.item_count != count:
+                usage.item_count = count
+                usage.save(update_fields=["item_count", "updated"])
+                fixed += 1
+
+        missing = [
+            MatgAttributeUsage(mgrp_code_id=g, attribute_name=name, item_count=count)
+            for (g, name), count in actual.items()
+            if (g, name) not in stored
+        ]
+        MatgAttributeUsage.objects.bulk_create(missing)
+        fixed += len(missing)
+
+    return fixed
@@ -2,13 +2,15 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.utils import timezone
+from django.db.models import Exists, OuterRef
 import json
 
-from .models import MatgAttributeItem
+from .models import MatgAttributeItem, MatgAttributeUsage
+from .usage import attribute_usage_count
 from matgroups.models import MatGroup
 from Employee.models import Employee
-from itemmaster.models import ItemMaster
 from Common.Middleware import authenticate, restrict
+from Common.RateLimit import rate_limit
 
 
 # Helper function to get employee name
@@ -21,6 +23,7 @@ def get_employee_name(emp):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "MDGT"])
 def create_matgattribute(request):
     if request.method != "POST":
@@ -139,6 +142,7 @@ def list_matgattributes(request):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "MDGT"])
 def update_matgattribute(request, item_id):
     if request.method != "PUT":
@@ -154,7 +158,13 @@ def update_matgattribute(request, item_id):
         employee = Employee.objects.filter(emp_id=request.user.get("emp_id")).first()
 
         # Update fields
-        if "attribute_name" in data:
+        if "attribute_name" in data and data["attribute_name"] != item.attribute_name:
+            # Block renaming if items still store values under the old name
+            used_count = attribute_usage_count(item.mgrp_code_id, item.attribute_name)
+            if used_count > 0:
+                return JsonResponse({
+                    "error": f"Cannot rename '{item.attribute_name}'. It is assigned to {used_count} item(s). Remove it from all items before renaming."
+                }, status=400)
             item.attribute_name = data["attribute_name"]
 
         if "possible_values" in data:
@@ -198,6 +208,7 @@ def update_matgattribute(request, item_id):
 # ============================================================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "MDGT"])
 def delete_matgattribute(request, item_id):
     if request.method != "DELETE":
@@ -207,13 +218,9 @@ def delete_matgattribute(request, item_id):
     if not item:
         return JsonResponse({"error": "Attribute item not found"}, status=404)
 
-    # Block deletion if this attribute is used by any items
-    print(f"[DELETE CHECK] Checking attribute: '{item.attribute_name}', mgrp: {item.mgrp_code}")
-    used_count = ItemMaster.objects.filter(
-        is_deleted=False,
-        attributes__has_key=item.attribute_name
-    ).count()
-    print(f"[DELETE CHECK] Items using this attribute: {used_count}")
+    # Block deletion if this attribute is used by any items of its group
+    used_count = attribute_usage_count(item.mgrp_code_id, item.attribute_name)
+    print(f"[DELETE CHECK] '{item.attribute_name}' (mgrp: {item.mgrp_code_id}) used by {used_count} item(s)")
     if used_count > 0:
         return JsonResponse({
             "error": f"Cannot delete '{item.attribute_name}'. It is assigned to {used_count} item(s). Remove it from all items before deleting."
@@ -223,3 +230,39 @@ def delete_matgattribute(request, item_id):
     item.save()
 
     return JsonResponse({"message": "Attribute deleted successfully"}, status=200)
+
+
+
+# ============================================================
+# ✅ UNUSED ATTRIBUTES REPORT
+# ============================================================
+@authenticate
+# @restrict(roles=["Admin", "SuperAdmin", "MDGT"])
+def unused_matgattributes(request):
+    if request.method != "GET":
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+
+    # Attributes with no usage counter (or a zero one) aren't used by any item
+    used = MatgAttributeUsage.objects.filter(
+        mgrp_code=OuterRef("mgrp_code"),
+        attribute_name=OuterRef("attribute_name"),
+        item_count__gt=0
+    )
+    items = MatgAttributeItem.objects.filter(is_deleted=False).exclude(Exists(used))
+
+    mgrp_code = request.GET.get("mgrp_code")
+    if mgrp_code:
+        items = items.filter(mgrp_code=mgrp_code)
+
+    data = [
+        {
+            "id": item.id,
+            "mgrp_code": item.mgrp_code_id,
+            "attribute_name": item.attribute_name,
+            "print_priority": item.print_priority,
+            "updated": item.updated.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        for item in items.order_by("mgrp_code", "attribute_name")
+    ]
+
+    return JsonResponse(data, safe=False)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matgroups', '0012_matgroup_uom_values'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matgroup',
+            name='popularity',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -24,6 +24,8 @@ class MatGroup(models.Model):
 
     uom_values = models.JSONField(default=list, blank=True, help_text="List of Unit of Measure values for this group")
     notes = models.CharField(max_length=250, blank=True)
+    # Item popularity + requests against the group (material_api.popularity)
+    popularity = models.IntegerField(default=0, db_index=True)
 
     created = models.DateTimeField(default=timezone.now)
     createdby = models.ForeignKey(Employee, related_name="matgroup_created",
@@ -7,6 +7,7 @@ from .models import MatGroup
 from supergroups.models import SuperGroup
 from Employee.models import Employee
 from Common.Middleware import authenticate, restrict
+from Common.RateLimit import rate_limit
 
 
 # ✅ Helper to get employee name
@@ -17,6 +18,7 @@ def get_employee_name(emp):
 # ✅ CREATE MatGroup
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin","MDGT"])
 def create_matgroup(request):
     if request.method == "POST":
@@ -120,6 +122,7 @@ def list_matgroups(request):
 # ✅ UPDATE MatGroup
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin","MDGT"])
 def update_matgroup(request, mgrp_code):
     if request.method == "PUT":
@@ -187,6 +190,7 @@ def update_matgroup(request, mgrp_code):
 # ✅ HARD DELETE MatGroup
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin","MDGT"])
 def delete_matgroup(request, mgrp_code):
     if request.method == "DELETE":
@@ -0,0 +1,85 @@
+from django.http import JsonResponse
+
+from Employee.models import Employee
+from Common.Middleware import authenticate
+from .views import (
+    _list_requests_queryset, _unread_requests_queryset, _fallback_sender_names,
+    _senders_query, _is_unread, _request_rows,
+)
+
+
+# ===========================
+# Async versions of the hot read views (same responses as views.py),
+# using Django's async ORM so they don't hold a thread under daphne.
+# ===========================
+async def _senders_by_name(names):
+    senders = {}
+    if names:
+        async for emp in _senders_query(names):
+            senders.setdefault(emp.emp_name, emp)
+    return senders
+
+
+# ===========================
+# LIST Requests
+# ===========================
+@authenticate
+# @restrict(roles=["Admin", "SuperAdmin", "Employee", "MDGT"])
+async def list_requests(request):
+    if request.method == "GET":
+        try:
+            requests_qs = _list_requests_queryset()
+            emp_id = request.user.get("emp_id")
+            current_employee = await Employee.objects.filter(emp_id=emp_id).select_related("role").afirst()
+
+            # Employees see only their own requests; MDGT/Admin/SuperAdmin see all
+            user_role = request.user.get("role") if isinstance(
+                request.user, dict) else None
+            if user_role == "Employee" and current_employee:
+                requests_qs = requests_qs.filter(createdby=current_employee)
+            if not user_role and current_employee and current_employee.role:
+                user_role = current_employee.role.role_name
+
+            reqs = [r async for r in requests_qs]
+            senders_by_name = await _senders_by_name(_fallback_sender_names(
+                r for r in reqs if r.isread == False and r.tobeshown))
+            response_data = _request_rows(reqs, senders_by_name, current_employee, user_role)
+            return JsonResponse(response_data, safe=False, status=200)
+        except Exception as e:
+            print(e)
+            return JsonResponse({"error": str(e)}, status=500)
+
+    return JsonResponse({"error": "Invalid request method"}, status=405)
+
+
+# ===========================
+# Unread count
+# ===========================
+@authenticate
+# @restrict(roles=["Admin", "SuperAdmin", "MDGT", "Employee"])
+async def get_unread_count(request):
+    if request.method == "GET":
+        try:
+            emp_id = request.user.get("emp_id")
+            employee = await Employee.objects.filter(emp_id=emp_id).select_related("role").afirst()
+            if not employee:
+                return JsonResponse({"error": "Employee not found"}, status=404)
+
+            user_role = request.user.get("role") if isinstance(
+                request.user, dict) else None
+            if not user_role and employee.role:
+                user_role = employee.role.role_name
+
+            # Get all requests with unread messages
+            reqs = [req async for req in _unread_requests_queryset()]
+            senders_by_name = await _senders_by_name(_fallback_sender_names(reqs))
+            unread_count = sum(
+                1 for req in reqs if _is_unread(req, senders_by_name, employee, user_role))
+
+            return JsonResponse({"unread_count": unread_count}, status=200)
+
+        except Exception as e:
+            print(f"Error in get_unread_count: {e}")
+            return JsonResponse({"error": str(e)}, status=500)
+
+    return JsonResponse({"error": "Invalid request method"}, status=405)
@@ -1,3 +1,101 @@
-from django.test import TestCase
+import contextlib
+import io
+from datetime import datetime, timedelta, timezone
 
-# Create your tests here.
+import jwt
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from Employee.models import Employee
+from Users.models import UserRole
+from . import async_views, views
+from .models import Request
+
+
+class SyncAsyncURLConf:
+    urlpatterns = [
+        path(f"{mode}/{route}", getattr(module, name))
+        for route, name in [("list/", "list_requests"), ("unread-count/", "get_unread_count")]
+        for mode, module in (("sync", views), ("async", async_views))
+    ]
+
+
+def bearer(emp_id, role=None):
+    token = jwt.encode(
+        {"emp_id": emp_id, "role": role, "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+        settings.SECRET_KEY, algorithm="HS256",
+    )
+    return f"Bearer {token}"
+
+
+# ============================================================
+# ✅ Async list / unread count answer like the sync views
+# ============================================================
+@override_settings(ROOT_URLCONF=SyncAsyncURLConf)
+class AsyncRequestViewsTests(TestCase):
+    def setUp(self):
+        mdgt = UserRole.objects.create(role_name="MDGT")
+        employee = UserRole.objects.create(role_name="Employee")
+        self.reviewer = Employee.objects.create(emp_name="Test Reviewer", email="reviewer@example.test", role=mdgt)
+        self.author = Employee.objects.create(emp_name="Test Author", email="author@example.test", role=employee)
+        self.other = Employee.objects.create(emp_name="Test Other", email="other@example.test", role=employee)
+
+        shown = datetime.now(timezone.utc)
+        for createdby, message, isread, is_deleted in [
+            # Role stored on the message / looked up by the sender's name
+            (self.author, {"sender": "Test Reviewer", "sender_role": "MDGT", "sender_emp_id": self.reviewer.emp_id},
+             False, False),
+            (self.author, {"sender": "Test Reviewer"}, False, False),
+            (self.other, {"sender": "Test Other"}, False, False),
+            (self.other, {"sender": "Test Reviewer"}, True, False),
+            (self.author, {"sender": "Test Reviewer"}, False, True),
+        ]:
+            Request.objects.create(
+                createdby=createdby, request_data={"chat": [{"sender": "Test Author"}, message]},
+                notes="async test", isread=isread, tobeshown=shown, is_deleted=is_deleted,
+            )
+
+    def assertSameResponse(self, route, authorization=None, method="get"):
+        headers = {"Authorization": authorization} if authorization else {}
+
+        @async_to_sync
+        async def request():
+            return await getattr(self.async_client, method)(f"/async/{route}", headers=headers)
+
+        # The authenticate decorator prints every user it lets through
+        with contextlib.redirect_stdout(io.StringIO()):
+            sync = getattr(self.client, method)(f"/sync/{route}", headers=headers)
+            response = request()
+        self.assertEqual((response.status_code, response.json()), (sync.status_code, sync.json()))
+        return response.json()
+
+    def test_list_requests(self):
+        for emp_id, role in [
+            (self.reviewer.emp_id, "MDGT"),
+            (self.author.emp_id, "Employee"),
+            (self.other.emp_id, None),  # role read from the employee
+            (0, "Admin"),
+        ]:
+            with self.subTest(emp_id=emp_id, role=role):
+                self.assertSameResponse("list/", bearer(emp_id, role))
+
+        rows = self.assertSameResponse("list/", bearer(self.author.emp_id, "Employee"))
+        self.assertEqual([row["is_unread"] for row in rows if row["notes"] == "async test"], [True, True])
+
+    def test_get_unread_count(self):
+        for emp_id, role in [
+            (self.reviewer.emp_id, "MDGT"),
+            (self.author.emp_id, "Employee"),
+            (self.author.emp_id, None),
+            (0, "Admin"),
+        ]:
+            with self.subTest(emp_id=emp_id, role=role):
+                self.assertSameResponse("unread-count/", bearer(emp_id, role))
+
+    def test_errors(self):
+        self.assertSameResponse("list/")
+        self.assertSameResponse("unread-count/", "Bearer invalid")
+        self.assertSameResponse("list/", bearer(self.author.emp_id), method="post")
+        self.assertSameResponse("unread-count/", bearer(self.author.emp_id), method="post")
@@ -1,16 +1,16 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path("create/", views.create_request, name="create_request"),
-    path("list/", views.list_requests, name="list_requests"),
+    path("list/", async_views.list_requests, name="list_requests"),
     path("update/<int:request_id>/", views.update_request, name="update_request"),
     path("delete/<int:request_id>/", views.delete_request, name="delete_request"),
     path("assign-sap/<int:request_id>/", views.assign_sap_item, name="assign_sap_item"),  # ✅ New
     path("assign-material-group/<int:request_id>/", views.assign_material_group, name="assign_material_group"),  # ✅ New
     path("chat/<int:request_id>/", views.list_chat_messages, name="list_chat_messages"),
     path("chat/add/<int:request_id>/", views.add_chat_message, name="add_chat_message"),
-    path("unread-count/", views.get_unread_count, name="get_unread_count"),
+    path("unread-count/", async_views.get_unread_count, name="get_unread_count"),
     path("mark-read/<int:request_id>/", views.mark_request_read, name="mark_request_read"),
 ]
 
@@ -7,6 +7,7 @@ from .models import Request
 from Employee.models import Employee
 from itemmaster.models import ItemMaster
 from Common.Middleware import authenticate, restrict
+from Common.RateLimit import rate_limit
 # ✅ Get Project object
 from projects.models import Project
 from matgroups.models import MatGroup
@@ -25,6 +26,7 @@ def get_employee_name(emp):
 # ===========================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "Employee", "MDGT"])
 def create_request(request):
     if request.method == "POST":
@@ -82,6 +84,125 @@ def create_request(request):
     return JsonResponse({"error": "Invalid request method"}, status=405)
 
 
+# ===========================
+# Unread-message helpers (shared with requests.async_views)
+# ===========================
+MDGT_ROLES = ("MDGT", "Admin", "SuperAdmin")
+
+
+def _last_chat_message(req):
+    chat_messages = req.request_data.get("chat", []) if req.request_data else []
+    return chat_messages[-1] if chat_messages else None
+
+
+def _fallback_sender_names(reqs):
+    """Sender names of last chat messages that don't carry sender_role."""
+    names = set()
+    for req in reqs:
+        message = _last_chat_message(req)
+        if message and not message.get("sender_role"):
+            names.add(message.get("sender", ""))
+    return names
+
+
+def _senders_query(names):
+    # Same employee as Employee.objects.filter(emp_name=...).first() per name
+    return Employee.objects.filter(
+        emp_name__in=names, is_deleted=False).select_related("role").order_by("emp_id")
+
+
+def _senders_by_name(names):
+    senders = {}
+    if names:
+        for emp in _senders_query(names):
+            senders.setdefault(emp.emp_name, emp)
+    return senders
+
+
+def _last_sender(message, senders_by_name):
+    """(role, emp_id) of the message sender, looked up by name if role isn't stored."""
+    last_sender_role = message.get("sender_role")
+    last_sender_emp_id = message.get("sender_emp_id")
+
+    # Fallback: find by name if role not stored in message
+    if not last_sender_role:
+        last_sender_emp = senders_by_name.get(message.get("sender", ""))
+        if last_sender_emp and last_sender_emp.role:
+            last_sender_role = last_sender_emp.role.role_name
+            last_sender_emp_id = last_sender_emp.emp_id
+    return last_sender_role, last_sender_emp_id
+
+
+def _is_unread(req, senders_by_name, employee, user_role):
+    """Whether the last chat message of ``req`` is unread for ``employee``."""
+    message = _last_chat_message(req)
+    if not message:
+        return False
+
+    last_sender_role, last_sender_emp_id = _last_sender(message, senders_by_name)
+    if not last_sender_role or not employee:
+        return False
+
+    if user_role in MDGT_ROLES:
+        # MDGT should see unread if last message was from an Employee (not MDGT/Admin/SuperAdmin)
+        # AND the message is not from themselves
+        return last_sender_role not in MDGT_ROLES and last_sender_emp_id != employee.emp_id
+
+    # Employee should see unread if:
+    # 1. They created the request AND
+    # 2. Last message was from MDGT/Admin/SuperAdmin AND
+    # 3. The message is not from themselves
+    return (req.createdby_id == employee.emp_id and
+            last_sender_role in MDGT_ROLES and
+            last_sender_emp_id != employee.emp_id)
+
+
+def _list_requests_queryset():
+    # Every relation the response reads, so rows need no further queries
+    return Request.objects.filter(is_deleted=False).select_related(
+        "project_code", "sap_item", "material_group", "createdby", "updatedby")
+
+
+def _request_row(r, is_unread):
+    return {
+        "request_id": r.request_id,
+        "request_date": r.request_date.strftime("%Y-%m-%d %H:%M:%S"),
+        "request_status": r.request_status,
+        "project_code": r.project_code.project_code if r.project_code else None,
+        "project_name": r.project_code.project_name if r.project_code else None,
+
+        "user_text": r.request_data,
+
+        "sap_item": r.sap_item.sap_item_id if r.sap_item else None,
+        "material_group": r.material_group.mgrp_code if r.material_group else None,
+        "notes": r.notes,
+        "type": r.type,
+        "closetime": r.closetime.strftime("%Y-%m-%d") if r.closetime else None,
+        "status": r.status,
+        "timetaken": r.timetaken,
+        "created": r.created.strftime("%Y-%m-%d %H:%M:%S"),
+        "updated": r.updated.strftime("%Y-%m-%d %H:%M:%S"),
+        "createdby": get_employee_name(r.createdby),
+        "updatedby": get_employee_name(r.updatedby),
+        "isread": r.isread,
+        "tobeshown": r.tobeshown.strftime("%Y-%m-%d %H:%M:%S") if r.tobeshown else None,
+        "unread_count": 1 if is_unread else 0,
+        "is_unread": is_unread
+    }
+
+
+def _request_rows(reqs, senders_by_name, current_employee, user_role):
+    return [
+        _request_row(r, bool(r.isread == False and r.tobeshown and
+                             _is_unread(r, senders_by_name, current_employee, user_role)))
+        for r in reqs
+    ]
+
+
+def _unread_requests_queryset():
+    return Request.objects.filter(is_deleted=False, isread=False, tobeshown__isnull=False)
+
+
 # ===========================
 # LIST Requests
 # ===========================
@@ -90,7 +211,7 @@ def create_request(request):
 def list_requests(request):
     if request.method == "GET":
         try:
-            requests_qs = Request.objects.filter(is_deleted=False)
+            requests_qs = _list_requests_queryset()
             # Employees see only their own requests; MDGT/Admin/SuperAdmin see all
             try:
                 user_role = request.user.get("role") if isinstance(
@@ -104,80 +225,16 @@ def list_requests(request):
                 pass
             # Get current user info for unread calculation
             emp_id = request.user.get("emp_id")
-            current_employee = Employee.objects.filter(emp_id=emp_id).first()
+            current_employee = Employee.objects.filter(emp_id=emp_id).select_related("role").first()
             user_role = request.user.get("role") if isinstance(
                 request.user, dict) else None
             if not user_role and current_employee and current_employee.role:
                 user_role = current_employee.role.role_name
 
-            response_data = []
-            for r in requests_qs:
-                # Calculate unread count for this request
-                unread_count = 0
-                is_unread = False
-
-                if r.isread == False and r.tobeshown:
-                    # Get the last message from chat
-                    chat_messages = r.request_data.get(
-                        "chat", []) if r.request_data else []
-                    if chat_messages:
-                        last_message = chat_messages[-1]
-                        last_sender_role = last_message.get("sender_role")
-                        last_sender_emp_id = last_message.get("sender_emp_id")
-
-                        # Fallback: find by name if role not stored in message
-                        if not last_sender_role:
-                            last_sender_name = last_message.get("sender", "")
-                            last_sender_emp = Employee.objects.filter(
-                                emp_name=last_sender_name, is_deleted=False).first()
-                            if last_sender_emp and last_sender_emp.role:
-                                last_sender_role = last_sender_emp.role.role_name
-                                last_sender_emp_id = last_sender_emp.emp_id
-
-                        if last_sender_role and current_employee:
-                            # Determine if current user should see this as unread
-                            if user_role == "MDGT" or user_role == "Admin" or user_role == "SuperAdmin":
-                                # MDGT should see unread if last message was from an Employee (not MDGT/Admin/SuperAdmin)
-                                # AND the message is not from themselves
-                                if (last_sender_role != "MDGT" and last_sender_role != "Admin" and last_sender_role != "SuperAdmin") and last_sender_emp_id != current_employee.emp_id:
-                                    is_unread = True
-                                    unread_count = 1
-                            else:
-                                # Employee should see unread if:
-                                # 1. They created the request AND
-                                # 2. Last message was from MDGT/Admin/SuperAdmin AND
-                                # 3. The message is not from themselves
-                                if (r.createdby == current_employee and
-                                    (last_sender_role == "MDGT" or last_sender_role == "Admin" or last_sender_role == "SuperAdmin") and
-                                        last_sender_emp_id != current_employee.emp_id):
-                                    is_unread = True
-                                    unread_count = 1
-
-                response_data.append({
-                    "request_id": r.request_id,
-                    "request_date": r.request_date.strftime("%Y-%m-%d %H:%M:%S"),
-                    "request_status": r.request_status,
-                    "project_code": r.project_code.project_code if r.project_code else None,
-                    "project_name": r.project_code.project_name if r.project_code else None,
-
-                    "user_text": r.request_data,
-
-                    "sap_item": r.sap_item.sap_item_id if r.sap_item else None,
-                    "material_group": r.material_group.mgrp_code if r.material_group else None,
-                    "notes": r.notes,
-                    "type": r.type,
-                    "closetime": r.closetime.strftime("%Y-%m-%d") if r.closetime else None,
-                    "status": r.status,
-                    "timetaken": r.timetaken,
-                    "created": r.created.strftime("%Y-%m-%d %H:%M:%S"),
-                    "updated": r.updated.strftime("%Y-%m-%d %H:%M:%S"),
-                    "createdby": get_employee_name(r.createdby),
-                    "updatedby": get_employee_name(r.updatedby),
-                    "isread": r.isread,
-                    "tobeshown": r.tobeshown.strftime("%Y-%m-%d %H:%M:%S") if r.tobeshown else None,
-                    "unread_count": unread_count,
-                    "is_unread": is_unread
-                })
+            reqs = list(requests_qs)
+            senders_by_name = _senders_by_name(_fallback_sender_names(
+                r for r in reqs if r.isread == False and r.tobeshown))
+            response_data = _request_rows(reqs, senders_by_name, current_employee, user_role)
             return JsonResponse(response_data, safe=False, status=200)
         except Exception as e:
             print(e)
@@ -191,6 +248,7 @@ def list_requests(request):
 # ===========================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "MDGT", "Employee"])
 def update_request(request, request_id):
     if request.method == "PUT":
@@ -237,7 +295,7 @@ def update_request(request, request_id):
             if sap_item_value:
                 try:
                     req_obj.sap_item = ItemMaster.objects.get(
-                        sap_item_id=sap_item_value)
+                        sap_item_id=sap_item_value, is_deleted=False)
                 except ItemMaster.DoesNotExist:
                     return JsonResponse({"error": f"ItemMaster with sap_item_id={sap_item_value} not found"}, status=404)
 
@@ -301,6 +359,7 @@ def update_request(request, request_id):
 # ===========================
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "MDGT"])
 def delete_request(request, request_id):
     if request.method == "DELETE":
@@ -341,7 +400,7 @@ def assign_sap_item(request, request_id):
 
             try:
                 sap_item_obj = ItemMaster.objects.get(
-                    sap_item_id=sap_item_value)
+                    sap_item_id=sap_item_value, is_deleted=False)
             except ItemMaster.DoesNotExist:
                 return JsonResponse({"error": f"ItemMaster with sap_item_id={sap_item_value} not found"}, status=404)
 
@@ -435,6 +494,7 @@ def assign_material_group(request, request_id):
 
 @csrf_exempt
 @authenticate
+@rate_limit("write")
 # @restrict(roles=["Admin", "SuperAdmin", "MDGT", "Employee"])
 def add_chat_message(request, request_id):
     if request.method != "POST":
@@ -546,7 +606,7 @@ def get_unread_count(request):
     if request.method == "GET":
         try:
             emp_id = request.user.get("emp_id")
-            employee = Employee.objects.filter(emp_id=emp_id).first()
+            employee = Employee.objects.filter(emp_id=emp_id).select_related("role").first()
             if not employee:
                 return JsonResponse({"error": "Employee not found"}, status=404)
 
@@ -556,51 +616,10 @@ def get_unread_count(request):
                 user_role = employee.role.role_name
 
             # Get all requests with unread messages
-            requests_qs = Request.objects.filter(
-                is_deleted=False, isread=False, tobeshown__isnull=False)
-
-            unread_count = 0
-
-            for req in requests_qs:
-                # Get the last message from chat
-                chat_messages = req.request_data.get(
-                    "chat", []) if req.request_data else []
-                if not chat_messages:
-                    continue
-
-                last_message = chat_messages[-1]
-
-                # Try to get sender role from message first (more reliable)
-                last_sender_role = last_message.get("sender_role")
-                last_sender_emp_id = last_message.get("sender_emp_id")
-
-                # Fallback: find by name if role not stored in message
-                if not last_sender_role:
-                    last_sender_name = last_message.get("sender", "")
-                    last_sender_emp = Employee.objects.filter(
-                        emp_name=last_sender_name, is_deleted=False).first()
-                    if last_sender_emp and last_sender_emp.role:
-                        last_sender_role = last_sender_emp.role.role_name
-                        last_sender_emp_id = last_sender_emp.emp_id
-
-                if not last_sender_role:
-                    continue
-
-                # Determine if current user should see this as unread
-                if user_role == "MDGT" or user_role == "Admin" or user_role == "SuperAdmin":
-                    # MDGT should see unread if last message was from an Employee (not MDGT/Admin/SuperAdmin)
-                    # AND the message is not from themselves
-                    if (last_sender_role != "MDGT" and last_sender_role != "Admin" and last_sender_role != "SuperAdmin") and last_sender_emp_id != employee.emp_id:
-                        unread_count += 1
-                else:
-                    # Employee should see unread if:
-                    # 1. They created the request AND
-                    # 2. Last message was from MDGT/Admin/SuperAdmin AND
-                    # 3. The message is not from themselves
-                    if (req.createdby == employee and
-                        (last_sender_role == "MDGT" or last_sender_role == "Admin" or last_sender_role == "SuperAdmin") and
-                            last_sender_emp_id != employee.emp_id):
-                        unread_count += 1
+            reqs = list(_unread_requests_queryset())
+            senders_by_name = _senders_by_name(_fallback_sender_names(reqs))
+            unread_count = sum(
+                1 for req in reqs if _is_unread(req, senders_by_name, employee, user_role))
 
             return JsonResponse({"unread_count": unread_count}, status=200)
 
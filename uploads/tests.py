@@ -1,3 +1,39 @@
 from django.test import TestCase
 
-# Create your tests here.
+from itemmaster.models import ItemMaster
+from matgroups.models import MatGroup
+from MaterialType.models import MaterialType
+from .views import handle_itemmaster_phase_1
+
+
+# ============================================================
+# ✅ ItemMaster phase 1 upload
+# ============================================================
+class ItemMasterPhase1Tests(TestCase):
+    def setUp(self):
+        MatGroup.objects.create(mgrp_code="TSTVALVE", mgrp_shortname="Valve", mgrp_longname="Valves")
+        MaterialType.objects.create(mat_type_code="TROH", mat_type_desc="Raw")
+
+    def row(self, short_name, sap_item_id=""):
+        return {"mat_type_code": "TROH", "mgrp_code": "TSTVALVE", "short_name": short_name, "sap_item_id": sap_item_id}
+
+    def test_rows_reusing_a_sap_id_are_skipped(self):
+        handle_itemmaster_phase_1([self.row("Existing", "4000123")], None)
+        response = handle_itemmaster_phase_1([
+            self.row("Taken", "4000123"),
+            self.row("New", "4000124"),
+            self.row("Repeated", "4000124"),
+            self.row("No SAP id"),
+        ], None)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertJSONEqual(response.content, {
+            "message": "ItemMaster Phase 1 upload complete",
+            "inserted": 2,
+            "errors": [
+                {"row": 2, "error": "sap_item_id 4000123 already exists"},
+                {"row": 4, "error": "sap_item_id 4000124 already exists"},
+            ],
+        })
+        names = ItemMaster.objects.filter(mgrp_code="TSTVALVE").values_list("short_name", flat=True)
+        self.assertEqual(sorted(names), ["Existing", "New", "No SAP id"])
@@ -9,6 +9,7 @@ from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from Employee.models import Employee
+from Common.RateLimit import rate_limit
 
 
 # -------------------------------------------------------------------
@@ -82,11 +83,13 @@ def convert_value(field, value):
 # -------------------------------------------------------------------
 def handle_itemmaster_phase_1(data, request):
     from itemmaster.models import ItemMaster
+    from itemmaster.names import format_long_name
     from MaterialType.models import MaterialType
     from matgroups.models import MatGroup
 
     now = timezone.now()
     objs = []
+    rows = []  # sheet row of each obj
     errors = []
 
     for idx, row in enumerate(data):
@@ -142,6 +145,10 @@ def handle_itemmaster_phase_1(data, request):
             mgrp_long_name = get_value(row, ["mgrp_long_name", "Mgrp Long Name", "mgrp long name", "MGRP_LONG_NAME"])
             sap_name = get_value(row, ["sap_name", "Sap Name", "sap name", "SAP_NAME"])
             search_text = get_value(row, ["search_text", "Search Text", "search text", "SEARCH_TEXT"])
+
+            # Names are denormalized from the group; fill them when the sheet leaves them out
+            mgrp_long_name = mgrp_long_name or mgrp_code.mgrp_longname
+            long_name = long_name or format_long_name(mgrp_code.mgrp_code, mgrp_long_name, short_name)
             
             objs.append(ItemMaster(
                 sap_item_id=sap_item_id,
@@ -155,12 +162,45 @@ def handle_itemmaster_phase_1(data, request):
                 created=now,
                 updated=now,
             ))
+            rows.append(idx + 2)
         except Exception as e:
             import traceback
             errors.append({"row": idx + 2, "error": f"{str(e)}"})
 
+    # SAP ids are unique among non-deleted items: skip rows reusing one
+    sap_ids = [obj.sap_item_id for obj in objs if obj.sap_item_id is not None]
+    taken = set(
+        ItemMaster.objects.filter(sap_item_id__in=sap_ids, is_deleted=False)
+        .values_list("sap_item_id", flat=True)
+    ) if sap_ids else set()
+    unique_objs = []
+    for row_number, obj in zip(rows, objs):
+        if obj.sap_item_id is not None:
+            if obj.sap_item_id in taken:
+                errors.append({"row": row_number, "error": f"sap_item_id {obj.sap_item_id} already exists"})
+                continue
+            taken.add(obj.sap_item_id)
+        unique_objs.append(obj)
+    objs = unique_objs
+
     if objs:
         ItemMaster.objects.bulk_create(objs, ignore_conflicts=True)
+        # bulk_create doesn't send signals, so refresh everything derived
+        # from the affected groups' items here
+        from material_api.search_documents import refresh_search_documents
+        from material_api.item_counts import reconcile_item_counts
+        from material_api.result_cache import bump_catalog_version
+        from material_api.snapshot import patch_snapshot_items
+        from material_api.search_backends import get_search_backend
+        from material_api.similarity import group_changed as similarity_group_changed
+        mgrp_codes = sorted({obj.mgrp_code_id for obj in objs if obj.mgrp_code_id})
+        refresh_search_documents(mgrp_codes)
+        reconcile_item_counts(mgrp_codes)
+        patch_snapshot_items(mgrp_codes, bump_catalog_version())
+        backend = get_search_backend()
+        for mgrp_code in mgrp_codes:
+            backend.group_items_changed(mgrp_code)
+            similarity_group_changed(mgrp_code)
 
     return JsonResponse({
         "message": "ItemMaster Phase 1 upload complete",
@@ -220,9 +260,13 @@ def validate_attribute_value(value, validation_type):
 # -------------------------------------------------------------------
 # Handler: ItemMaster Phase 2 — Merge Attributes JSON
 # -------------------------------------------------------------------
+# One transaction (a savepoint per row), so search documents, the catalog
+# snapshot and the in-memory indexes are refreshed once for the upload
+# instead of once per row
+@transaction.atomic
 def handle_itemmaster_phase_2(data, request):
     from itemmaster.models import ItemMaster
-    from matg_attributes.models import MatgAttributeItem
+    from matg_attributes.schema import get_attribute_schema
     import json
 
     updated = 0
@@ -253,7 +297,7 @@ def handle_itemmaster_phase_2(data, request):
                 continue
 
             # Find item
-            item = ItemMaster.objects.filter(sap_item_id=sap).first()
+            item = ItemMaster.objects.filter(sap_item_id=sap, is_deleted=False).first()
             if not item:
                 errors.append({"row": idx, "error": f"ItemMaster with sap_item_id {sap} not found"})
                 continue
@@ -272,17 +316,9 @@ def handle_itemmaster_phase_2(data, request):
             # Get UOM (handle different header formats) - optional
             uom = get_value(row, ["uom", "Uom", "UOM", "Unit Of Measure", "unit of measure"])
 
-            # Look up the attribute definition to get validation rules
-            attr_def = None
-            try:
-                attr_def = MatgAttributeItem.objects.filter(
-                    mgrp_code=item.mgrp_code,
-                    attribute_name=attr_name,
-                    is_deleted=False
-                ).first()
-            except Exception as e:
-                # If we can't find the attribute definition, we'll skip validation
-                pass
+            # Look up the attribute definition (cached per MatGroup) to get validation rules
+            # If we can't find the attribute definition, we'll skip validation
+            attr_def = get_attribute_schema(item.mgrp_code_id).get(attr_name)
 
             # Validate attribute value if validation rule exists
             if attr_def and attr_def.validation and attr_value:
@@ -292,11 +328,11 @@ def handle_itemmaster_phase_2(data, request):
                     continue
                 # If validation passes, allow the value even if it's not in possible_values (custom values are allowed)
             # If no validation type is set, check possible_values
-            elif attr_def and attr_def.possible_values and len(attr_def.possible_values) > 0:
-                if attr_value not in attr_def.possible_values:
+            elif attr_def and attr_def.values:
+                if attr_value not in attr_def.value_set:
                     errors.append({
                         "row": idx,
-                        "error": f"Value '{attr_value}' is not in allowed values: {', '.join(attr_def.possible_values)}"
+                        "error": f"Value '{attr_value}' is not in allowed values: {', '.join(map(str, attr_def.values))}"
                     })
                     continue
 
@@ -333,7 +369,8 @@ def handle_itemmaster_phase_2(data, request):
 
             # Update item attributes
             item.attributes = attributes
-            item.save()
+            with transaction.atomic():
+                item.save()
 
         except Exception as e:
             import traceback
@@ -462,6 +499,11 @@ def handle_generic_model_upload(data, request, Model, model_name):
     if objs:
         try:
             Model.objects.bulk_create(objs, ignore_conflicts=True)
+            # bulk_create doesn't send signals; drop cached catalog search
+            # results and bring the drill-down snapshot up to date
+            from material_api.result_cache import bump_catalog_version
+            from material_api.snapshot import patch_snapshot
+            patch_snapshot(bump_catalog_version(), catalog=True)
         except Exception as e:
             return JsonResponse({
                 "error": f"Bulk create failed: {str(e)}",
@@ -480,6 +522,7 @@ def handle_generic_model_upload(data, request, Model, model_name):
 # -------------------------------------------------------------------
 def handle_matgattribute_phase_1(data, request):
     from matg_attributes.models import MatgAttributeItem
+    from matg_attributes.schema import invalidate_attribute_schema
     from matgroups.models import MatGroup
 
     objs = []
@@ -559,6 +602,9 @@ def handle_matgattribute_phase_1(data, request):
                 "errors": errors
             }, status=400)
 
+        # bulk_create doesn't send signals, so drop cached schemas explicitly
+        invalidate_attribute_schema()
+
     return JsonResponse({
         "message": "MatGroup Attribute Definitions imported",
         "inserted": len(objs),
@@ -570,6 +616,7 @@ def handle_matgattribute_phase_1(data, request):
 # MAIN BULK UPLOAD FUNCTION WITH PHASE ROUTING
 # -------------------------------------------------------------------
 @csrf_exempt
+@rate_limit("upload")
 def bulk_upload(request):
     model_name = request.POST.get("model")
     phase = request.POST.get("phase", "1")